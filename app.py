@@ -1,28 +1,126 @@
+import time
+
 import streamlit as st
 
 # Importar módulos do projeto
-from config import setup_page, apply_custom_css, MAX_CV_TEXT_FOR_TRIGGER, get_api_key
+from config import (
+    setup_page, apply_custom_css, get_api_key, load_sidebar_logo,
+    MAX_CV_TEXT_FOR_TRIGGER, ATS_POLL_INTERVAL_SECONDS, PDF_MAX_PAGES, PDF_MAX_BYTES, CHAT_HISTORY_WINDOW,
+    ROLE_COMPARISON_MAX_ROLES,
+)
 from prompts import SYSTEM_PROMPT, PromptTemplates
-from utils import extract_text
-from engine import get_response, extract_role_from_cv, calculate_ats_score
-from phase_manager import PhaseManager
+from utils import extract_text, prewarm_imports
+from engine import stream_response, compare_roles, LLMError
+from phase_manager import PhaseManager, mentioned_etapa, task_for_etapa
+from pipeline import start_profile_analysis, collect_profile_analysis, peek_profile_analysis
+from cv_cache import get_cv_cache, cv_cache_key
+from context_window import ContextWindow
+from chat_history import make_message, ChatHistoryView
+from session_store import get_session_store
+from cv_normalizer import normalize_cv
+from speculation import Speculator
+from ats_matcher import IncrementalScorer
+from single_flight import SingleFlight, conversation_key
 
 # --- 1. CONFIGURAÇÃO VISUAL ---
 setup_page()
 apply_custom_css()
 
 # --- 4. CONTROLE DE ESTADO ---
-if "messages" not in st.session_state:
-    st.session_state.messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+session_store = get_session_store()
+
+
+def add_message(role, content):
+    """Anexa a mensagem ao histórico e grava a linha correspondente na sessão persistente"""
+    message = make_message(role, content)
+    st.session_state.messages.append(message)
+    if not session_store.append_message(st.session_state.session_id, len(st.session_state.messages) - 1, message):
+        # Outra aba com o mesmo ?sid= (aba duplicada) já gravou esta posição: esta aba segue em sessão própria
+        st.session_state.session_id = session_store.create(
+            st.session_state.messages,
+            cv_content=st.session_state.get("cv_content"),
+            target_role=st.session_state.get("target_role"),
+            ats_data=st.session_state.get("ats_data"),
+            phase=st.session_state.get("fase_atual"),
+        )
+        st.query_params["sid"] = st.session_state.session_id
+
+
+def add_trigger(trigger):
+    """Anexa um trigger interno; recusado se já houver um pedido aguardando resposta (clique duplo, rerun)"""
+    if st.session_state.messages[-1]["role"] == "user":
+        return False
+    add_message("user", trigger)
+    return True
+
+
+def respond(task, api_key):
+    """
+    Resposta da IA ao estado atual da conversa, em streaming
+
+    Single-flight: um rerun no meio do streaming (ou o ramo do chat após o do upload)
+    acompanha a mesma chamada em vez de abrir outra para o mesmo histórico.
+    """
+    messages = st.session_state.messages
+    key = conversation_key(messages, task)
+    # Botão do MENU com resposta já especulada: usa o que foi gerado (e o que ainda falta)
+    speculation = st.session_state.speculator.take(messages)
+    if speculation is not None:
+        st.session_state.single_flight.adopt(key, speculation)
+    # Contexto limitado: SYSTEM_PROMPT + CV fixos, mensagens recentes e resumo das antigas
+    return st.session_state.single_flight.stream(
+        key, lambda: stream_response(st.session_state.context_window.build(messages, api_key), api_key, task)
+    )
+
+
+def sync_phase():
+    """Copia a fase do PhaseManager para o session_state, persistindo quando muda"""
+    phase = st.session_state.phase_manager.get_phase_value()
+    if phase != st.session_state.fase_atual:
+        session_store.update_state(st.session_state.session_id, phase=phase)
+    st.session_state.fase_atual = phase
+
+
+# Sessão persistente: restaurada sob demanda pelo ?sid= da URL (ex: reload da página)
+if "session_id" not in st.session_state:
+    session_id = st.query_params.get("sid")
+    restored = session_store.load(session_id) if session_id else None
+    if restored and restored["messages"]:
+        st.session_state.session_id = session_id
+        st.session_state.messages = restored["messages"]
+        st.session_state.cv_content = restored["cv_content"]
+        st.session_state.cv_normalized = normalize_cv(restored["cv_content"]) if restored["cv_content"] else None
+        st.session_state.target_role = restored["target_role"]
+        st.session_state.ats_data = restored["ats_data"]
+        st.session_state.fase_atual = restored["phase"] or "UPLOAD"
+        st.session_state.phase_manager = PhaseManager()
+        st.session_state.phase_manager.restore(restored["phase"], restored["messages"], restored["cv_content"])
+        # Análise de perfil interrompida (reinício do servidor): refeita assim que houver API key
+        st.session_state.resume_analysis = bool(restored["cv_content"]) and not restored["ats_data"]
+    else:
+        st.session_state.session_id = session_store.create()
+        st.session_state.messages = []
+        add_message("system", SYSTEM_PROMPT)
+    st.query_params["sid"] = st.session_state.session_id
 if "cv_content" not in st.session_state: st.session_state.cv_content = None
+if "cv_normalized" not in st.session_state: st.session_state.cv_normalized = None
 if "fase_atual" not in st.session_state: st.session_state.fase_atual = "UPLOAD"
 if "ats_data" not in st.session_state: st.session_state.ats_data = None
 if "target_role" not in st.session_state: st.session_state.target_role = ""
 if "phase_manager" not in st.session_state: st.session_state.phase_manager = PhaseManager()
+if "ats_future" not in st.session_state: st.session_state.ats_future = None
+if "context_window" not in st.session_state: st.session_state.context_window = ContextWindow()
+if "history_view" not in st.session_state: st.session_state.history_view = ChatHistoryView()
+if "history_limit" not in st.session_state: st.session_state.history_limit = CHAT_HISTORY_WINDOW
+if "llm_error" not in st.session_state: st.session_state.llm_error = None
+if "speculator" not in st.session_state: st.session_state.speculator = Speculator()
+if "single_flight" not in st.session_state: st.session_state.single_flight = SingleFlight()
+if "role_comparison" not in st.session_state: st.session_state.role_comparison = None
+if "ats_scorer" not in st.session_state: st.session_state.ats_scorer = None
 
 # --- 5. SIDEBAR ---
 with st.sidebar:
-    st.image("https://cdn-icons-png.flaticon.com/512/3048/3048127.png", width=60)
+    st.image(load_sidebar_logo(), width=60)  # Asset local: nenhuma requisição externa por rerun
     st.title("Nobile Strategy")
     
     # Tentar carregar API key do .env primeiro
@@ -38,17 +136,22 @@ with st.sidebar:
 
     st.markdown("---")
     if st.button("🔄 Reiniciar Sessão"):
+        st.session_state.speculator.cancel_all()
         for key in list(st.session_state.keys()): del st.session_state[key]
+        st.query_params.clear()
         st.rerun()
 
+if st.session_state.get("resume_analysis") and api_key:
+    st.session_state.ats_future = start_profile_analysis(st.session_state.cv_content, api_key)
+    st.session_state.ats_data = "calculating"
+    st.session_state.resume_analysis = False
+
 # --- 6. INTERFACE PRINCIPAL ---
 st.title("Headhunter Elite Global AI")
 
-# EXIBIR ATS SCORE NO TOPO (Dashboard sempre visível)
-if st.session_state.ats_data and st.session_state.ats_data != "calculating":
-    st.markdown("---")
 
-    data = st.session_state.ats_data
+def render_ats_header(data, target_role, partial=False):
+    """Card do score + keywords presentes/faltantes (partial: análise ainda em streaming)"""
     score = data.get('ats_score', 0)
 
     # Dashboard Header com Score
@@ -56,12 +159,16 @@ if st.session_state.ats_data and st.session_state.ats_data != "calculating":
 
     with col_header1:
         color = "#4CAF50" if score >= 70 else "#FF9800" if score >= 50 else "#FF5252"
+        gain = score - data.get('ats_score_initial', score)
+        gain_html = f'<div style="font-size: 0.85em; color: #4CAF50;">▲ +{gain} desde o upload</div>' if gain > 0 else ""
+        label = "ATS Score (parcial)" if partial else "ATS Score"
         st.markdown(f"""
         <div style="background-color: #1E1E1E; border: 3px solid {color}; padding: 20px;
              border-radius: 10px; text-align: center;">
             <div style="font-size: 3.5em; font-weight: bold; color: {color};">{score}%</div>
-            <div style="font-size: 1em; color: #AAA; margin-top: 5px;">ATS Score</div>
-            <div style="font-size: 0.85em; color: #888; margin-top: 5px;">Cargo: {st.session_state.target_role}</div>
+            <div style="font-size: 1em; color: #AAA; margin-top: 5px;">{label}</div>
+            <div style="font-size: 0.85em; color: #888; margin-top: 5px;">Cargo: {target_role or "..."}</div>
+            {gain_html}
         </div>
         """, unsafe_allow_html=True)
 
@@ -83,12 +190,117 @@ if st.session_state.ats_data and st.session_state.ats_data != "calculating":
         else:
             st.success("Nenhuma keyword faltante!")
 
+
+def render_ats_pending(partial):
+    """Card parcial do ATS (keywords recebidas até agora) ou aviso de cálculo em andamento"""
+    if partial and (partial["keywords_present"] or partial["keywords_missing"]):
+        st.markdown("---")
+        render_ats_header(partial, partial["target_role"], partial=True)
+    else:
+        st.info("⏳ Calculando ATS Score...")
+
+
+def with_ats_progress(stream, slot):
+    """
+    Repassa os trechos de uma resposta e, entre eles, atualiza o card parcial do ATS no slot
+
+    Enquanto o script transmite o diagnóstico, o fragmento do ATS não roda: o card é
+    atualizado daqui, no máximo a cada ATS_POLL_INTERVAL_SECONDS.
+    """
+    shown, last = None, 0.0
+    with slot.container():
+        render_ats_pending(None)
+    for delta in stream:
+        yield delta
+        now = time.monotonic()
+        if now - last < ATS_POLL_INTERVAL_SECONDS:
+            continue
+        last = now
+        partial = peek_profile_analysis(st.session_state.ats_future)
+        if partial is not shown:
+            shown = partial
+            with slot.container():
+                render_ats_pending(partial)
+
+
+# ATS EM SEGUNDO PLANO: o dashboard é preenchido conforme a análise chega (streaming)
+ats_slot = None
+if st.session_state.ats_data == "calculating":
+    @st.fragment(run_every=ATS_POLL_INTERVAL_SECONDS)
+    def ats_pending():
+        result = collect_profile_analysis(st.session_state.ats_future)
+        if result is None:
+            render_ats_pending(peek_profile_analysis(st.session_state.ats_future))
+            return
+        st.session_state.target_role = result["target_role"]
+        st.session_state.ats_data = result["ats_data"]
+        st.session_state.ats_future = None
+        session_store.update_state(
+            st.session_state.session_id, target_role=result["target_role"], ats_data=result["ats_data"]
+        )
+        if result["ats_data"] is None:
+            st.session_state.ats_error = True
+        st.rerun()
+
+    ats_pending()
+else:
+    # Lugar do card parcial no run do upload (preenchido durante o streaming do diagnóstico)
+    ats_slot = st.empty()
+
+if st.session_state.get("ats_error"):
+    st.warning("Não foi possível calcular o ATS Score.")
+
+# ATS INCREMENTAL: keywords trazidas pelo usuário no chat (ETAPA 1 e 2) e o CV reescrito (ETAPA 4/5)
+# atualizam o score sem nova chamada à IA
+if isinstance(st.session_state.ats_data, dict):
+    if st.session_state.ats_scorer is None:
+        st.session_state.ats_scorer = IncrementalScorer(
+            st.session_state.ats_data.get("keywords_present", []), st.session_state.ats_data.get("keywords_missing", [])
+        )
+    # Só as mensagens anexadas desde o último rerun são varridas
+    if st.session_state.ats_scorer.update(st.session_state.messages):
+        updated = dict(st.session_state.ats_data)
+        updated.setdefault("ats_score_initial", updated.get("ats_score", 0))
+        updated.update(st.session_state.ats_scorer.result())
+        st.session_state.ats_data = updated
+        session_store.update_state(st.session_state.session_id, ats_data=updated)
+
+# EXIBIR ATS SCORE NO TOPO (Dashboard sempre visível)
+if st.session_state.ats_data and st.session_state.ats_data != "calculating":
+    st.markdown("---")
+
+    data = st.session_state.ats_data
+    render_ats_header(data, st.session_state.target_role)
+
     # Recomendações em linha
     if data.get('recomendacoes'):
         with st.expander("💡 Ver Recomendações ATS", expanded=False):
             for rec in data.get('recomendacoes', []):
                 st.info(f"• {rec}")
 
+    # Comparação com outros cargos (P2 "Cargos Específicos"): score local, sem uma análise completa por cargo
+    with st.expander("📊 Comparar com Outros Cargos", expanded=bool(st.session_state.role_comparison)):
+        roles_input = st.text_input(
+            f"Cargos separados por vírgula (até {ROLE_COMPARISON_MAX_ROLES})", value=st.session_state.target_role
+        )
+        if st.button("Comparar Cargos") and api_key:
+            with st.spinner("Comparando cargos..."):
+                st.session_state.role_comparison = compare_roles(
+                    st.session_state.cv_content, roles_input.split(","), api_key
+                )
+        if st.session_state.role_comparison:
+            st.dataframe(
+                [
+                    {"Cargo": item["role"], "ATS Score": item["ats_score"],
+                     "Keywords Faltantes": ", ".join(item["keywords_missing"][:5])}
+                    for item in st.session_state.role_comparison
+                ],
+                hide_index=True,
+                column_config={"ATS Score": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%d%%")},
+            )
+        elif st.session_state.role_comparison is not None:
+            st.warning("Não foi possível obter as keywords dos cargos informados.")
+
     st.markdown("---")
 
 # FASE 1: UPLOAD (Gatilho Inicial)
@@ -96,60 +308,117 @@ if not st.session_state.cv_content:
     uploaded_file = st.file_uploader("Suba seu CV (PDF)", type="pdf")
 
     if uploaded_file and api_key:
-        with st.spinner("Lendo perfil e calculando ATS Score..."):
-            text = extract_text(uploaded_file)
-            st.session_state.cv_content = text
-            
-            # Use PhaseManager for phase transition
-            st.session_state.phase_manager.transition_to_diagnostico(text)
-            st.session_state.fase_atual = st.session_state.phase_manager.get_phase_value()
-
-            # Extrai o cargo do CV automaticamente
-            detected_role = extract_role_from_cv(text, api_key)
-            st.session_state.target_role = detected_role
-
-            # Calcula ATS Score automaticamente
-            ats_result = calculate_ats_score(text, detected_role, api_key)
-            st.session_state.ats_data = ats_result
-
-            # Força o início do Diagnóstico
-            trigger = PromptTemplates.cv_upload_trigger(text[:MAX_CV_TEXT_FOR_TRIGGER])
-            st.session_state.messages.append({"role": "user", "content": trigger})
-            reply = get_response(st.session_state.messages, api_key)
-            st.session_state.messages.append({"role": "assistant", "content": reply})
-            st.rerun()
+        # Mesmo PDF já processado (outra aba, sessão reiniciada): reaproveita o cache
+        cv_cache = get_cv_cache()
+        cache_key = cv_cache_key(uploaded_file.getvalue())
+        cached = cv_cache.get(cache_key) or {}
+
+        text = cached.get("cv_text")
+        if not text:
+            with st.spinner("Lendo perfil..."):
+                text = extract_text(uploaded_file)
+            if not text:
+                st.error(
+                    f"Não foi possível ler o PDF. Verifique se o arquivo contém texto selecionável "
+                    f"e tem no máximo {PDF_MAX_PAGES} páginas / {PDF_MAX_BYTES // (1024 * 1024)} MB."
+                )
+                st.stop()
+            cv_cache.update(cache_key, cv_text=text)
+        # Limpeza e seções calculadas uma vez; cada prompt usa a compressão do seu orçamento
+        st.session_state.cv_normalized = normalize_cv(text)
+
+        # Pipeline antes de marcar o CV como carregado: um rerun no meio do upload refaz este
+        # ramo, e a análise em andamento para o mesmo PDF é reaproveitada (não duplicada)
+        if cached.get("ats_data"):
+            st.session_state.target_role = cached["target_role"]
+            st.session_state.ats_data = cached["ats_data"]
+        else:
+            # Cargo + ATS Score em segundo plano (o diagnóstico não depende deles)
+            st.session_state.ats_future = start_profile_analysis(text, api_key, cache_key)
+            st.session_state.ats_data = "calculating"
+
+        # Força o início do Diagnóstico (transmitido enquanto o ATS é calculado)
+        add_trigger(PromptTemplates.cv_upload_trigger(
+            st.session_state.cv_normalized.compress(MAX_CV_TEXT_FOR_TRIGGER, "diagnostic")
+        ))
+        st.session_state.cv_content = text
+
+        # Use PhaseManager for phase transition
+        st.session_state.phase_manager.transition_to_diagnostico(text)
+        sync_phase()
+
+        session_store.update_state(st.session_state.session_id, cv_content=text)
+        if cached.get("ats_data"):
+            session_store.update_state(
+                st.session_state.session_id, target_role=cached["target_role"], ats_data=cached["ats_data"]
+            )
+
+        reply = cached.get("diagnostic")
+        if not reply:
+            with st.chat_message("assistant"):
+                try:
+                    stream = respond("chat", api_key)
+                    if st.session_state.ats_data == "calculating" and ats_slot is not None:
+                        stream = with_ats_progress(stream, ats_slot)
+                    reply = st.write_stream(stream)
+                except LLMError as e:
+                    # O erro não entra na conversa: o chat exibe o aviso e permite tentar de novo
+                    st.session_state.llm_error = str(e)
+            if reply:
+                cv_cache.update(cache_key, diagnostic=reply)
+        if reply:
+            add_message("assistant", reply)
+        st.rerun()
 
 # FASE 2: CHAT INTERATIVO
 else:
-    # Mostra histórico (ocultando prompts técnicos)
-    for msg in st.session_state.messages:
-        if msg["role"] != "system" and "O USUÁRIO SUBIU" not in str(msg["content"]) and "ACIONOU" not in str(msg["content"]):
-            with st.chat_message(msg["role"]):
-                st.markdown(msg["content"])
+    # Mostra histórico (prompts técnicos já marcados como ocultos ao anexar)
+    shown, omitted = st.session_state.history_view.window(st.session_state.messages, st.session_state.history_limit)
+    if omitted and st.button(f"⬆️ Carregar mensagens anteriores ({omitted})"):
+        st.session_state.history_limit += CHAT_HISTORY_WINDOW
+        st.rerun()
+    for msg in shown:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
 
     # Update phase using PhaseManager (message-based, not keyword-based)
     st.session_state.phase_manager.update_phase(
         cv_content=st.session_state.cv_content,
         messages=st.session_state.messages
     )
-    st.session_state.fase_atual = st.session_state.phase_manager.get_phase_value()
+    sync_phase()
 
     # INPUT DO USUÁRIO
     user_input = st.chat_input("Sua resposta...")
 
     # PROCESSAMENTO DE MENSAGEM
     if user_input:
-        st.session_state.messages.append({"role": "user", "content": user_input})
+        add_message("user", user_input)
+        st.session_state.llm_error = None
+        st.session_state.speculator.cancel_all()
         st.rerun()
 
     # RESPOSTA DA IA (Se a última msg for User, a IA responde sozinha)
     if st.session_state.messages[-1]["role"] == "user":
-        with st.chat_message("assistant"):
-            with st.spinner("Headhunter analisando..."):
-                response = get_response(st.session_state.messages, api_key)
-                st.markdown(response)
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        st.rerun()
+        if st.session_state.llm_error:
+            # Falha definitiva (após retries): avisa sem gravar o erro no histórico
+            st.error(f"Erro na IA: {st.session_state.llm_error}")
+            if st.button("🔁 Tentar novamente"):
+                st.session_state.llm_error = None
+                st.rerun()
+        else:
+            with st.chat_message("assistant"):
+                # ETAPA 4/5 (reescrita e arquivo final) usa o tier/política "execution"; ETAPA 1-3 seguem no chat
+                task = st.session_state.phase_manager.response_task()
+                # Streaming: o texto aparece no balão conforme o modelo gera
+                try:
+                    response = st.write_stream(respond(task, api_key))
+                except LLMError as e:
+                    response = None
+                    st.session_state.llm_error = str(e)
+            if response:
+                add_message("assistant", response)
+            st.rerun()
 
     # MENU DE COMANDOS (Aparece só depois do Diagnóstico)
     if st.session_state.fase_atual in ["MENU", "EXECUCAO"] and st.session_state.messages[-1]["role"] == "assistant":
@@ -158,15 +427,30 @@ else:
         with col1:
             if st.button("🚀 /otimizador_cv_linkedin"):
                 trigger = PromptTemplates.optimizer_trigger()
-                st.session_state.messages.append({"role": "user", "content": trigger})
-                st.session_state.phase_manager.transition_to_execucao(trigger)
-                st.session_state.fase_atual = st.session_state.phase_manager.get_phase_value()
+                if add_trigger(trigger):
+                    st.session_state.phase_manager.transition_to_execucao(trigger)
+                    sync_phase()
                 st.rerun()
 
         with col2:
             if st.button("📄 Pular para Arquivo Final"):
-                 trigger = PromptTemplates.skip_to_final_trigger()
-                 st.session_state.messages.append({"role": "user", "content": trigger})
-                 st.session_state.phase_manager.transition_to_execucao(trigger)
-                 st.session_state.fase_atual = st.session_state.phase_manager.get_phase_value()
-                 st.rerun()
+                trigger = PromptTemplates.skip_to_final_trigger()
+                if add_trigger(trigger):
+                    st.session_state.phase_manager.transition_to_execucao(trigger)
+                    sync_phase()
+                st.rerun()
+
+        # Pré-geração opcional (SPECULATION_ENABLED): as respostas dos dois botões começam antes do clique
+        if st.session_state.fase_atual == "MENU":
+            st.session_state.speculator.start(
+                {
+                    trigger: task_for_etapa(mentioned_etapa(make_message("user", trigger)))
+                    for trigger in (PromptTemplates.optimizer_trigger(), PromptTemplates.skip_to_final_trigger())
+                },
+                st.session_state.messages,
+                st.session_state.context_window,
+                api_key,
+            )
+
+# SDK da OpenAI e leitor de PDF importados em segundo plano, depois da página pronta
+prewarm_imports("openai", "pdfplumber")
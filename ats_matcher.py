@@ -0,0 +1,325 @@
+"""
+Motor local e determinístico de Score ATS
+
+Verifica a lista de palavras-chave de um cargo contra o texto COMPLETO do CV,
+sem chamadas à IA. O texto é normalizado (acentos, caixa), os tokens passam
+por um stemming leve português/inglês e todas as palavras-chave (inclusive
+expressões com várias palavras) são buscadas em uma única varredura linear
+com um autômato Aho–Corasick sobre tokens.
+"""
+
+import re
+import unicodedata
+from collections import deque
+
+from config import ATS_NEGATION_WORDS, ATS_NEGATION_WINDOW_TOKENS
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\+\+|#)?")
+
+# Plurais → singular (aplicado antes dos sufixos)
+_PLURAL_RULES = (
+    ("coes", "cao"),
+    ("oes", "ao"),
+    ("aes", "ao"),
+    ("ais", "al"),
+    ("eis", "el"),
+    ("ies", "y"),
+)
+
+# Sufixos derivacionais/flexionais (o mais longo primeiro)
+_SUFFIXES = (
+    "amento", "imento", "mente", "idade", "ation", "ando", "endo", "indo",
+    "ador", "cao", "ing", "ment", "ado", "ada", "ido", "ida", "ed",
+)
+
+_MIN_STEM = 4
+
+# Título de ETAPA 4 (Engenharia) ou 5 (Arquivo Mestre) no início de uma linha: resposta com o CV reescrito
+_CV_OUTPUT_HEADING = re.compile(r"^[\W_]*(?:etapa\s*[45]\b|arquivo mestre)", re.MULTILINE)
+
+# Fim de frase: a negação de uma frase não alcança a seguinte ("Não. Uso SQL todo dia.")
+_SENTENCE_END = re.compile(r"[.!?;:\n]+")
+
+
+def fold(text):
+    """
+    Remove acentos e normaliza caixa
+
+    Args:
+        text: Texto original
+
+    Returns:
+        str: Texto em minúsculas, sem diacríticos
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def stem(token):
+    """
+    Stemming leve PT/EN: reduz plurais e sufixos comuns
+
+    Args:
+        token: Token já normalizado (minúsculas, sem acentos)
+
+    Returns:
+        str: Radical do token
+    """
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    for suffix, replacement in _PLURAL_RULES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[: -len(suffix)] + replacement
+            break
+    else:
+        if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            token = token[:-1]
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+            token = token[: -len(suffix)]
+            break
+    if len(token) > _MIN_STEM and token[-1] in "aeo":
+        token = token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Normaliza e divide o texto em radicais
+
+    Args:
+        text: Texto livre (CV, keyword, mensagem)
+
+    Returns:
+        list: Radicais na ordem do texto
+    """
+    return [stem(t) for t in _TOKEN_RE.findall(fold(text))]
+
+
+class KeywordMatcher:
+    """
+    Autômato Aho–Corasick sobre sequências de radicais
+
+    Cada palavra-chave vira uma sequência de radicais; a busca percorre os
+    tokens do texto uma única vez, independentemente do número de keywords.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = []
+        self._lengths = []  # Número de radicais de cada keyword
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+
+        seen = set()
+        for keyword in keywords:
+            tokens = tuple(tokenize(keyword))
+            if not tokens or tokens in seen:
+                continue
+            seen.add(tokens)
+            self._add(tokens, len(self.keywords))
+            self.keywords.append(keyword.strip())
+            self._lengths.append(len(tokens))
+        self._build_failure_links()
+
+    def _add(self, tokens, keyword_id):
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            node = nxt
+        self._output[node].add(keyword_id)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] |= self._output[self._fail[child]]
+
+    def step(self, node, token):
+        """
+        Avança o autômato um token
+
+        Args:
+            node: Estado atual (0 = raiz)
+            token: Radical do próximo token
+
+        Returns:
+            tuple: (novo estado, conjunto de ids de keywords que terminam aqui)
+        """
+        while node and token not in self._goto[node]:
+            node = self._fail[node]
+        node = self._goto[node].get(token, 0)
+        return node, self._output[node]
+
+    def find(self, text):
+        """
+        Encontra as palavras-chave presentes no texto
+
+        Args:
+            text: Texto livre
+
+        Returns:
+            set: Índices (em self.keywords) das keywords encontradas
+        """
+        found = set()
+        node = 0
+        for token in tokenize(text):
+            node, matches = self.step(node, token)
+            if matches:
+                found |= matches
+        return found
+
+    def find_affirmed(self, text, negations, window):
+        """
+        Encontra as palavras-chave que não estão negadas no texto
+
+        Uma ocorrência é ignorada se algum radical de negação aparece até
+        `window` tokens antes dela, na mesma frase.
+
+        Args:
+            text: Texto livre (ex: resposta do usuário)
+            negations: Radicais de negação (ex: {"nao", "nunc", "sem"})
+            window: Tokens antes da keyword onde a negação é procurada
+
+        Returns:
+            set: Índices (em self.keywords) das keywords encontradas sem negação
+        """
+        found = set()
+        for sentence in _SENTENCE_END.split(text):
+            tokens = tokenize(sentence)
+            node = 0
+            for i, token in enumerate(tokens):
+                node, matches = self.step(node, token)
+                for keyword_id in matches:
+                    start = i - self._lengths[keyword_id] + 1
+                    if negations.isdisjoint(tokens[max(0, start - window):start]):
+                        found.add(keyword_id)
+        return found
+
+
+def build_ats_result(keywords, found):
+    """
+    Monta o resultado no formato do dashboard a partir das keywords encontradas
+
+    Args:
+        keywords: Lista de keywords do cargo (ordem preservada)
+        found: Índices das keywords encontradas
+
+    Returns:
+        dict: ats_score, keywords_present, keywords_missing
+    """
+    present = [kw for i, kw in enumerate(keywords) if i in found]
+    missing = [kw for i, kw in enumerate(keywords) if i not in found]
+    score = round(100 * len(present) / len(keywords)) if keywords else 0
+    return {"ats_score": score, "keywords_present": present, "keywords_missing": missing}
+
+
+def score_keywords(cv_text, keywords):
+    """
+    Calcula o Score ATS localmente
+
+    Args:
+        cv_text: Texto completo do CV (sem truncamento)
+        keywords: Palavras-chave do cargo
+
+    Returns:
+        dict: ats_score (0-100), keywords_present, keywords_missing
+    """
+    matcher = KeywordMatcher(keywords)
+    return build_ats_result(matcher.keywords, matcher.find(cv_text or ""))
+
+
+def build_recommendations(keywords_missing, limit=3):
+    """
+    Gera recomendações determinísticas a partir das keywords faltantes
+
+    Args:
+        keywords_missing: Keywords não encontradas no CV
+        limit: Número máximo de recomendações
+
+    Returns:
+        list: Recomendações curtas
+    """
+    if not keywords_missing:
+        return ["Mantenha as palavras-chave atuais e reforce-as com resultados quantificados."]
+    return [
+        f'Inclua evidências concretas de "{kw}" no resumo ou nas experiências.'
+        for kw in keywords_missing[:limit]
+    ]
+
+
+def is_cv_output(text):
+    """
+    Indica se uma resposta do assistente traz o CV reescrito (ETAPA 4/5)
+
+    Args:
+        text: Conteúdo da mensagem
+
+    Returns:
+        bool: True se alguma linha começa com o título da ETAPA 4/5
+    """
+    return _CV_OUTPUT_HEADING.search(fold(text)) is not None
+
+
+class IncrementalScorer:
+    """
+    Score ATS atualizado com o conteúdo novo da conversa
+
+    O conjunto de keywords (presentes + faltantes do resultado inicial) é
+    indexado uma vez; cada atualização varre apenas as mensagens anexadas
+    desde a anterior e só acrescenta keywords encontradas. Contam as
+    respostas do usuário (exceto keywords em frases negadas, como "não
+    tenho experiência com SQL") e, do assistente, só o CV reescrito
+    (ETAPA 4/5): na ETAPA 1 o próprio assistente cita as keywords faltantes
+    ao perguntar por elas.
+    """
+
+    negations = frozenset(tokenize(" ".join(ATS_NEGATION_WORDS)))
+
+    def __init__(self, keywords_present, keywords_missing):
+        self.matcher = KeywordMatcher(list(keywords_present) + list(keywords_missing))
+        present = {tuple(tokenize(kw)) for kw in keywords_present}
+        self.found = {i for i, kw in enumerate(self.matcher.keywords) if tuple(tokenize(kw)) in present}
+        self.scanned = 0
+
+    def update(self, messages):
+        """
+        Varre as mensagens novas do usuário e o CV reescrito pelo assistente (exceto as ocultas)
+
+        Args:
+            messages: Histórico completo (append-only)
+
+        Returns:
+            bool: True se alguma keyword faltante passou a estar presente
+        """
+        before = len(self.found)
+        for message in messages[self.scanned:]:
+            if message.get("hidden"):
+                continue
+            content = str(message["content"])
+            if message["role"] == "user":
+                self.found |= self.matcher.find_affirmed(content, self.negations, ATS_NEGATION_WINDOW_TOKENS)
+            elif message["role"] == "assistant" and is_cv_output(content):
+                self.found |= self.matcher.find(content)
+        self.scanned = len(messages)
+        return len(self.found) != before
+
+    def result(self):
+        """
+        Returns:
+            dict: ats_score, keywords_present, keywords_missing atuais
+        """
+        return build_ats_result(self.matcher.keywords, self.found)
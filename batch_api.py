@@ -0,0 +1,298 @@
+"""
+Modo offline via OpenAI Batch API: exportação de requisições e importação de resultados
+
+Fluxo (duas etapas, pois o ATS depende do cargo):
+    1. export-roles: PDFs → JSONL de requisições de extração de cargo
+    2. (enviar o arquivo à Batch API e baixar o arquivo de saída)
+    3. export-ats: PDFs + saída da etapa 1 → JSONL de requisições de Score ATS
+    4. (enviar à Batch API e baixar a saída)
+    5. import: saídas das etapas 1 e 3 → JSONL no mesmo formato do batch_cli.py
+
+As funções de montagem e leitura não fazem chamadas de rede e podem ser
+exercitadas offline com arquivos de exemplo.
+
+Uso:
+    python batch_api.py export-roles PASTA_PDFS -o roles_batch.jsonl
+    python batch_api.py export-ats PASTA_PDFS --roles roles_output.jsonl -o ats_batch.jsonl
+    python batch_api.py import --roles roles_output.jsonl --ats ats_output.jsonl -o resultados.jsonl [--input-dir PASTA_PDFS]
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from config import MAX_CV_TEXT_LENGTH, MAX_CV_TEXT_LENGTH_ATS
+from prompts import PromptTemplates
+from utils import extract_text
+from ats_matcher import score_keywords
+from cv_normalizer import normalize_cv
+from model_router import model_for
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+ROLE_STAGE = "role"
+ATS_STAGE = "ats"
+
+
+def make_custom_id(stage, cv_id):
+    """Identificador da requisição no arquivo de lote (etapa + CV)"""
+    return f"{stage}:{cv_id}"
+
+
+def split_custom_id(custom_id):
+    """
+    Separa o custom_id em etapa e identificador do CV
+
+    Returns:
+        tuple: (etapa, cv_id)
+    """
+    stage, _, cv_id = custom_id.partition(":")
+    return stage, cv_id
+
+
+def build_role_request(cv_id, cv_text, model=None):
+    """
+    Monta a requisição de extração de cargo no formato da Batch API
+
+    Args:
+        cv_id: Identificador do CV (ex: nome do arquivo)
+        cv_text: Texto completo do CV
+        model: Modelo a usar (padrão: tier da tarefa "role")
+
+    Returns:
+        dict: Linha do JSONL de entrada da Batch API
+    """
+    model = model or model_for("role")
+    prompt = PromptTemplates.role_extraction_prompt(normalize_cv(cv_text).compress(MAX_CV_TEXT_LENGTH, "role"))
+    return {
+        "custom_id": make_custom_id(ROLE_STAGE, cv_id),
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.3,
+        },
+    }
+
+
+def build_ats_request(cv_id, cv_text, target_role, model=None):
+    """
+    Monta a requisição de Score ATS no formato da Batch API
+
+    Args:
+        cv_id: Identificador do CV (ex: nome do arquivo)
+        cv_text: Texto completo do CV
+        target_role: Cargo alvo (resultado da etapa de cargo)
+        model: Modelo a usar (padrão: tier da tarefa "profile")
+
+    Returns:
+        dict: Linha do JSONL de entrada da Batch API
+    """
+    model = model or model_for("profile")
+    prompt = PromptTemplates.ats_score_prompt(normalize_cv(cv_text).compress(MAX_CV_TEXT_LENGTH_ATS, "ats"), target_role)
+    return {
+        "custom_id": make_custom_id(ATS_STAGE, cv_id),
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.2,
+        },
+    }
+
+
+def write_jsonl(records, path):
+    """
+    Grava registros em JSONL
+
+    Returns:
+        int: Número de linhas gravadas
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def read_batch_output(path):
+    """
+    Lê o arquivo de saída da Batch API
+
+    Args:
+        path: JSONL baixado da Batch API (output ou error file)
+
+    Returns:
+        dict: custom_id → {"content": str} ou {"error": str}
+    """
+    results = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                error = record.get("error") or response.get("body", {}).get("error") or "Requisição falhou"
+                results[record["custom_id"]] = {"error": str(error.get("message", error) if isinstance(error, dict) else error)}
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+            results[record["custom_id"]] = {"content": content}
+    return results
+
+
+def import_roles(results):
+    """
+    Extrai os cargos da saída da etapa de cargo
+
+    Args:
+        results: Saída de read_batch_output
+
+    Returns:
+        dict: cv_id → cargo ("Profissional" se a resposta vier vazia ou com erro)
+    """
+    roles = {}
+    for custom_id, result in results.items():
+        stage, cv_id = split_custom_id(custom_id)
+        if stage != ROLE_STAGE:
+            continue
+        role = (result.get("content") or "").strip().strip('"')
+        roles[cv_id] = role or "Profissional"
+    return roles
+
+
+def normalize_ats_result(data):
+    """
+    Garante o mesmo formato retornado por engine.calculate_ats_score
+
+    Args:
+        data: JSON decodificado da resposta ATS
+
+    Returns:
+        dict: ats_score (int 0-100), keywords_present, keywords_missing, recomendacoes
+
+    Raises:
+        ValueError: A resposta não é um objeto JSON
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Resposta ATS não é um objeto JSON")
+
+    def as_list(value):
+        return [str(v) for v in value] if isinstance(value, list) else []
+
+    try:
+        score = int(round(float(data.get("ats_score", 0))))
+    except (TypeError, ValueError):
+        score = 0
+    return {
+        "ats_score": max(0, min(100, score)),
+        "keywords_present": as_list(data.get("keywords_present")),
+        "keywords_missing": as_list(data.get("keywords_missing")),
+        "recomendacoes": as_list(data.get("recomendacoes")),
+    }
+
+
+def import_ats(results, roles, cv_texts=None):
+    """
+    Junta a saída da etapa ATS aos cargos, no formato de resultado do batch_cli.py
+
+    Se os textos dos CVs forem informados, ats_score e keywords presentes/faltantes
+    são recalculados localmente (ats_matcher), como em engine.calculate_ats_score.
+
+    Args:
+        results: Saída de read_batch_output (etapa ATS)
+        roles: Saída de import_roles
+        cv_texts: dict cv_id → texto completo do CV (opcional)
+
+    Returns:
+        list: Registros {"file", "status", "target_role", "ats_data"[, "error"]}
+    """
+    records = []
+    for custom_id, result in sorted(results.items()):
+        stage, cv_id = split_custom_id(custom_id)
+        if stage != ATS_STAGE:
+            continue
+        record = {"file": cv_id, "status": "ok", "target_role": roles.get(cv_id, "Profissional"), "ats_data": None}
+        try:
+            if "error" in result:
+                raise ValueError(result["error"])
+            ats_data = normalize_ats_result(json.loads(result["content"]))
+            if cv_texts and cv_texts.get(cv_id):
+                keywords = ats_data["keywords_present"] + ats_data["keywords_missing"]
+                ats_data.update(score_keywords(normalize_cv(cv_texts[cv_id]).text, keywords))
+            record["ats_data"] = ats_data
+        except (TypeError, ValueError) as e:  # TypeError: content null (ex: resposta filtrada)
+            record["status"] = "error"
+            record["error"] = str(e)
+        records.append(record)
+    return records
+
+
+def _extract(path):
+    """Executado no pool de processos"""
+    return extract_text(path, parallel=False)
+
+
+def iter_cv_texts(input_dir):
+    """
+    Extrai o texto de todos os PDFs de um diretório (pool de processos)
+
+    Yields:
+        tuple: (cv_id relativo ao diretório, texto ou None)
+    """
+    input_dir = Path(input_dir)
+    paths = sorted(input_dir.rglob("*.pdf"))
+    with ProcessPoolExecutor() as pool:
+        for path, text in zip(paths, pool.map(_extract, [str(p) for p in paths])):
+            yield path.relative_to(input_dir).as_posix(), text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportação/importação de lotes para a OpenAI Batch API")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_roles = sub.add_parser("export-roles", help="Gera requisições de extração de cargo")
+    p_roles.add_argument("input_dir")
+    p_roles.add_argument("--output", "-o", default="roles_batch.jsonl")
+
+    p_ats = sub.add_parser("export-ats", help="Gera requisições de Score ATS a partir dos cargos importados")
+    p_ats.add_argument("input_dir")
+    p_ats.add_argument("--roles", required=True, help="Saída da Batch API da etapa de cargo")
+    p_ats.add_argument("--output", "-o", default="ats_batch.jsonl")
+
+    p_import = sub.add_parser("import", help="Junta as saídas no formato de resultados do batch_cli.py")
+    p_import.add_argument("--roles", required=True, help="Saída da Batch API da etapa de cargo")
+    p_import.add_argument("--ats", required=True, help="Saída da Batch API da etapa ATS")
+    p_import.add_argument("--output", "-o", default="resultados.jsonl")
+    p_import.add_argument("--input-dir", help="Pasta dos PDFs: recalcula o score localmente sobre o CV completo")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export-roles":
+        requests = (build_role_request(cv_id, text) for cv_id, text in iter_cv_texts(args.input_dir) if text)
+        print(f"{write_jsonl(requests, args.output)} requisições gravadas em {args.output}")
+    elif args.command == "export-ats":
+        roles = import_roles(read_batch_output(args.roles))
+        requests = (
+            build_ats_request(cv_id, text, roles[cv_id])
+            for cv_id, text in iter_cv_texts(args.input_dir)
+            if text and cv_id in roles
+        )
+        print(f"{write_jsonl(requests, args.output)} requisições gravadas em {args.output}")
+    else:
+        roles = import_roles(read_batch_output(args.roles))
+        cv_texts = dict(iter_cv_texts(args.input_dir)) if args.input_dir else None
+        records = import_ats(read_batch_output(args.ats), roles, cv_texts)
+        errors = sum(1 for r in records if r["status"] != "ok")
+        write_jsonl(records, args.output)
+        print(f"{len(records)} resultados gravados em {args.output} ({errors} com erro)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
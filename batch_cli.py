@@ -0,0 +1,181 @@
+"""
+Processamento em lote (headless) de CVs: extração, cargo e Score ATS
+
+Lê um diretório de PDFs, extrai o texto em um pool de processos e executa as
+chamadas de IA em um pool limitado de threads. Cada resultado é gravado como
+uma linha JSON assim que fica pronto; arquivos já concluídos em execuções
+anteriores são ignorados (retomada).
+
+Uso:
+    python batch_cli.py CAMINHO/DOS/PDFS --output resultados.jsonl [--llm-workers 8]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+from config import get_api_key, BATCH_EXTRACTION_WORKERS, BATCH_LLM_WORKERS
+from rate_limiter import get_scheduler
+from utils import extract_text
+from engine import extract_role_from_cv, calculate_ats_score
+
+logger = logging.getLogger(__name__)
+
+
+def load_finished(output_path):
+    """
+    Lê os arquivos já concluídos com sucesso em execuções anteriores
+
+    Args:
+        output_path: Caminho do JSONL de resultados
+
+    Returns:
+        set: Nomes de arquivo (relativos ao diretório de entrada) já processados
+    """
+    finished = set()
+    if not os.path.exists(output_path):
+        return finished
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Linha truncada por uma interrupção anterior
+            if record.get("status") == "ok":
+                finished.add(record["file"])
+    return finished
+
+
+def _extract(path):
+    """Executado no pool de processos (um documento por worker, páginas em série)"""
+    return extract_text(path, parallel=False)
+
+
+def _analyze(name, cv_text, api_key):
+    """Executado no pool de threads: cargo + Score ATS"""
+    start = time.perf_counter()
+    target_role = extract_role_from_cv(cv_text, api_key)
+    ats_data = calculate_ats_score(cv_text, target_role, api_key)
+    record = {
+        "file": name,
+        "status": "ok" if ats_data else "error",
+        "target_role": target_role,
+        "ats_data": ats_data,
+        "llm_seconds": round(time.perf_counter() - start, 3),
+    }
+    if not ats_data:
+        record["error"] = "Falha no cálculo ATS"
+    return record
+
+
+def run_batch(input_dir, output_path, api_key, extraction_workers=BATCH_EXTRACTION_WORKERS,
+              llm_workers=BATCH_LLM_WORKERS, limit=None):
+    """
+    Processa todos os PDFs de um diretório, gravando resultados em JSONL
+
+    Args:
+        input_dir: Diretório com os PDFs (busca recursiva)
+        output_path: Arquivo JSONL de saída (resultados são anexados)
+        api_key: Chave API da OpenAI
+        extraction_workers: Processos para extração de texto
+        llm_workers: Chamadas de IA simultâneas
+        limit: Número máximo de arquivos novos a processar (opcional)
+
+    Returns:
+        dict: Estatísticas da execução (processed, ok, errors, skipped, seconds, cvs_per_minute,
+              rate_limit: fila/espera do agendador de rate limit)
+    """
+    input_dir = Path(input_dir)
+    finished = load_finished(output_path)
+    pending = []
+    skipped = 0
+    for path in sorted(input_dir.rglob("*.pdf")):
+        name = path.relative_to(input_dir).as_posix()
+        if name in finished:
+            skipped += 1  # Só conta os concluídos que ainda estão no diretório
+        else:
+            pending.append((name, path))
+    if limit:
+        pending = pending[:limit]
+
+    stats = {"processed": 0, "ok": 0, "errors": 0, "skipped": skipped}
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=extraction_workers) as extraction_pool, \
+            ThreadPoolExecutor(max_workers=llm_workers) as llm_pool:
+
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()  # Resultado persistido imediatamente (retomada segura)
+            stats["processed"] += 1
+            stats["ok" if record["status"] == "ok" else "errors"] += 1
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"[{stats['processed']}/{len(pending)}] {record['file']}: {record['status']} "
+                f"({stats['processed'] / elapsed * 60:.1f} CVs/min)"
+            )
+
+        # Um único laço sobre extrações e análises: cada análise é gravada assim que termina,
+        # mesmo com extrações ainda em andamento
+        extraction_futures = {extraction_pool.submit(_extract, str(path)): name for name, path in pending}
+        llm_futures = set()
+        while extraction_futures or llm_futures:
+            done, _ = wait(set(extraction_futures) | llm_futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in llm_futures:
+                    llm_futures.discard(future)
+                    write(future.result())
+                    continue
+                name = extraction_futures.pop(future)
+                try:
+                    cv_text = future.result()
+                except Exception as e:
+                    cv_text, error = None, str(e)
+                else:
+                    error = "Não foi possível ler o PDF"
+                if not cv_text:
+                    write({"file": name, "status": "error", "error": error})
+                    continue
+                llm_futures.add(llm_pool.submit(_analyze, name, cv_text, api_key))
+
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    stats["cvs_per_minute"] = round(stats["processed"] / stats["seconds"] * 60, 1) if stats["seconds"] else 0.0
+    stats["rate_limit"] = get_scheduler().stats()["background"]
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Processamento em lote de CVs (cargo + Score ATS)")
+    parser.add_argument("input_dir", help="Diretório com os PDFs")
+    parser.add_argument("--output", "-o", default="resultados.jsonl", help="Arquivo JSONL de saída")
+    parser.add_argument("--extraction-workers", type=int, default=BATCH_EXTRACTION_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=BATCH_LLM_WORKERS)
+    parser.add_argument("--limit", type=int, default=None, help="Processa no máximo N arquivos novos")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    api_key = get_api_key()
+    if not api_key:
+        parser.error("OPENAI_API_KEY não encontrada (configure o .env)")
+
+    stats = run_batch(args.input_dir, args.output, api_key, args.extraction_workers, args.llm_workers, args.limit)
+    print(
+        f"Processados: {stats['processed']} (ok: {stats['ok']}, erros: {stats['errors']}, "
+        f"já concluídos: {stats['skipped']}) em {stats['seconds']}s — {stats['cvs_per_minute']} CVs/min"
+    )
+    rate_limit = stats["rate_limit"]
+    print(
+        f"Espera no rate limit: média {rate_limit['wait_avg_s']:.2f}s, p95 {rate_limit['wait_p95_s']:.2f}s, "
+        f"máx {rate_limit['wait_max_s']:.2f}s"
+    )
+    return 0 if stats["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
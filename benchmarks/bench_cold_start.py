@@ -0,0 +1,116 @@
+"""
+Cold start e custo de rerun ocioso do app.py
+
+Cada medição roda em um processo novo (nada importado previamente):
+  - import: tempo para importar os módulos do projeto usados pelo app.py,
+    depois do streamlit (que o servidor já tem carregado), e quais módulos
+    pesados (openai, pdfplumber, numpy) foram carregados no caminho
+  - 1º run: primeira execução do app.py (carregamento da página), via AppTest
+  - rerun ocioso: reruns sem nenhuma interação (p50/p95), depois do import
+    em segundo plano do SDK/leitor de PDF disparado pelo 1º run
+    (--no-wait mede os reruns enquanto esse import ainda roda)
+
+Uso:
+    python benchmarks/bench_cold_start.py [--reruns 30] [--processes 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("openai", "httpx", "pdfplumber", "numpy")
+PROJECT_MODULES = (
+    "config", "prompts", "utils", "engine", "phase_manager", "pipeline", "cv_cache", "context_window",
+    "chat_history", "session_store", "cv_normalizer", "speculation", "ats_matcher", "single_flight",
+)
+
+
+def worker(reruns, wait_prewarm):
+    """Executado no processo filho: mede import, 1º run e reruns ociosos"""
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    import streamlit  # noqa: F401 (já carregado no servidor real)
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    for name in PROJECT_MODULES:
+        __import__(name)
+    import_time = time.perf_counter() - start
+    heavy_after_import = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+    start = time.perf_counter()
+    at.run()
+    first_run = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    prewarm = [t for t in threading.enumerate() if t.name == "nobile-prewarm"]
+    start = time.perf_counter()
+    if wait_prewarm:
+        for thread in prewarm:
+            thread.join()
+    prewarm_time = time.perf_counter() - start
+
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    print(json.dumps({
+        "import": import_time,
+        "first_run": first_run,
+        "prewarm": prewarm_time if wait_prewarm and prewarm else None,
+        "rerun_p50": statistics.median(times),
+        "rerun_p95": statistics.quantiles(times, n=20)[-1] if len(times) > 1 else times[0],
+        "heavy_after_import": heavy_after_import,
+        "heavy_after_run": [m for m in HEAVY_MODULES if m in sys.modules],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=30, help="Reruns ociosos medidos por processo")
+    parser.add_argument("--processes", type=int, default=3, help="Processos novos (cold start) medidos")
+    parser.add_argument("--no-wait", action="store_true", help="Não espera o import em segundo plano")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.reruns, not args.no_wait)
+        return
+
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)  # Página inicial sem chave: nenhum caminho de chamada à IA
+    with tempfile.TemporaryDirectory() as tmp:
+        env["SESSION_STORE_PATH"] = os.path.join(tmp, "sessions.sqlite3")
+        results = []
+        for _ in range(args.processes):
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", "--reruns", str(args.reruns)]
+                + (["--no-wait"] if args.no_wait else []),
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    median = lambda key: statistics.median(r[key] for r in results) * 1000
+    print(f"{args.processes} processos novos, {args.reruns} reruns ociosos cada")
+    print(f"  import dos módulos do projeto (ms)   {median('import'):8.1f}")
+    print(f"  1º run do app.py (ms)                {median('first_run'):8.1f}")
+    if results[0]["prewarm"] is not None:
+        print(f"  import em 2º plano (ms)              {median('prewarm'):8.1f}")
+    print(f"  rerun ocioso p50 (ms)                {median('rerun_p50'):8.1f}")
+    print(f"  rerun ocioso p95 (ms)                {median('rerun_p95'):8.1f}")
+    print(f"  módulos pesados após o import        {', '.join(results[0]['heavy_after_import']) or '—'}")
+    print(f"  módulos pesados após 1º run/reruns   {', '.join(results[0]['heavy_after_run']) or '—'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark ponta a ponta contra o servidor LLM local (sem API key real)
+
+Mede, do lado da aplicação:
+  - upload: extração do PDF, análise de perfil em segundo plano (cargo + ATS) e
+    diagnóstico em streaming (tempo até o primeiro token e até o dashboard completo)
+  - N turnos de chat do fluxo de fases (ContextWindow + streaming + PhaseManager),
+    incluindo o acionamento do /otimizador_cv_linkedin quando o MENU é liberado
+
+Uso:
+    python benchmarks/bench_e2e.py [--turns 12] [--ttft 0.3] [--tokens-per-second 80]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_llm_server import start_fake_server
+from bench_pdf_extraction import make_pdf
+
+API_KEY = "sk-fake-bench"
+
+
+def timed_stream(generator):
+    """Consome um stream medindo o tempo até o primeiro trecho e o total"""
+    start = time.perf_counter()
+    first = None
+    parts = []
+    for delta in generator:
+        if first is None:
+            first = time.perf_counter() - start
+        parts.append(delta)
+    return "".join(parts), first or 0.0, time.perf_counter() - start
+
+
+def bench_upload(pages):
+    from config import MAX_CV_TEXT_FOR_TRIGGER
+    from prompts import SYSTEM_PROMPT, PromptTemplates
+    from utils import extract_text
+    from engine import stream_response
+    from pipeline import start_profile_analysis
+    from context_window import ContextWindow
+    from chat_history import make_message
+    from cv_normalizer import normalize_cv
+
+    start = time.perf_counter()
+    text = extract_text(make_pdf(pages))
+    extraction = time.perf_counter() - start
+
+    future = start_profile_analysis(text, API_KEY)
+    messages = [make_message("system", SYSTEM_PROMPT),
+                make_message("user", PromptTemplates.cv_upload_trigger(normalize_cv(text).compress(MAX_CV_TEXT_FOR_TRIGGER, "diagnostic")))]
+    window = ContextWindow()
+    reply, ttft, _ = timed_stream(stream_response(window.build(messages, API_KEY), API_KEY))
+    diagnostic_done = time.perf_counter() - start
+    result = future.result()
+    dashboard_ready = time.perf_counter() - start
+    messages.append(make_message("assistant", reply))
+    assert result["ats_data"], "ATS não calculado"
+
+    return {
+        "extração (s)": extraction,
+        "1º token do diagnóstico (s)": extraction + ttft,
+        "diagnóstico completo (s)": diagnostic_done,
+        "dashboard ATS pronto (s)": dashboard_ready,
+    }, messages, window
+
+
+def bench_chat(messages, window, turns):
+    from engine import stream_response
+    from phase_manager import PhaseManager
+    from prompts import PromptTemplates
+    from chat_history import make_message
+
+    manager = PhaseManager()
+    manager.update_phase(cv_content="cv", messages=messages)
+    ttfts, totals, phases = [], [], []
+    for turn in range(turns):
+        phases.append(manager.update_phase(cv_content="cv", messages=messages))
+        if manager.get_phase_value() == "MENU":
+            trigger = PromptTemplates.optimizer_trigger()
+            messages.append(make_message("user", trigger))
+            manager.transition_to_execucao(trigger)
+        else:
+            messages.append(make_message("user", f"Resposta {turn}: meta de R$ 5M, equipe de 12 pessoas."))
+
+        start = time.perf_counter()
+        context = window.build(messages, API_KEY)
+        build = time.perf_counter() - start
+        reply, ttft, _ = timed_stream(stream_response(context, API_KEY))
+        ttfts.append(build + ttft)
+        totals.append(time.perf_counter() - start)
+        messages.append(make_message("assistant", reply))
+    return ttfts, totals, phases
+
+
+def _pct(values, q):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--ttft", type=float, default=0.3)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--reply-tokens", type=int, default=250)
+    args = parser.parse_args()
+
+    server, fake, base_url = start_fake_server(
+        ttft=args.ttft, tokens_per_second=args.tokens_per_second, reply_tokens=args.reply_tokens
+    )
+    # Precisa estar definido antes de importar config/engine
+    os.environ["OPENAI_BASE_URL"] = base_url
+
+    upload, messages, window = bench_upload(args.pages)
+    print(f"UPLOAD ({args.pages} páginas, ttft={args.ttft}s, {args.tokens_per_second} tok/s)")
+    for label, value in upload.items():
+        print(f"  {label:<30} {value:7.3f}")
+
+    ttfts, totals, phases = bench_chat(messages, window, args.turns)
+    print(f"CHAT ({args.turns} turnos) fases: {' → '.join(dict.fromkeys(phases))}")
+    print(f"  {'1º token p50/p95 (s)':<30} {_pct(ttfts, 50):7.3f} / {_pct(ttfts, 95):.3f}")
+    print(f"  {'turno completo p50/p95 (s)':<30} {_pct(totals, 50):7.3f} / {_pct(totals, 95):.3f}")
+    print(f"  {'requisições ao servidor':<30} {fake.requests:7d}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Compara os tiers de modelo (MODEL_TIERS) nas tarefas estruturadas do engine
+
+Para cada tarefa (role, role_keywords, profile) e cada tier, roda os prompts
+reais do engine sobre um conjunto de CVs de referência e mede:
+  - latência p50/p95 por chamada (sem cache, sem retries)
+  - taxa de respostas válidas (mesmos validadores usados no fallback)
+  - concordância com o tier mais forte: cargo igual (sem acento/caixa),
+    Jaccard das keywords e diferença média do Score ATS calculado localmente
+
+Uso:
+    python benchmarks/bench_model_tiers.py [--repeats 3] [--fixtures pasta_com_txt]
+    python benchmarks/bench_model_tiers.py --fake   # servidor local, só para validar o harness
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+FIXTURE_CVS = {
+    "diretor_comercial": """Carlos Mendes
+Diretor Comercial | São Paulo
+Resumo
+Executivo comercial com 18 anos em vendas B2B de tecnologia, gestão de equipes de até 60 pessoas e P&L de R$ 200M.
+Experiência Profissional
+Diretor Comercial — TechSul (2019-atual)
+• Estruturou o pipeline comercial e o forecast trimestral; crescimento de 35% a.a.
+• Liderou key accounts e negociação de contratos acima de R$ 10M.
+Gerente de Vendas — DataCorp (2012-2019)
+• Implantou CRM Salesforce e KPIs de conversão por etapa.
+Formação
+MBA Executivo — FGV
+Idiomas
+Inglês fluente""",
+    "engenheira_dados": """Ana Ribeiro
+Engenheira de Dados Sênior
+Resumo
+Engenheira de dados com 9 anos construindo pipelines em Python, Spark e Airflow na AWS.
+Experiência
+Engenheira de Dados Sênior — FinBank (2020-atual)
+• Migração do data lake para Delta Lake; redução de 40% no custo de processamento.
+• Modelagem dimensional e dbt para o time de analytics.
+Engenheira de Dados — Varejo+ (2016-2020)
+• Streaming com Kafka e monitoramento de qualidade de dados.
+Competências
+Python, SQL, Spark, Airflow, dbt, Kafka, AWS, Terraform""",
+    "gerente_rh": """Juliana Costa
+Gerente de Recursos Humanos
+Perfil
+Profissional de RH com 12 anos em business partner, remuneração e desenvolvimento organizacional.
+Experiência Profissional
+Gerente de RH — Indústrias Alfa (2018-atual)
+• Conduziu reestruturação de cargos e salários para 3.000 colaboradores.
+• Implantou avaliação de desempenho 360º e programa de sucessão.
+Coordenadora de RH — LogBR (2013-2018)
+• Relações sindicais, clima organizacional e onboarding.
+Formação
+Psicologia — USP; MBA em Gestão de Pessoas — FIA""",
+    "cfo": """Roberto Almeida
+CFO | Diretor Financeiro
+Resumo
+Executivo financeiro com experiência em M&A, IPO e reestruturação de dívida.
+Experiência
+CFO — Grupo Horizonte (2017-atual)
+• Liderou IPO na B3 e captação de R$ 1,2 bi em debêntures.
+• Implantou planejamento financeiro (FP&A) e governança com o conselho.
+Controller — Energia Sul (2010-2017)
+• Consolidação IFRS, auditoria e tesouraria.
+Certificações
+CFA; CPA-20""",
+}
+
+TASKS = ("role", "role_keywords", "profile")
+
+
+def load_fixtures(path):
+    """Lê os CVs de referência (.txt) de um diretório ou usa os embutidos"""
+    if not path:
+        return dict(FIXTURE_CVS)
+    return {p.stem: p.read_text(encoding="utf-8") for p in sorted(Path(path).glob("*.txt"))}
+
+
+def build_request(task, cv_text, role):
+    """
+    Monta mensagens e parâmetros exatamente como o engine/batch_api
+
+    Returns:
+        tuple: (mensagens, parâmetros, validador)
+    """
+    from config import MAX_CV_TEXT_LENGTH, MAX_CV_TEXT_LENGTH_ATS
+    from prompts import PromptTemplates
+    from cv_normalizer import normalize_cv
+    from engine import (
+        PROFILE_ANALYSIS_SCHEMA, ROLE_KEYWORDS_SCHEMA, parse_profile_analysis, parse_role_keywords,
+    )
+
+    cv = normalize_cv(cv_text)
+    if task == "role":
+        prompt = PromptTemplates.role_extraction_prompt(cv.compress(MAX_CV_TEXT_LENGTH, "role"))
+        return [{"role": "user", "content": prompt}], {"temperature": 0.3}, lambda c: c.strip().strip('"')
+    if task == "role_keywords":
+        prompt = PromptTemplates.role_keywords_prompt(role)
+        params = {"temperature": 0.2, "response_format": {"type": "json_schema", "json_schema": ROLE_KEYWORDS_SCHEMA}}
+        return [{"role": "user", "content": prompt}], params, parse_role_keywords
+    prompt = PromptTemplates.profile_analysis_prompt(cv.compress(MAX_CV_TEXT_LENGTH_ATS, "ats"))
+    params = {"temperature": 0.2, "response_format": {"type": "json_schema", "json_schema": PROFILE_ANALYSIS_SCHEMA}}
+    return [{"role": "user", "content": prompt}], params, parse_profile_analysis
+
+
+def run_tier(backend, model, task, fixtures, repeats):
+    """
+    Executa uma tarefa em um modelo
+
+    Returns:
+        tuple: (latências, nº de respostas inválidas, {cv_id: última saída válida})
+    """
+    latencies, invalid, outputs = [], 0, {}
+    for cv_id, cv_text in fixtures.items():
+        messages, params, parse = build_request(task, cv_text, role=cv_id.replace("_", " "))
+        for _ in range(repeats):
+            start = time.perf_counter()
+            content = backend.complete(messages, model=model, **params)
+            latencies.append(time.perf_counter() - start)
+            try:
+                outputs[cv_id] = parse(content)
+            except (ValueError, KeyError, TypeError):
+                invalid += 1
+    return latencies, invalid, outputs
+
+
+def _keywords(output):
+    return output if isinstance(output, list) else output["keywords"]
+
+
+def agreement(task, outputs, reference, fixtures):
+    """
+    Concordância de um tier com o de referência
+
+    Returns:
+        dict: role (fração de cargos iguais), jaccard (keywords) e ats_delta (pontos)
+    """
+    from ats_matcher import fold, score_keywords
+
+    roles, jaccards, deltas = [], [], []
+    for cv_id, ref in reference.items():
+        out = outputs.get(cv_id)
+        if out is None:
+            continue
+        if task == "role":
+            roles.append(fold(out) == fold(ref))
+            continue
+        a, b = {fold(k) for k in _keywords(out)}, {fold(k) for k in _keywords(ref)}
+        jaccards.append(len(a & b) / len(a | b) if a | b else 1.0)
+        if task == "profile":
+            roles.append(fold(out["target_role"]) == fold(ref["target_role"]))
+            deltas.append(abs(score_keywords(fixtures[cv_id], out["keywords"])["ats_score"]
+                              - score_keywords(fixtures[cv_id], ref["keywords"])["ats_score"]))
+    mean = lambda values: statistics.mean(values) if values else None
+    return {"role": mean(roles), "jaccard": mean(jaccards), "ats_delta": mean(deltas)}
+
+
+def _fmt(value, pattern):
+    return "—" if value is None else pattern.format(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3, help="Chamadas por CV e tier")
+    parser.add_argument("--fixtures", help="Diretório com CVs de referência em .txt")
+    parser.add_argument("--tasks", nargs="+", default=list(TASKS), choices=TASKS)
+    parser.add_argument("--fake", action="store_true", help="Usa o servidor local (benchmarks/fake_llm_server.py)")
+    args = parser.parse_args()
+
+    api_key = None
+    if args.fake:
+        from fake_llm_server import start_fake_server
+        _, _, base_url = start_fake_server(ttft=0.05, tokens_per_second=400)
+        os.environ["OPENAI_BASE_URL"] = base_url  # Antes de importar config
+        api_key = "sk-fake-bench"
+
+    from config import MODEL_TIERS, MODEL_TIER_ORDER, get_api_key
+    from llm_backend import get_backend
+
+    api_key = api_key or get_api_key()
+    if not api_key:
+        parser.error("OPENAI_API_KEY não encontrada (configure o .env ou use --fake)")
+    backend = get_backend(api_key)
+    fixtures = load_fixtures(args.fixtures)
+    reference_tier = MODEL_TIER_ORDER[-1]
+
+    print(f"{len(fixtures)} CVs × {args.repeats} repetições; referência: {reference_tier} ({MODEL_TIERS[reference_tier]})")
+    print(f"{'tarefa':<14} {'tier':<10} {'modelo':<16} {'p50 (s)':>8} {'p95 (s)':>8} {'inválidas':>10} "
+          f"{'cargo =':>8} {'jaccard':>8} {'Δ ATS':>6}")
+    for task in args.tasks:
+        results = {tier: run_tier(backend, MODEL_TIERS[tier], task, fixtures, args.repeats) for tier in MODEL_TIER_ORDER}
+        reference = results[reference_tier][2]
+        for tier in MODEL_TIER_ORDER:
+            latencies, invalid, outputs = results[tier]
+            agree = agreement(task, outputs, reference, fixtures)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(f"{task:<14} {tier:<10} {MODEL_TIERS[tier]:<16} {statistics.median(latencies):>8.3f} {p95:>8.3f} "
+                  f"{invalid:>4}/{len(latencies):<5} {_fmt(agree['role'], '{:.0%}'):>8} "
+                  f"{_fmt(agree['jaccard'], '{:.2f}'):>8} {_fmt(agree['ats_delta'], '{:.1f}'):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Microbenchmark: overhead por chamada com cliente novo vs cliente compartilhado
+
+Sobe um servidor HTTP local que responde como /v1/chat/completions e mede o
+tempo por chamada em dois cenários:
+  - "por chamada": openai.OpenAI(...) criado a cada requisição (comportamento antigo)
+  - "compartilhado": llm_backend.get_client (pool keep-alive reutilizado)
+
+O servidor local é HTTP puro, então o ganho medido aqui é só construção do
+cliente + conexão TCP; em produção (HTTPS) o handshake TLS aumenta a diferença.
+
+Uso:
+    python benchmarks/bench_openai_client.py [--calls 200]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "ok"},
+        "finish_reason": "stop",
+    }],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+    connections = set()
+
+    def do_POST(self):
+        _StubHandler.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _measure(call, n):
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    import openai
+    from llm_backend import get_client
+
+    messages = [{"role": "user", "content": "ping"}]
+
+    def per_call():
+        client = openai.OpenAI(api_key="sk-bench")
+        client.chat.completions.create(model="gpt-4o", messages=messages)
+        client.close()
+
+    def shared():
+        get_client("sk-bench").chat.completions.create(model="gpt-4o", messages=messages)
+
+    # Aquecimento (imports preguiçosos do SDK, primeira conexão)
+    per_call()
+    shared()
+
+    for label, call in (("por chamada", per_call), ("compartilhado", shared)):
+        _StubHandler.connections.clear()
+        timings = _measure(call, args.calls)
+        print(
+            f"{label:>14}: média {statistics.mean(timings):7.3f} ms | "
+            f"p50 {statistics.median(timings):7.3f} ms | "
+            f"p95 {statistics.quantiles(timings, n=20)[-1]:7.3f} ms | "
+            f"conexões TCP abertas: {len(_StubHandler.connections)}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark da extração de texto de PDFs com número crescente de páginas
+
+Compara a implementação antiga (extract_text chamado duas vezes por página,
+serial) com utils.extract_text (uma extração por página, blocos paralelos no
+pool de processos a partir de PDF_PARALLEL_MIN_PAGES).
+
+Os PDFs são gerados em memória, sem dependências extras.
+
+Uso:
+    python benchmarks/bench_pdf_extraction.py [--pages 1 4 8 16 32] [--repeat 3]
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pdfplumber
+
+LINES_PER_PAGE = 45
+
+
+def make_pdf(page_count):
+    """Gera um PDF simples (Helvetica, texto denso) com page_count páginas"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, preenchido depois
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for p in range(page_count):
+        lines = [
+            f"({'Cabecalho Nobile - Curriculo Executivo' if i == 0 else f'Pagina {p + 1} linha {i}: gestao de equipes, vendas B2B, KPIs e P&L'}) Tj 0 -15 Td"
+            for i in range(LINES_PER_PAGE)
+        ]
+        stream = ("BT /F1 10 Tf 40 800 Td " + " ".join(lines) + " ET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def legacy_extract_text(data):
+    """Implementação anterior: extract_text() duas vezes por página, serial"""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return "\n".join([p.extract_text() for p in pdf.pages if p.extract_text()])
+
+
+def _time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from utils import extract_text, iter_pages
+
+    # Aquece o pool de processos para não medir o spawn dos workers
+    extract_text(make_pdf(max(args.pages)), max_pages=None, max_bytes=None)
+
+    print(f"{'páginas':>8} | {'antigo (ms)':>12} | {'novo (ms)':>10} | {'1ª página (ms)':>14} | {'ganho':>6}")
+    for page_count in args.pages:
+        data = make_pdf(page_count)
+        assert legacy_extract_text(data) == extract_text(data, max_pages=None, max_bytes=None)
+
+        legacy_ms = _time(lambda: legacy_extract_text(data), args.repeat)
+        new_ms = _time(lambda: extract_text(data, max_pages=None, max_bytes=None), args.repeat)
+        first_page_ms = _time(lambda: next(iter_pages(data, max_pages=None, max_bytes=None)), args.repeat)
+        print(f"{page_count:>8} | {legacy_ms:>12.1f} | {new_ms:>10.1f} | {first_page_ms:>14.1f} | {legacy_ms / new_ms:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
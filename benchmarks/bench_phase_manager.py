@@ -0,0 +1,83 @@
+"""
+Benchmark do PhaseManager.update_phase em históricos longos
+
+Compara o custo por rerun do Streamlit:
+  - "antigo": reescaneia todo o histórico (upper() + any() por keyword) a cada rerun
+  - "incremental": PhaseManager atual, que só observa mensagens novas
+
+Uso:
+    python benchmarks/bench_phase_manager.py [--sizes 1000 2000 5000 10000] [--reruns 200]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import FSM_TRIGGER_KEYWORDS
+from phase_manager import PhaseManager, Phase
+from prompts import SYSTEM_PROMPT, PromptTemplates
+
+
+def make_history(size):
+    """Histórico típico: system, trigger do CV, e pares user/assistant longos"""
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": PromptTemplates.cv_upload_trigger("CV " * 1000)},
+    ]
+    while len(messages) < size:
+        messages.append({"role": "assistant", "content": "Seção reescrita da experiência profissional. " * 40})
+        messages.append({"role": "user", "content": "Resposta do usuário com métricas: R$ 2M, +35%."})
+    return messages[:size]
+
+
+def legacy_count_user_ai_pairs(messages):
+    """Contagem original: upper() e any() por mensagem a cada chamada"""
+    count = 0
+    for msg in messages:
+        if msg.get("role") == "system":
+            continue
+        content = str(msg.get("content", "")).upper()
+        if any(keyword.upper() in content for keyword in FSM_TRIGGER_KEYWORDS):
+            continue
+        if msg.get("role") in ["user", "assistant"]:
+            count += 1
+    return count // 2
+
+
+def bench_legacy(messages, reruns):
+    start = time.perf_counter()
+    for _ in range(reruns):
+        legacy_count_user_ai_pairs(messages)
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+def bench_incremental(messages, reruns):
+    manager = PhaseManager()
+    manager.update_phase(cv_content="cv", messages=messages)  # Primeira observação (uma vez por sessão)
+    manager.current_phase = Phase.DIAGNOSTICO_EM_ANDAMENTO  # Força o ramo que contava pares
+    start = time.perf_counter()
+    for _ in range(reruns):
+        manager.update_phase(cv_content="cv", messages=messages)
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000])
+    parser.add_argument("--reruns", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'mensagens':>10} | {'antigo (ms/rerun)':>18} | {'incremental (ms/rerun)':>22}")
+    for size in args.sizes:
+        messages = make_history(size)
+        assert PhaseManager().count_user_ai_pairs(messages) == legacy_count_user_ai_pairs(messages)
+        legacy_ms = bench_legacy(messages, max(1, args.reruns // 10))
+        incremental_ms = bench_incremental(messages, args.reruns)
+        print(f"{size:>10} | {legacy_ms:>18.3f} | {incremental_ms:>22.5f}")
+
+
+if __name__ == "__main__":
+    main()
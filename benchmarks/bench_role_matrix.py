@@ -0,0 +1,93 @@
+"""
+Score ATS de muitos CVs contra muitos cargos: matriz vetorizada vs. um score_keywords por par
+
+Gera CVs e cargos sintéticos (vocabulário compartilhado, keywords de uma e de
+várias palavras) e mede:
+  - baseline: score_keywords(cv, keywords_do_cargo) para cada par (amostra, extrapolada)
+  - matriz: RoleCatalog (uma varredura por CV + um produto matricial)
+e confere que os scores das duas abordagens são idênticos na amostra.
+
+Uso:
+    python benchmarks/bench_role_matrix.py [--cvs 1000] [--roles 100] [--keywords 25] [--sample 50]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ats_matcher import score_keywords
+from role_catalog import RoleCatalog
+
+_SYLLABLES = ["ges", "tao", "dados", "ven", "das", "fin", "an", "ca", "pro", "je", "to", "li", "der", "ope", "ra",
+              "cao", "mar", "ke", "ting", "tec", "no", "lo", "gia", "plan", "ne", "ja", "men", "con", "tra"]
+
+
+def _word(rng):
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def build_dataset(n_cvs, n_roles, keywords_per_role, seed=42):
+    """
+    Cargos e CVs sintéticos
+
+    Returns:
+        tuple: ({cargo: keywords}, [textos de CV])
+    """
+    rng = random.Random(seed)
+    vocabulary = sorted({_word(rng) for _ in range(4000)})
+    phrases = [" ".join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(1500)]
+    roles = {f"Cargo {i:03d}": rng.sample(phrases, keywords_per_role) for i in range(n_roles)}
+    cvs = []
+    for _ in range(n_cvs):
+        words = rng.choices(vocabulary, k=rng.randint(400, 900))
+        for phrase in rng.sample(phrases, rng.randint(20, 80)):
+            words.insert(rng.randrange(len(words) + 1), phrase)
+        cvs.append(" ".join(words))
+    return roles, cvs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cvs", type=int, default=1000)
+    parser.add_argument("--roles", type=int, default=100)
+    parser.add_argument("--keywords", type=int, default=25, help="Keywords por cargo")
+    parser.add_argument("--sample", type=int, default=50, help="CVs medidos no baseline (extrapolado para --cvs)")
+    args = parser.parse_args()
+
+    roles, cvs = build_dataset(args.cvs, args.roles, args.keywords)
+    role_names = list(roles)
+    print(f"{args.cvs} CVs × {args.roles} cargos ({args.keywords} keywords por cargo)")
+
+    sample = cvs[:args.sample]
+    start = time.perf_counter()
+    baseline = [[score_keywords(cv, roles[r])["ats_score"] for r in role_names] for cv in sample]
+    baseline_time = (time.perf_counter() - start) * len(cvs) / len(sample)
+
+    start = time.perf_counter()
+    catalog = RoleCatalog(roles)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    presence = catalog.presence(cvs)
+    scan_time = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = catalog.scores(presence)
+    matmul_time = time.perf_counter() - start
+    matrix_time = build_time + scan_time + matmul_time
+
+    mismatches = sum(
+        int(scores[i, j]) != baseline[i][j] for i in range(len(sample)) for j in range(len(role_names))
+    )
+    print(f"{'abordagem':<34} {'tempo (s)':>10} {'pares/s':>12}")
+    print(f"{'score_keywords por par (extrap.)':<34} {baseline_time:>10.2f} {len(cvs) * len(role_names) / baseline_time:>12,.0f}")
+    print(f"{'matriz (índice+varredura+matmul)':<34} {matrix_time:>10.2f} {len(cvs) * len(role_names) / matrix_time:>12,.0f}")
+    print(f"  índice {build_time * 1000:.1f} ms | varredura {scan_time:.2f} s | produto {matmul_time * 1000:.1f} ms "
+          f"| vocabulário {len(catalog.keywords)} keywords")
+    print(f"speedup: {baseline_time / matrix_time:.1f}x | divergências na amostra: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Servidor local que imita o endpoint /v1/chat/completions da OpenAI
+
+Permite medir a latência do lado da aplicação sem API key real. Suporta:
+  - respostas completas e streaming (SSE, "stream": true)
+  - JSON mode ("json_object") e structured outputs ("json_schema", gerado a partir do schema)
+  - latência configurável: tempo até o primeiro token e tokens por segundo
+
+Uso standalone:
+    python benchmarks/fake_llm_server.py --port 8765 --ttft 0.4 --tokens-per-second 80
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=sk-fake streamlit run app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROLE_REPLY = "Gerente Comercial"
+SAMPLE_KEYWORDS = [
+    "Gestão de equipes", "Vendas B2B", "Negociação", "CRM", "Forecast", "KPIs",
+    "Pipeline comercial", "P&L", "Key Account", "Prospecção", "Estratégia comercial", "Inglês fluente",
+]
+SAMPLE_ATS = {
+    "ats_score": 64,
+    "keywords_present": SAMPLE_KEYWORDS[:6],
+    "keywords_missing": SAMPLE_KEYWORDS[6:],
+    "recomendacoes": ["Quantifique resultados", "Inclua P&L", "Destaque Key Accounts"],
+}
+FILLER = (
+    "Entendi. Atuarei como especialista em Vendas. Para traçarmos a estratégia, responda: "
+    "P1 (Objetivo), P2 (Cargos Específicos), P3 (Pretensão Realista), P4 (Localização). "
+)
+
+
+class FakeLLMConfig:
+    """Parâmetros de latência e tamanho das respostas do servidor"""
+
+    def __init__(self, ttft=0.3, tokens_per_second=80.0, reply_tokens=250):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def _value_for_schema(schema, name=""):
+    """Gera um valor de exemplo compatível com um JSON schema simples"""
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: _value_for_schema(sub, key) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        if name.startswith("recomend"):
+            return SAMPLE_ATS["recomendacoes"]
+        return SAMPLE_KEYWORDS
+    if kind in ("integer", "number"):
+        return SAMPLE_ATS["ats_score"]
+    if kind == "boolean":
+        return True
+    return ROLE_REPLY if "role" in name or "cargo" in name else "ok"
+
+
+def build_reply(body, config):
+    """
+    Escolhe o conteúdo da resposta a partir da requisição
+
+    Returns:
+        str: Conteúdo da mensagem do assistente
+    """
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return json.dumps(_value_for_schema(response_format["json_schema"]["schema"]), ensure_ascii=False)
+    if response_format.get("type") == "json_object":
+        return json.dumps(SAMPLE_ATS, ensure_ascii=False)
+    last = str(body.get("messages", [{}])[-1].get("content", ""))
+    if "nome do cargo" in last:
+        return ROLE_REPLY
+    words = (FILLER * (config.reply_tokens // 20 + 1)).split(" ")
+    limit = min(config.reply_tokens, body.get("max_tokens") or config.reply_tokens)
+    return " ".join(words[:limit])
+
+
+def _tokens(text):
+    """Divide o texto em "tokens" (palavras com o espaço seguinte)"""
+    parts = text.split(" ")
+    return [p + (" " if i < len(parts) - 1 else "") for i, p in enumerate(parts)]
+
+
+def make_handler(config):
+    """Cria a classe de handler ligada a uma configuração"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Rota desconhecida: {self.path}"}})
+                return
+            with config.lock:
+                config.requests += 1
+
+            reply = build_reply(body, config)
+            tokens = _tokens(reply)
+            model = body.get("model", "fake")
+            delay = 1.0 / config.tokens_per_second if config.tokens_per_second else 0.0
+            time.sleep(config.ttft)
+
+            if not body.get("stream"):
+                time.sleep(delay * len(tokens))
+                self._send_json(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+                })
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def event(payload):
+                data = f"data: {payload}\n\n".encode()
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+            try:
+                for i, token in enumerate(tokens):
+                    if i:
+                        time.sleep(delay)
+                    event(json.dumps({**base, "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}))
+                event(json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+                event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # Cliente cancelou o stream
+
+    return Handler
+
+
+def start_fake_server(host="127.0.0.1", port=0, **config_kwargs):
+    """
+    Sobe o servidor em uma thread daemon
+
+    Args:
+        host: Interface de escuta
+        port: Porta (0 = porta livre)
+        **config_kwargs: ttft, tokens_per_second, reply_tokens
+
+    Returns:
+        tuple: (servidor, configuração, base_url para OPENAI_BASE_URL)
+    """
+    config = FakeLLMConfig(**config_kwargs)
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, config, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", type=float, default=0.3, help="Segundos até o primeiro token")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--reply-tokens", type=int, default=250, help="Tamanho das respostas de texto livre")
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(args.ttft, args.tokens_per_second, args.reply_tokens)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    print(f"Servidor fake em http://{args.host}:{args.port}/v1 (Ctrl+C para encerrar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Histórico do chat: mensagens classificadas uma única vez e janela de exibição incremental
+"""
+
+from phase_manager import classify_message, MessageKind
+
+
+def make_message(role, content):
+    """
+    Cria uma mensagem já classificada (o tipo é calculado uma vez, ao anexar)
+
+    Args:
+        role: "system", "user" ou "assistant"
+        content: Conteúdo da mensagem
+
+    Returns:
+        dict: Mensagem com 'role', 'content', 'kind' e 'hidden'
+    """
+    kind = classify_message({"role": role, "content": content})
+    return {"role": role, "content": content, "kind": kind.value, "hidden": kind != MessageKind.CHAT}
+
+
+def is_hidden(message):
+    """Mensagens de sistema e triggers internos não aparecem no chat"""
+    hidden = message.get("hidden")
+    if hidden is None:  # Mensagem sem classificação prévia
+        hidden = classify_message(message) != MessageKind.CHAT
+    return hidden
+
+
+class ChatHistoryView:
+    """
+    Índice incremental das mensagens visíveis do histórico
+
+    Cada rerun só examina as mensagens anexadas desde o último, e a renderização
+    se limita a uma janela das mensagens visíveis mais recentes.
+    """
+
+    def __init__(self):
+        self.visible = []  # Índices (no histórico) das mensagens visíveis
+        self.scanned = 0
+
+    def sync(self, messages):
+        """
+        Indexa apenas as mensagens novas do histórico
+
+        Args:
+            messages: Histórico completo (append-only)
+        """
+        if len(messages) < self.scanned:
+            self.visible, self.scanned = [], 0
+        for i in range(self.scanned, len(messages)):
+            if not is_hidden(messages[i]):
+                self.visible.append(i)
+        self.scanned = len(messages)
+
+    def window(self, messages, limit):
+        """
+        Retorna as mensagens visíveis mais recentes
+
+        Args:
+            messages: Histórico completo
+            limit: Número máximo de mensagens a exibir
+
+        Returns:
+            tuple: (mensagens a exibir, quantidade de mensagens visíveis omitidas)
+        """
+        self.sync(messages)
+        shown = self.visible[-limit:] if limit else []
+        return [messages[i] for i in shown], len(self.visible) - len(shown)
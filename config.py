@@ -3,6 +3,8 @@ Configuração e constantes da aplicação Nobile Career Strategy
 """
 
 import os
+from functools import lru_cache
+
 import streamlit as st
 from dotenv import load_dotenv
 
@@ -14,6 +16,141 @@ MAX_CV_TEXT_FOR_TRIGGER = 4000  # Máximo de caracteres do CV enviados no trigge
 MAX_CV_TEXT_LENGTH = 2000  # Máximo de caracteres do CV para extração de cargo
 MAX_CV_TEXT_LENGTH_ATS = 3000  # Máximo de caracteres do CV para cálculo ATS
 
+# --- NORMALIZAÇÃO DO CV (cv_normalizer.py) ---
+# Peso de cada seção ao dividir o orçamento de caracteres de um prompt (0 = omitida; ausente = 1)
+CV_SECTION_WEIGHTS = {
+    "role": {"header": 2, "summary": 3, "experience": 4, "skills": 1, "education": 1,
+             "languages": 0, "certifications": 0, "other": 0},
+    "ats": {"header": 1, "summary": 2, "experience": 4, "skills": 3, "education": 1,
+            "languages": 1, "certifications": 1, "other": 0},
+    "diagnostic": {"header": 1, "summary": 2, "experience": 5, "skills": 2, "education": 1,
+                   "languages": 1, "certifications": 1, "other": 1},
+}
+
+# --- EXTRAÇÃO DE PDF ---
+PDF_MAX_BYTES = 10 * 1024 * 1024  # Uploads acima deste tamanho são recusados antes do parsing
+PDF_MAX_PAGES = 40  # Documentos com mais páginas são recusados (CVs executivos raramente passam de 10)
+PDF_PARALLEL_MIN_PAGES = 8  # A partir deste número de páginas a extração usa o pool de processos
+PDF_PAGES_PER_CHUNK = 4  # Páginas processadas por tarefa no pool
+PDF_EXTRACTION_WORKERS = None  # Processos do pool (None = número de CPUs)
+
+# --- CLIENTE OPENAI (pool de conexões compartilhado) ---
+OPENAI_MODEL = "gpt-4o"  # Modelo usado em todas as chamadas
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")  # Backend registrado em llm_backend.py
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # Servidor compatível (ex: benchmarks/fake_llm_server.py); None = OpenAI
+OPENAI_TIMEOUT_SECONDS = 60.0  # Timeout total de leitura de uma requisição
+OPENAI_CONNECT_TIMEOUT_SECONDS = 5.0  # Timeout para abrir conexão TCP/TLS
+OPENAI_MAX_CONNECTIONS = 20  # Máximo de conexões simultâneas por API key
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 10  # Conexões ociosas mantidas abertas (keep-alive)
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = 60.0  # Tempo que uma conexão ociosa fica no pool
+
+# --- ROTEAMENTO DE MODELOS POR TAREFA (ver model_router.py e benchmarks/bench_model_tiers.py) ---
+MODEL_TIERS = {
+    "fast": os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini"),
+    "standard": OPENAI_MODEL,
+}
+MODEL_TIER_ORDER = ["fast", "standard"]  # Do mais barato ao mais forte (ordem do fallback)
+TASK_MODEL_TIERS = {
+    "role": "fast",  # Extração de cargo isolada (Batch API)
+    "role_keywords": "fast",  # Lista de keywords de um cargo
+    "summary": "fast",  # Resumo das mensagens antigas do chat
+    "profile": "standard",  # Cargo + keywords ATS a partir do CV
+    "chat": "standard",  # Diagnóstico e conversa
+    "execution": "standard",  # ETAPA 4/5: reescrita do CV/LinkedIn e arquivo final
+}
+MODEL_FALLBACK_ENABLED = True  # JSON inválido de um tier barato é refeito no tier seguinte
+
+# --- RESILIÊNCIA DAS CHAMADAS DE IA (por tipo de chamada, ver resilience.py) ---
+# timeout: deadline de relógio de cada tentativa, stream inteiro incluído (s)
+# read_timeout: espera máxima por cada leitura da conexão (s, padrão: timeout)
+# max_retries: novas tentativas em 429/5xx/timeout
+# backoff_base/backoff_max: backoff exponencial com jitter (s) | hedge: 2ª requisição ao passar do p95
+# priority: fila do agendador de rate limit ("interactive" passa à frente de "background")
+LLM_CALL_POLICIES = {
+    "chat": {"timeout": 300.0, "read_timeout": 60.0, "max_retries": 2, "backoff_base": 0.5, "backoff_max": 8.0,
+             "hedge": False, "priority": "interactive"},
+    "profile": {"timeout": 30.0, "max_retries": 3, "backoff_base": 0.5, "backoff_max": 8.0, "hedge": True,
+                "priority": "background"},
+    "role_keywords": {"timeout": 20.0, "max_retries": 3, "backoff_base": 0.5, "backoff_max": 8.0, "hedge": True,
+                      "priority": "background"},
+    "summary": {"timeout": 30.0, "max_retries": 1, "backoff_base": 0.5, "backoff_max": 4.0, "hedge": False,
+                "priority": "interactive"},
+    # ETAPA 4/5: reescrita completa do CV/LinkedIn e arquivo final (saídas longas)
+    "execution": {"timeout": 600.0, "read_timeout": 60.0, "max_retries": 2, "backoff_base": 0.5, "backoff_max": 8.0,
+                  "hedge": False, "priority": "interactive"},
+    # Especulação reaproveitada por um clique vira a resposta da ETAPA: mesmo prazo total da execução
+    "speculation": {"timeout": 600.0, "read_timeout": 60.0, "max_retries": 0, "backoff_base": 0.5,
+                    "backoff_max": 4.0, "hedge": False, "priority": "background"},
+}
+LLM_HEDGE_MIN_SAMPLES = 20  # Amostras de latência necessárias antes de usar o p95 para hedging
+LLM_HEDGE_MAX_WORKERS = 16  # Threads para requisições hedged
+
+# --- RATE LIMIT (orçamento compartilhado por API key, ver rate_limiter.py) ---
+RATE_LIMIT_ENABLED = True  # False desliga o agendador (ex: chaves com limites muito altos)
+RATE_LIMIT_RPM = int(os.getenv("OPENAI_RPM_LIMIT", "500"))  # Requisições por minuto da API key
+RATE_LIMIT_TPM = int(os.getenv("OPENAI_TPM_LIMIT", "30000"))  # Tokens por minuto da API key
+RATE_LIMIT_COMPLETION_TOKENS = 1000  # Tokens de saída reservados quando a chamada não define max_tokens
+
+# --- PIPELINE DE UPLOAD ---
+UPLOAD_PIPELINE_MAX_WORKERS = 8  # Threads para chamadas de IA em segundo plano (cargo + ATS)
+ATS_POLL_INTERVAL_SECONDS = 0.5  # Intervalo de atualização do ATS pendente (parcial, em streaming) no dashboard
+# ATS incremental: keyword em frase negada pelo usuário ("não tenho experiência com SQL") não conta.
+# "no" fica de fora: em português é a contração de "em" + "o" ("dashboards no Power BI")
+ATS_NEGATION_WORDS = ("não", "nunca", "sem", "nem", "nenhum", "nenhuma", "jamais", "never", "not", "without")
+ATS_NEGATION_WINDOW_TOKENS = 4  # Tokens antes da keyword (na mesma frase) onde a negação é procurada
+
+# --- PROCESSAMENTO EM LOTE (batch_cli.py) ---
+BATCH_EXTRACTION_WORKERS = None  # Processos para extração de PDF (None = número de CPUs)
+BATCH_LLM_WORKERS = 8  # Chamadas de IA simultâneas
+
+# --- COMPARAÇÃO ENTRE CARGOS (role_catalog.py) ---
+ROLE_COMPARISON_MAX_ROLES = 10  # Cargos comparados de uma vez no dashboard
+ROLE_COMPARISON_WORKERS = 4  # Listas de keywords de cargos novos buscadas em paralelo
+ROLE_KEYWORDS_MEMORY_ITEMS = 1024  # Cargos com keywords em memória (LRU por processo; o llm_cache guarda em disco)
+
+# --- DIRETÓRIO DOS BANCOS LOCAIS (caches e sessões, SQLite) ---
+# Ancorado na pasta do projeto, não no diretório de onde o app é iniciado; CACHE_DIR no .env muda o local
+CACHE_DIR = os.path.abspath(os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")))
+
+# --- CACHE DE PROCESSAMENTO DE CV (por conteúdo do PDF) ---
+CV_CACHE_PATH = os.path.join(CACHE_DIR, "cv_cache.sqlite3")  # Armazenamento em disco (SQLite)
+CV_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Tamanho máximo; entradas menos usadas recentemente são removidas
+CV_CACHE_VERSION = "3"  # Incrementar ao alterar prompts de análise/diagnóstico (invalida o cache)
+
+# --- CACHE DE RESPOSTAS DA IA (por modelo + mensagens + parâmetros, ver llm_cache.py) ---
+# TTL em segundos por tipo de chamada; tipos ausentes (ex: "chat") não são cacheados
+LLM_CACHE_TTL_SECONDS = {
+    "profile": 7 * 24 * 3600,
+    "role_keywords": 30 * 24 * 3600,
+    "summary": 24 * 3600,
+}
+LLM_CACHE_MEMORY_ITEMS = 512  # Entradas no LRU em memória (por processo)
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite3")  # Camada em disco (SQLite)
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Tamanho máximo da camada em disco (remoção LRU)
+
+# --- SESSÕES PERSISTENTES (restauradas por ?sid= na URL) ---
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", os.path.join(CACHE_DIR, "sessions.sqlite3"))  # Disco local de um único host (WAL)
+SESSION_STORE_TTL_SECONDS = 7 * 24 * 3600  # Sessões sem atividade por mais tempo são removidas
+
+# --- JANELA DE CONTEXTO DO CHAT (orçamento de tokens por turno) ---
+CONTEXT_MAX_INPUT_TOKENS = 16000  # Máximo de tokens de entrada enviados por turno
+CONTEXT_SUMMARY_MAX_TOKENS = 800  # Tamanho máximo do resumo incremental das mensagens antigas
+CONTEXT_RECENT_KEEP_RATIO = 0.6  # Ao estourar o orçamento, mantém só esta fração de mensagens recentes (evita resumir a cada turno)
+
+# --- SINGLE-FLIGHT DAS RESPOSTAS DO CHAT (ver single_flight.py) ---
+SINGLE_FLIGHT_MAX_ACTIVE = 64  # Streams de resposta simultâneos no processo; acima disso a chamada falha na hora
+SINGLE_FLIGHT_STALL_TIMEOUT_SECONDS = 120  # Espera máxima por um novo trecho antes de desistir da resposta
+SINGLE_FLIGHT_MAX_ENTRIES = 4  # Chamadas recentes mantidas por sessão para reaproveitamento
+
+# --- PRÉ-GERAÇÃO ESPECULATIVA DO MENU (ver speculation.py) ---
+SPECULATION_ENABLED = False  # Gera em segundo plano as respostas dos botões do MENU antes do clique
+SPECULATION_MAX_OUTPUT_TOKENS = 4000  # Especulações não usadas são interrompidas ao passar deste tamanho
+SPECULATION_SESSION_TOKEN_BUDGET = 60000  # Teto de tokens (entrada + saída) especulados por sessão
+SPECULATION_MAX_WORKERS = 4  # Threads de especulação no processo
+
+# --- HISTÓRICO DO CHAT ---
+CHAT_HISTORY_WINDOW = 30  # Mensagens visíveis renderizadas por rerun (as anteriores sob demanda)
+
 # --- CONSTANTES FSM (Finite State Machine) ---
 FSM_MIN_MESSAGE_PAIRS_FOR_MENU = 4  # Mínimo de pares user-AI para liberar menu
 FSM_MIN_AI_MESSAGES_FOR_DIAGNOSTICO_EM_ANDAMENTO = 1  # Mínimo de mensagens AI após diagnóstico
@@ -26,15 +163,19 @@ FSM_TRIGGER_KEYWORDS = ["O USUÁRIO SUBIU", "ACIONOU"]
 # Nota: "ACIONOU" aparece em ambas as listas intencionalmente - marca mensagens que são triggers E podem iniciar execução
 FSM_COMMAND_KEYWORDS = ["ACIONOU", "/otimizador_cv_linkedin", "ETAPA 5: ARQUIVO MESTRE"]
 
+# Primeira ETAPA do otimizador respondida com o tier/política "execution" (ETAPA 1-3 são perguntas e respostas)
+FSM_EXECUTION_MIN_ETAPA = 4
+
+# --- ASSETS ---
+SIDEBAR_LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "sidebar_logo.png")
+
 # --- CONFIGURAÇÃO DA PÁGINA ---
 def setup_page():
     """Configura a página Streamlit"""
     st.set_page_config(page_title="Nobile Career Strategy", page_icon="♟️", layout="wide")
 
 # --- CSS CUSTOMIZADO (DARK MODE) ---
-def apply_custom_css():
-    """Aplica CSS customizado para dark mode"""
-    st.markdown("""
+CUSTOM_CSS = """
     <style>
         .stApp { background-color: #0E1117; color: #FAFAFA; }
         .stButton>button {
@@ -48,13 +189,33 @@ def apply_custom_css():
         .stButton>button:hover { background-color: #2ea043; }
         .stChatMessage[data-testid="user"] { background-color: #0d4a2b; }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+
+def apply_custom_css():
+    """Aplica CSS customizado para dark mode (reemitido a cada rerun; o texto é montado uma vez)"""
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+
+@lru_cache(maxsize=1)
+def load_sidebar_logo():
+    """
+    Logo da sidebar empacotado com o app (lido do disco uma vez por processo, sem rede)
+
+    Returns:
+        bytes: Imagem PNG
+    """
+    with open(SIDEBAR_LOGO_PATH, "rb") as f:
+        return f.read()
 
 # --- API KEY MANAGEMENT ---
+@lru_cache(maxsize=1)
 def get_api_key():
     """
     Obtém a API Key da OpenAI do ambiente ou retorna None
     
+    O .env é lido no import deste módulo; o valor fica em cache pelo processo.
+    
     Returns:
         str or None: API Key se encontrada no .env, None caso contrário
     """
@@ -0,0 +1,141 @@
+"""
+Gerenciador da janela de contexto enviada ao modelo a cada turno do chat
+
+Mantém fixos o SYSTEM_PROMPT e o trigger com o CV, preserva na íntegra as
+mensagens mais recentes e substitui as antigas por um resumo mantido de forma
+incremental, de modo que o tamanho de entrada por turno fique limitado
+independentemente da duração da conversa.
+"""
+
+import copy
+import logging
+
+from config import CONTEXT_MAX_INPUT_TOKENS, CONTEXT_SUMMARY_MAX_TOKENS, CONTEXT_RECENT_KEEP_RATIO
+from engine import summarize_conversation
+from prompts import PromptTemplates
+
+logger = logging.getLogger(__name__)
+
+try:  # Contagem exata se o tiktoken estiver instalado (opcional)
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _encoding = None
+
+_MESSAGE_OVERHEAD_TOKENS = 4  # Tokens de formatação por mensagem no formato de chat
+
+
+def count_tokens(text):
+    """
+    Conta (ou estima) os tokens de um texto
+
+    Args:
+        text: Texto a medir
+
+    Returns:
+        int: Número de tokens (tiktoken) ou estimativa de ~4 caracteres por token
+    """
+    text = str(text or "")
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def count_message_tokens(messages):
+    """
+    Conta os tokens de uma lista de mensagens no formato de chat
+
+    Args:
+        messages: Lista de mensagens com 'role' e 'content'
+
+    Returns:
+        int: Total de tokens
+    """
+    return sum(count_tokens(m.get("content")) + _MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def _fallback_summary(previous_summary, messages, max_tokens):
+    """Resumo extrativo usado quando a IA não responde (mantém o orçamento garantido)"""
+    lines = [previous_summary] if previous_summary else []
+    lines += [f"- [{m['role']}] {str(m['content'])[:200]}" for m in messages]
+    summary = "\n".join(lines)
+    return summary[-max_tokens * 4:]
+
+
+class ContextWindow:
+    """
+    Constrói, turno a turno, a lista de mensagens enviada ao modelo
+
+    O estado (resumo acumulado e até onde ele cobre) fica no próprio objeto,
+    que deve ser guardado no st.session_state junto com as mensagens.
+    """
+
+    def __init__(self, max_tokens=CONTEXT_MAX_INPUT_TOKENS, summary_max_tokens=CONTEXT_SUMMARY_MAX_TOKENS,
+                 keep_ratio=CONTEXT_RECENT_KEEP_RATIO):
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.keep_ratio = keep_ratio
+        self.summary = ""
+        self.summarized_upto = 0  # Índice da primeira mensagem ainda não resumida
+
+    @staticmethod
+    def _pinned_count(messages):
+        """Mensagens fixas: o prefixo até o primeiro trigger do usuário (SYSTEM_PROMPT + CV)"""
+        for i, msg in enumerate(messages):
+            if msg.get("role") == "user":
+                return i + 1
+        return len(messages)
+
+    def build(self, messages, api_key):
+        """
+        Monta as mensagens do próximo turno dentro do orçamento de tokens
+
+        Args:
+            messages: Histórico completo (st.session_state.messages)
+            api_key: Chave API da OpenAI (para atualizar o resumo)
+
+        Returns:
+            list: Mensagens no formato OpenAI (apenas 'role' e 'content')
+        """
+        pinned_count = self._pinned_count(messages)
+        pinned = messages[:pinned_count]
+        start = max(self.summarized_upto, pinned_count)
+        recent = messages[start:]
+
+        budget = self.max_tokens - count_message_tokens(pinned) - self.summary_max_tokens
+        if count_message_tokens(recent) > budget and len(recent) > 1:
+            # Remove mensagens antigas até sobrar keep_ratio do orçamento (histerese)
+            target = budget * self.keep_ratio
+            cut = len(recent) - 1  # A última mensagem sempre fica
+            tail_tokens = count_message_tokens(recent[cut:])
+            while cut > 0 and tail_tokens + count_message_tokens(recent[cut - 1:cut]) <= target:
+                cut -= 1
+                tail_tokens += count_message_tokens(recent[cut:cut + 1])
+            self._summarize(recent[:cut], api_key)
+            self.summarized_upto = start + cut
+            recent = recent[cut:]
+
+        context = [{"role": m["role"], "content": m["content"]} for m in pinned]
+        if self.summary:
+            context.append({"role": "system", "content": PromptTemplates.conversation_summary_message(self.summary)})
+        context += [{"role": m["role"], "content": m["content"]} for m in recent]
+        return context
+
+    def _summarize(self, evicted, api_key):
+        """Incorpora ao resumo apenas as mensagens que acabaram de sair da janela"""
+        if not evicted:
+            return
+        summary = summarize_conversation(self.summary, evicted, api_key, self.summary_max_tokens)
+        if summary is None:
+            logger.warning("Resumo da conversa indisponível; usando resumo extrativo")
+            summary = _fallback_summary(self.summary, evicted, self.summary_max_tokens)
+        self.summary = summary
+
+    def snapshot(self):
+        """Cópia independente do estado (resumo e até onde ele cobre), para montar contextos fora do script"""
+        return copy.copy(self)
+
+    def reset(self):
+        """Descarta o resumo acumulado"""
+        self.summary = ""
+        self.summarized_upto = 0
@@ -0,0 +1,106 @@
+"""
+Cache de resultados de processamento de CV, endereçado pelo conteúdo do PDF
+
+A chave é o SHA-256 dos bytes enviados combinado com a versão dos prompts e os
+modelos usados. Cada entrada guarda o texto extraído, o cargo detectado, o JSON do ATS
+e o diagnóstico inicial, em SQLite com remoção LRU acima do tamanho máximo.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from config import CV_CACHE_PATH, CV_CACHE_MAX_BYTES, CV_CACHE_VERSION
+from model_router import routing_signature
+from sqlite_store import connect, open_database, evict_lru, process_singleton
+
+logger = logging.getLogger(__name__)
+
+
+def cv_cache_key(data):
+    """
+    Calcula a chave de cache de um PDF
+
+    Args:
+        data: Bytes do PDF enviado
+
+    Returns:
+        str: SHA-256 do conteúdo + versão dos prompts + modelos da análise e do diagnóstico
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest}:v{CV_CACHE_VERSION}:{routing_signature('profile', 'chat')}"
+
+
+class CVCache:
+    """
+    Armazenamento em disco (SQLite) com remoção LRU por tamanho total
+    """
+
+    def __init__(self, path=CV_CACHE_PATH, max_bytes=CV_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        open_database(
+            path,
+            "CREATE TABLE IF NOT EXISTS cv_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS idx_cv_cache_last_access ON cv_cache (last_access)",
+        )
+
+    def get(self, key):
+        """
+        Busca uma entrada e marca o acesso (LRU)
+
+        Args:
+            key: Chave gerada por cv_cache_key
+
+        Returns:
+            dict or None: Campos armazenados (cv_text, target_role, ats_data, diagnostic)
+        """
+        try:
+            with self._lock, connect(self.path) as conn:
+                row = conn.execute("SELECT value FROM cv_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE cv_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Falha ao ler cache de CV: {e}")
+            return None
+
+    def update(self, key, **fields):
+        """
+        Grava (ou complementa) os campos de uma entrada
+
+        Args:
+            key: Chave gerada por cv_cache_key
+            **fields: Campos a gravar, mesclados aos já existentes
+        """
+        try:
+            with self._lock, connect(self.path) as conn:
+                row = conn.execute("SELECT value FROM cv_cache WHERE key = ?", (key,)).fetchone()
+                value = json.loads(row[0]) if row else {}
+                value.update(fields)
+                payload = json.dumps(value, ensure_ascii=False)
+                conn.execute(
+                    "INSERT OR REPLACE INTO cv_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, payload, len(payload.encode("utf-8")), time.time()),
+                )
+                evict_lru(conn, "cv_cache", self.max_bytes)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Falha ao gravar cache de CV: {e}")
+
+
+@process_singleton
+def get_cv_cache():
+    """
+    Retorna o cache de CV compartilhado pelo processo
+
+    Returns:
+        CVCache: Instância única (criada sob demanda)
+    """
+    return CVCache()
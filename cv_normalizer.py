@@ -0,0 +1,267 @@
+"""
+Normalização do texto do CV e compressões por orçamento, compartilhadas por todos os prompts
+
+O texto bruto do pdfplumber traz cabeçalhos/rodapés repetidos a cada página,
+números de página, espaços em excesso e palavras hifenizadas na quebra de
+linha. normalize_cv limpa o texto uma única vez, identifica as seções
+(resumo, experiência, formação...) e gera, para cada prompt, uma versão que
+cabe no orçamento de caracteres distribuindo-o entre as seções por peso, em
+vez de cortar o início do texto às cegas.
+"""
+
+import re
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+from config import CV_SECTION_WEIGHTS
+from ats_matcher import fold
+
+PAGE_SEPARATOR = "\f"  # Separador de páginas gravado por utils.extract_text
+EDGE_LINES = 3  # Linhas do topo/base de cada página examinadas como cabeçalho/rodapé
+MAX_EDGE_LINE = 50  # Só linhas curtas são candidatas a cabeçalho/rodapé
+MIN_DUPLICATE_LINE = 60  # Linhas longas repetidas (blocos colados duas vezes) são removidas
+MAX_HEADING_LENGTH = 50
+
+_WHITESPACE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+# Números de página: com a palavra "página" ("Pág. 2", "Página 2 de 3", "Page 2/3"), em fração ("2 de 3",
+# "2/3") ou soltos ("2", "- 2 -"). Até 3 dígitos: anos ("2019") e datas ("01/2020") nunca casam.
+_PAGE_LABEL = re.compile(r"^(?:-\s*)?(?:p[aá]g(?:ina)?\.?|page)\s*(\d{1,3})(?:\s*(?:de|of|/)\s*(\d{1,3}))?(?:\s*-)?$",
+                         re.IGNORECASE)
+_PAGE_FRACTION = re.compile(r"^(?:-\s*)?(\d{1,3})\s*(?:de|of|/)\s*(\d{1,3})(?:\s*-)?$", re.IGNORECASE)
+_PAGE_BARE = re.compile(r"^(?:-\s*)?(\d{1,3})(?:\s*-)?$")
+_HYPHEN_BREAK = re.compile(r"[^\W\d_]-$")
+
+# Títulos de seção (já sem acentos e em minúsculas) → nome canônico
+SECTION_TITLES = {
+    "summary": ["resumo", "resumo profissional", "perfil", "perfil profissional", "sobre", "sobre mim",
+                "objetivo", "objetivo profissional", "summary", "professional summary", "profile", "about",
+                "objective"],
+    "experience": ["experiencia", "experiencias", "experiencia profissional", "experiencias profissionais",
+                   "historico profissional", "trajetoria profissional", "experience", "work experience",
+                   "professional experience", "employment history"],
+    "education": ["formacao", "formacao academica", "educacao", "escolaridade", "education",
+                  "academic background"],
+    "skills": ["competencias", "principais competencias", "habilidades", "conhecimentos", "skills",
+               "core competencies", "competencies", "tecnologias", "ferramentas"],
+    "languages": ["idiomas", "linguas", "languages"],
+    "certifications": ["certificacoes", "certificados", "cursos", "cursos complementares", "certifications",
+                       "courses", "licenses & certifications", "licenses and certifications"],
+    "other": ["projetos", "premios", "premios e reconhecimentos", "publicacoes", "voluntariado",
+              "informacoes adicionais", "atividades", "interesses", "projects", "awards", "honors & awards",
+              "publications", "volunteer experience", "additional information", "interests"],
+}
+_TITLE_LOOKUP = {title: name for name, titles in SECTION_TITLES.items() for title in titles}
+
+CVSection = namedtuple("CVSection", ["name", "title", "lines"])
+
+
+def _edge_key(line):
+    """Chave de comparação de cabeçalhos/rodapés (números variam entre páginas)"""
+    return re.sub(r"\d+", "#", fold(line))
+
+
+def _is_page_number(line, at_edge, page_count):
+    """
+    Indica se a linha é só um número de página
+
+    Com a palavra "página" vale em qualquer posição; frações (N ≤ M ≤ páginas) e
+    números soltos (≤ páginas) só no topo ou na base da página.
+    """
+    match = _PAGE_LABEL.match(line)
+    if match:
+        return match.group(2) is None or int(match.group(1)) <= int(match.group(2))
+    if not at_edge:
+        return False
+    match = _PAGE_FRACTION.match(line)
+    if match:
+        return 1 <= int(match.group(1)) <= int(match.group(2)) <= page_count
+    match = _PAGE_BARE.match(line)
+    return bool(match) and 1 <= int(match.group(1)) <= page_count
+
+
+def _clean_lines(page, page_count=1):
+    """Colapsa espaços, remove números de página e junta palavras hifenizadas na quebra de linha"""
+    raw_lines = [_WHITESPACE.sub(" ", raw).strip() for raw in page.splitlines()]
+    content = [i for i, line in enumerate(raw_lines) if line]
+    edge = set(content[:EDGE_LINES] + content[-EDGE_LINES:])
+    lines = []
+    for i, line in enumerate(raw_lines):
+        if not line or _is_page_number(line, i in edge, page_count):
+            if line == "" and lines and lines[-1] != "":
+                lines.append("")
+            continue
+        if lines and lines[-1] and _HYPHEN_BREAK.search(lines[-1]) and line[0].islower():
+            lines[-1] = lines[-1][:-1] + line
+            continue
+        lines.append(line)
+    while lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _remove_repeated(pages):
+    """
+    Remove cabeçalhos/rodapés repetidos entre páginas e blocos longos duplicados
+
+    A primeira ocorrência é mantida (no topo da 1ª página costuma estar o nome).
+    Cabeçalhos/rodapés só são procurados entre as linhas curtas do topo e da base de cada página.
+    """
+    edges = []
+    for lines in pages:
+        content = [i for i, line in enumerate(lines) if line and len(line) <= MAX_EDGE_LINE]
+        edges.append(set(content[:EDGE_LINES] + content[-EDGE_LINES:]))
+
+    repeated = set()
+    if len(pages) > 1:
+        counts = Counter()
+        for lines, edge in zip(pages, edges):
+            counts.update({_edge_key(lines[i]) for i in edge})
+        repeated = {key for key, count in counts.items() if count >= max(2, len(pages) // 2)}
+
+    seen_edges = set()
+    seen_lines = set()
+    result = []
+    for lines, edge in zip(pages, edges):
+        for i, line in enumerate(lines):
+            if i in edge and _edge_key(line) in repeated:
+                if _edge_key(line) in seen_edges:
+                    continue
+                seen_edges.add(_edge_key(line))
+            elif len(line) >= MIN_DUPLICATE_LINE:
+                if line in seen_lines:
+                    continue
+                seen_lines.add(line)
+            result.append(line)
+    return result
+
+
+def _heading(line):
+    """Nome canônico da seção se a linha for um título de seção"""
+    if len(line) > MAX_HEADING_LENGTH:
+        return None
+    key = re.sub(r"[^a-z0-9&/ ]", " ", fold(line))
+    return _TITLE_LOOKUP.get(" ".join(key.split()))
+
+
+def _split_sections(lines):
+    """Agrupa as linhas por seção; o que vem antes do primeiro título é o cabeçalho (nome, contato)"""
+    sections = [CVSection("header", "", [])]
+    for line in lines:
+        name = _heading(line) if line else None
+        if name:
+            sections.append(CVSection(name, line, []))
+        elif line or sections[-1].lines:
+            sections[-1].lines.append(line)
+    for section in sections:
+        while section.lines and section.lines[-1] == "":
+            section.lines.pop()
+    return [s for s in sections if s.lines or s.title]
+
+
+def _section_text(section, lines=None):
+    lines = section.lines if lines is None else lines
+    return "\n".join(([section.title] if section.title else []) + lines)
+
+
+def _allocate(sizes, weights, budget):
+    """
+    Divide o orçamento entre as seções proporcionalmente ao peso
+
+    Seções menores que sua cota entram inteiras e a sobra é redistribuída entre as demais.
+    """
+    allocation = {i: 0 for i in sizes}
+    active = {i for i in sizes if weights[i] > 0}
+    remaining = budget
+    while active:
+        total = sum(weights[i] for i in active)
+        fits = {i for i in active if sizes[i] <= remaining * weights[i] / total}
+        if not fits:
+            for i in active:
+                allocation[i] = int(remaining * weights[i] / total)
+            break
+        for i in fits:
+            allocation[i] = sizes[i]
+            remaining -= sizes[i]
+        active -= fits
+    return allocation
+
+
+def _truncate(section, limit):
+    """Mantém as primeiras linhas da seção (em CVs, a experiência mais recente vem primeiro)"""
+    kept = []
+    used = len(section.title) + 1 if section.title else 0
+    for line in section.lines:
+        if used + len(line) + 1 > limit:
+            room = limit - used - 2
+            if room > 40 and not kept:
+                kept.append(line[:room].rsplit(" ", 1)[0] + " …")
+            break
+        kept.append(line)
+        used += len(line) + 1
+    if not kept:
+        return ""
+    return _section_text(section, kept)
+
+
+class NormalizedCV:
+    """
+    Texto limpo do CV, suas seções e compressões por orçamento (memorizadas)
+    """
+
+    def __init__(self, raw_text):
+        raw_pages = (raw_text or "").split(PAGE_SEPARATOR)
+        pages = [_clean_lines(page, len(raw_pages)) for page in raw_pages]
+        lines = _remove_repeated(pages)
+        self.sections = _split_sections(lines)
+        self.text = "\n\n".join(_section_text(s) for s in self.sections)
+        self._compressed = {}
+
+    def compress(self, budget, profile):
+        """
+        Versão do CV que cabe em `budget` caracteres, priorizando as seções do perfil
+
+        Args:
+            budget: Máximo de caracteres
+            profile: Chave de CV_SECTION_WEIGHTS ("role", "ats", "diagnostic")
+
+        Returns:
+            str: Seções na ordem original, cada uma cortada em limite de linha
+        """
+        key = (budget, profile)
+        if key not in self._compressed:
+            self._compressed[key] = self._compress(budget, profile)
+        return self._compressed[key]
+
+    def _compress(self, budget, profile):
+        if len(self.text) <= budget:
+            return self.text
+        weights = CV_SECTION_WEIGHTS[profile]
+        texts = {i: _section_text(s) for i, s in enumerate(self.sections)}
+        sizes = {i: len(t) for i, t in texts.items()}
+        section_weights = {i: weights.get(s.name, 1) for i, s in enumerate(self.sections)}
+        separators = 2 * (sum(1 for w in section_weights.values() if w > 0) - 1)
+        allocation = _allocate(sizes, section_weights, max(0, budget - separators))
+
+        parts = []
+        for i, section in enumerate(self.sections):
+            if allocation[i] >= sizes[i]:
+                parts.append(texts[i])
+            elif allocation[i] > 0:
+                part = _truncate(section, allocation[i])
+                if part:
+                    parts.append(part)
+        return "\n\n".join(parts)[:budget]
+
+
+@lru_cache(maxsize=64)
+def normalize_cv(raw_text):
+    """
+    Normaliza o texto extraído do PDF (uma vez por texto, compartilhado pelo processo)
+
+    Args:
+        raw_text: Saída de utils.extract_text
+
+    Returns:
+        NormalizedCV: Texto limpo (.text), seções (.sections) e compress(budget, profile)
+    """
+    return NormalizedCV(raw_text)
@@ -2,37 +2,466 @@
 Motor de lógica de IA e integração com OpenAI para o Nobile Career Strategy
 """
 
-import openai
 import json
-import streamlit as st
-from config import MAX_CV_TEXT_LENGTH, MAX_CV_TEXT_LENGTH_ATS
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    MAX_CV_TEXT_LENGTH_ATS,
+    CONTEXT_SUMMARY_MAX_TOKENS,
+    ROLE_COMPARISON_MAX_ROLES,
+    ROLE_COMPARISON_WORKERS,
+    ROLE_KEYWORDS_MEMORY_ITEMS,
+)
 from prompts import PromptTemplates
+from llm_backend import get_backend
+from resilience import LLMError, call_with_policy, stream_with_policy
+from rate_limiter import estimate_tokens
+from llm_cache import get_llm_cache, llm_cache_key
+from model_router import model_for, model_chain
+from ats_matcher import fold, score_keywords, build_recommendations
+from cv_normalizer import normalize_cv
+from partial_json import PartialJSONParser
 
+logger = logging.getLogger(__name__)
 
-def get_response(messages, api_key):
+
+def _complete(call_type, messages, api_key, temperature, response_format=None, max_tokens=None,
+              parse=None, use_cache=True, models=None):
+    """
+    Chamada completa com roteamento de modelo, política de resiliência e cache do tipo
+    
+    Com parse, a chamada começa no modelo do tier da tarefa e, se a resposta for
+    rejeitada (JSON inválido ou fora do schema), é refeita no tier seguinte.
+    
+    Args:
+        call_type: Tipo da chamada (TASK_MODEL_TIERS / LLM_CALL_POLICIES / LLM_CACHE_TTL_SECONDS)
+        messages: Mensagens no formato OpenAI
+        api_key: Chave API da OpenAI
+        temperature: Temperatura de amostragem
+        response_format: Formato estruturado, opcional
+        max_tokens: Limite de tokens da resposta, opcional
+        parse: Callable que valida o conteúdo (ValueError/KeyError/TypeError se inválido);
+               só respostas que passam por ele são cacheadas
+        use_cache: Se False, ignora a entrada cacheada (a nova resposta ainda é gravada)
+        models: Modelos a tentar, em ordem (padrão: os do tier da tarefa)
+        
+    Returns:
+        Conteúdo da resposta (ou o resultado de parse)
+        
+    Raises:
+        LLMError: Falha após as tentativas da política
+        ValueError: Resposta rejeitada por parse em todos os modelos
+    """
+    cache = get_llm_cache()
+    params = {"temperature": temperature, "response_format": response_format, "max_tokens": max_tokens}
+    models = models or (model_chain(call_type) if parse else [model_for(call_type)])
+    backend = get_backend(api_key)
+    
+    for n, model in enumerate(models):
+        key = llm_cache_key(model, messages, **params) if cache.enabled(call_type) else None
+        content = cache.get(call_type, key) if key and use_cache else None
+        cached = content is not None
+        if not cached:
+            content = call_with_policy(
+                call_type,
+                lambda timeout: backend.complete(messages, model=model, timeout=timeout, **params),
+                api_key, estimate_tokens(messages, max_tokens)
+            )
+        try:
+            result = parse(content) if parse else content
+        except (ValueError, KeyError, TypeError) as e:
+            if n == len(models) - 1:
+                raise ValueError(f"Resposta inválida de {model}: {e}") from e
+            logger.warning(f"Resposta inválida de {model} em '{call_type}' ({e}); tentando {models[n + 1]}")
+            continue
+        if key and not cached:
+            cache.set(call_type, key, content)
+        return result
+
+
+def _stream_structured(call_type, messages, api_key, temperature, response_format, parse, on_partial):
     """
-    Obtém resposta do modelo GPT-4o
+    Chamada estruturada em streaming, com o JSON interpretado conforme chega
+    
+    Usa o mesmo cache de _complete. Se o JSON final for inválido ou vier
+    truncado, a chamada é refeita sem streaming em toda a cadeia de tiers; só se
+    a nova tentativa também falhar os campos já interpretados são aproveitados,
+    marcados como parciais (não devem ser persistidos).
+    
+    Args:
+        call_type: Tipo da chamada
+        messages: Mensagens no formato OpenAI
+        api_key: Chave API da OpenAI
+        temperature: Temperatura de amostragem
+        response_format: Formato estruturado (JSON)
+        parse: Callable que valida o conteúdo (ValueError/KeyError/TypeError se inválido)
+        on_partial: Callable chamado com o valor parcial (dict) a cada trecho recebido
+        
+    Returns:
+        tuple: (resultado de parse, True se veio só dos campos de um JSON truncado/malformado)
+        
+    Raises:
+        LLMError: Falha antes de qualquer campo ser interpretado
+        ValueError: Resposta rejeitada por parse em todos os modelos
+    """
+    cache = get_llm_cache()
+    params = {"temperature": temperature, "response_format": response_format, "max_tokens": None}
+    model = model_for(call_type)
+    key = llm_cache_key(model, messages, **params) if cache.enabled(call_type) else None
+    content = cache.get(call_type, key) if key else None
+    if content is not None:
+        try:
+            return parse(content), False
+        except (ValueError, KeyError, TypeError):
+            pass
+    
+    backend = get_backend(api_key)
+    parser = PartialJSONParser()
+    chunks = []
+    try:
+        for delta in stream_with_policy(
+            call_type,
+            lambda timeout: backend.stream(messages, model=model, temperature=temperature,
+                                           response_format=response_format, timeout=timeout),
+            api_key, estimate_tokens(messages)
+        ):
+            chunks.append(delta)
+            if not parser.error:
+                on_partial(parser.feed(delta))
+    except LLMError:
+        if not parser.value:
+            raise
+        logger.warning(f"Stream de '{call_type}' interrompido depois de {len(chunks)} trechos")
+    
+    content = "".join(chunks)
+    try:
+        result = parse(content)
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Resposta inválida de {model} em '{call_type}' ({e}); refazendo sem streaming")
+        try:
+            return _complete(call_type, messages, api_key, temperature, response_format=response_format,
+                             parse=parse, use_cache=False, models=model_chain(call_type)), False
+        except (LLMError, ValueError) as retry_error:
+            try:
+                # Último recurso: os campos já interpretados, sinalizados como parciais
+                return parse(json.dumps(parser.value or {})), True
+            except (ValueError, KeyError, TypeError):
+                raise retry_error from e
+    if key:
+        cache.set(call_type, key, content)
+    return result, False
+
+
+def get_response(messages, api_key, task="chat"):
+    """
+    Obtém resposta do modelo da tarefa (TASK_MODEL_TIERS)
     
     Args:
         messages: Lista de mensagens no formato OpenAI
         api_key: Chave API da OpenAI
+        task: "chat" (diagnóstico/conversa) ou "execution" (ETAPA 4/5)
         
     Returns:
-        str: Resposta do modelo ou mensagem de erro
+        str: Resposta do modelo
+        
+    Raises:
+        LLMError: Sem API key ou falha após as tentativas da política "chat"
     """
     if not api_key:
-        return "⚠️ Insira a API Key na barra lateral."
+        raise LLMError("Insira a API Key na barra lateral.")
+    
+    return _complete(task, messages, api_key, temperature=0.5)
+
+
+def summarize_conversation(previous_summary, messages, api_key, max_tokens=CONTEXT_SUMMARY_MAX_TOKENS):
+    """
+    Atualiza o resumo incremental com mensagens que saíram da janela de contexto
+    
+    Args:
+        previous_summary: Resumo acumulado até agora (pode ser vazio)
+        messages: Mensagens antigas a incorporar no resumo
+        api_key: Chave API da OpenAI
+        max_tokens: Tamanho máximo do resumo
+        
+    Returns:
+        str: Resumo atualizado ou None em caso de erro
+    """
+    if not api_key:
+        return None
+    
+    transcript = "\n\n".join(f"[{m['role'].upper()}]: {m['content']}" for m in messages)
+
+    # Usa o prompt template do prompts.py (~0.75 palavra por token)
+    prompt = PromptTemplates.conversation_summary_prompt(previous_summary, transcript, int(max_tokens * 0.75))
     
-    client = openai.OpenAI(api_key=api_key)
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            temperature=0.5
+        summary = _complete("summary", [{"role": "user", "content": prompt}], api_key,
+                            temperature=0.2, max_tokens=max_tokens)
+        return summary.strip()
+    except LLMError as e:
+        logger.error(f"Erro ao resumir conversa: {e}")
+        return None
+
+
+def stream_response(messages, api_key, task="chat", call_type=None, cancel=None):
+    """
+    Obtém resposta do modelo da tarefa (TASK_MODEL_TIERS) em modo streaming
+    
+    Os deltas são entregues assim que chegam, permitindo renderizar a resposta
+    incrementalmente (ex: com st.write_stream) em vez de aguardar a conclusão.
+    
+    Args:
+        messages: Lista de mensagens no formato OpenAI
+        api_key: Chave API da OpenAI
+        task: "chat" (diagnóstico/conversa) ou "execution" (ETAPA 4/5)
+        call_type: Política de resiliência/rate limit (padrão: a da tarefa)
+        cancel: threading.Event que desiste da chamada antes de abri-la (opcional)
+        
+    Yields:
+        str: Trechos (deltas) da resposta do modelo
+        
+    Raises:
+        LLMError: Sem API key ou falha após as tentativas da política "chat"
+                  (depois do primeiro trecho a falha não é repetida)
+    """
+    if not api_key:
+        raise LLMError("Insira a API Key na barra lateral.")
+    
+    backend = get_backend(api_key)
+    model = model_for(task)
+    yield from stream_with_policy(
+        call_type or task,
+        lambda timeout: backend.stream(messages, model=model, temperature=0.5, timeout=timeout),
+        api_key, estimate_tokens(messages), cancel
+    )
+
+
+# Structured output da análise combinada (cargo + keywords ATS)
+PROFILE_ANALYSIS_SCHEMA = {
+    "name": "cv_profile_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "target_role": {"type": "string"},
+            "keywords": {"type": "array", "items": {"type": "string"}},
+            "recomendacoes": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["target_role", "keywords", "recomendacoes"],
+        "additionalProperties": False,
+    },
+}
+
+ROLE_KEYWORDS_SCHEMA = {
+    "name": "role_keywords",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "keywords": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["keywords"],
+        "additionalProperties": False,
+    },
+}
+
+
+def _string_list(value, field):
+    """Valida uma lista de textos do JSON (itens vazios são descartados)"""
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise TypeError(f"'{field}' deve ser uma lista de textos")
+    return [item.strip() for item in value if item.strip()]
+
+
+def _keyword_list(value):
+    keywords = _string_list(value, "keywords")
+    if not keywords:
+        raise ValueError("Lista de keywords vazia")
+    return keywords
+
+
+def parse_role_keywords(content):
+    """
+    Valida a resposta de ROLE_KEYWORDS_SCHEMA
+    
+    Returns:
+        list: Keywords do cargo
+        
+    Raises:
+        ValueError, KeyError, TypeError: JSON inválido ou fora do schema
+    """
+    return _keyword_list(json.loads(content)["keywords"])
+
+
+def parse_profile_analysis(content):
+    """
+    Valida a resposta de PROFILE_ANALYSIS_SCHEMA
+    
+    Returns:
+        dict: target_role, keywords e recomendacoes
+        
+    Raises:
+        ValueError, KeyError, TypeError: JSON inválido ou fora do schema
+    """
+    data = json.loads(content)
+    if not isinstance(data.get("target_role"), str):
+        raise TypeError("'target_role' deve ser um texto")
+    return {
+        "target_role": data["target_role"].strip(),
+        "keywords": _keyword_list(data.get("keywords")),
+        "recomendacoes": _string_list(data.get("recomendacoes", []), "recomendacoes"),
+    }
+
+# Keywords ATS por cargo (normalizado), compartilhadas pelo processo (LRU limitado)
+_role_keywords = OrderedDict()
+_role_keywords_lock = threading.Lock()
+
+
+def _role_key(target_role):
+    return " ".join(fold(target_role).split())
+
+
+def remember_role_keywords(target_role, keywords):
+    """
+    Registra a lista de keywords de um cargo para reutilização local
+    
+    Args:
+        target_role: Cargo alvo
+        keywords: Palavras-chave ATS do cargo
+    """
+    if target_role and keywords:
+        key = _role_key(target_role)
+        with _role_keywords_lock:
+            _role_keywords[key] = list(keywords)
+            _role_keywords.move_to_end(key)
+            while len(_role_keywords) > ROLE_KEYWORDS_MEMORY_ITEMS:
+                _role_keywords.popitem(last=False)
+
+
+def _known_role_keywords(target_role):
+    """Keywords já conhecidas do cargo (marca o cargo como usado recentemente)"""
+    key = _role_key(target_role)
+    with _role_keywords_lock:
+        keywords = _role_keywords.get(key)
+        if keywords:
+            _role_keywords.move_to_end(key)
+        return keywords
+
+
+def get_role_keywords(target_role, api_key, refresh=False):
+    """
+    Obtém as palavras-chave ATS de um cargo (a IA só é chamada se o cargo for novo)
+    
+    Args:
+        target_role: Cargo alvo
+        api_key: Chave API da OpenAI
+        refresh: Se True, pede uma nova lista à IA mesmo que o cargo já seja conhecido
+        
+    Returns:
+        list: Palavras-chave do cargo ou None em caso de erro
+    """
+    if not refresh:
+        keywords = _known_role_keywords(target_role)
+        if keywords:
+            return keywords
+    
+    if not api_key:
+        return None
+    
+    # Usa o prompt template do prompts.py
+    prompt = PromptTemplates.role_keywords_prompt(target_role)
+    
+    try:
+        keywords = _complete(
+            "role_keywords",
+            [{"role": "user", "content": prompt}],
+            api_key,
+            temperature=0.2,
+            response_format={"type": "json_schema", "json_schema": ROLE_KEYWORDS_SCHEMA},
+            parse=parse_role_keywords,
+            use_cache=not refresh
         )
-        return response.choices[0].message.content
+        remember_role_keywords(target_role, keywords)
+        return keywords
+    except Exception as e:
+        logger.error(f"Erro ao obter keywords do cargo: {e}")
+        return None
+
+
+def analyze_cv_profile(cv_text, api_key, target_role=None, on_progress=None):
+    """
+    Identifica o cargo e as keywords ATS em uma única chamada à IA
+    
+    O Score ATS é calculado localmente sobre o texto completo do CV.
+    
+    Args:
+        cv_text: Texto completo do CV
+        api_key: Chave API da OpenAI
+        target_role: Cargo alvo já conhecido (opcional). Se ausente, é identificado no CV
+        on_progress: Callable opcional; com ele a resposta é transmitida em streaming e
+                     recebe um resultado parcial (mesmo formato do retorno, com as keywords
+                     já completas) sempre que o cargo ou uma nova keyword chega
+        
+    Returns:
+        dict: Dicionário com target_role, ats_score, keywords_present, keywords_missing,
+              recomendacoes ou None em caso de erro; com "partial": True quando as keywords
+              vieram de uma resposta truncada (não deve ser gravado em cache)
+    """
+    if not api_key:
+        return None
+    
+    # Usa o prompt template do prompts.py (CV normalizado, comprimido por seção)
+    cv = normalize_cv(cv_text)
+    prompt = PromptTemplates.profile_analysis_prompt(cv.compress(MAX_CV_TEXT_LENGTH_ATS, "ats"), target_role)
+    
+    messages = [{"role": "user", "content": prompt}]
+    response_format = {"type": "json_schema", "json_schema": PROFILE_ANALYSIS_SCHEMA}
+    
+    partial = False
+    try:
+        if on_progress is None:
+            analysis = _complete("profile", messages, api_key, temperature=0.2,
+                                 response_format=response_format, parse=parse_profile_analysis)
+        else:
+            analysis, partial = _stream_structured("profile", messages, api_key, 0.2, response_format,
+                                                   parse_profile_analysis,
+                                                   _profile_progress(cv.text, target_role, on_progress))
     except Exception as e:
-        return f"Erro na IA: {e}"
+        # Pode rodar fora da thread do Streamlit (pipeline de upload): só registra o erro
+        logger.error(f"Erro na análise de perfil: {e}")
+        return None
+
+    role = target_role or analysis["target_role"] or "Profissional"
+    if not partial:
+        remember_role_keywords(role, analysis["keywords"])
+    result = {"target_role": role}
+    result.update(score_keywords(cv.text, analysis["keywords"]))
+    result["recomendacoes"] = analysis.get("recomendacoes") or build_recommendations(result["keywords_missing"])
+    if partial:
+        result["partial"] = True
+    return result
+
+
+def _profile_progress(cv_text, target_role, on_progress):
+    """Converte o JSON parcial da análise de perfil em resultados parciais de ATS"""
+    seen = (None, 0)
+    
+    def on_partial(partial):
+        nonlocal seen
+        if not isinstance(partial, dict):
+            return
+        role = target_role or partial.get("target_role")
+        keywords = [k for k in partial.get("keywords") or [] if isinstance(k, str) and k.strip()]
+        if (role, len(keywords)) == seen:
+            return
+        seen = (role, len(keywords))
+        result = {"target_role": role}
+        result.update(score_keywords(cv_text, keywords))
+        on_progress(result)
+    
+    return on_partial
 
 
 def extract_role_from_cv(cv_text, api_key):
@@ -49,27 +478,17 @@ def extract_role_from_cv(cv_text, api_key):
     if not api_key:
         return "Cargo não identificado"
     
-    client = openai.OpenAI(api_key=api_key)
-
-    # Usa o prompt template do prompts.py
-    prompt = PromptTemplates.role_extraction_prompt(cv_text[:MAX_CV_TEXT_LENGTH])
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3
-        )
-        role = response.choices[0].message.content.strip()
-        return role if role else "Profissional"
-    except Exception as e:
-        return "Profissional"
+    result = analyze_cv_profile(cv_text, api_key)
+    return result["target_role"] if result else "Profissional"
 
 
 def calculate_ats_score(cv_text, target_role, api_key):
     """
     Calcula o Score ATS e identifica keywords faltantes
     
+    A IA só fornece a lista de keywords do cargo (reaproveitada entre chamadas);
+    a comparação com o CV completo é local e determinística.
+    
     Args:
         cv_text: Texto completo do CV
         target_role: Cargo alvo para análise
@@ -79,22 +498,38 @@ def calculate_ats_score(cv_text, target_role, api_key):
         dict: Dicionário com ats_score, keywords_present, keywords_missing, recomendacoes
               ou None em caso de erro
     """
-    if not api_key:
+    keywords = get_role_keywords(target_role, api_key)
+    if not keywords:
         return None
     
-    client = openai.OpenAI(api_key=api_key)
+    result = score_keywords(normalize_cv(cv_text).text, keywords)
+    result["recomendacoes"] = build_recommendations(result["keywords_missing"])
+    return result
 
-    # Usa o prompt template do prompts.py
-    prompt = PromptTemplates.ats_score_prompt(cv_text[:MAX_CV_TEXT_LENGTH_ATS], target_role)
+
+def compare_roles(cv_text, roles, api_key):
+    """
+    Compara o CV com vários cargos alvo
     
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            temperature=0.2
-        )
-        return json.loads(response.choices[0].message.content)
-    except Exception as e:
-        st.error(f"Erro no cálculo ATS: {e}")
-        return None
+    As keywords de cada cargo vêm da memória local (ou de uma chamada ao tier
+    "role_keywords", cacheada); o score de todos os cargos é calculado em uma
+    única passada vetorizada sobre o texto completo do CV.
+    
+    Args:
+        cv_text: Texto completo do CV
+        roles: Cargos a comparar (no máximo ROLE_COMPARISON_MAX_ROLES)
+        api_key: Chave API da OpenAI
+        
+    Returns:
+        list: Um dict por cargo (role, ats_score, keywords_present, keywords_missing),
+              do maior para o menor score; cargos sem keywords ficam de fora
+    """
+    from role_catalog import RoleCatalog  # NumPy só é importado quando a comparação é usada
+
+    roles = list(dict.fromkeys(r.strip() for r in roles if r and r.strip()))[:ROLE_COMPARISON_MAX_ROLES]
+    if not roles:
+        return []
+    with ThreadPoolExecutor(max_workers=ROLE_COMPARISON_WORKERS) as executor:
+        keywords = list(executor.map(lambda role: get_role_keywords(role, api_key), roles))
+    catalog = RoleCatalog({role: kws for role, kws in zip(roles, keywords) if kws})
+    return catalog.rank(normalize_cv(cv_text).text)
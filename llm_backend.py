@@ -0,0 +1,200 @@
+"""
+Backends de LLM usados pelo engine
+
+O engine fala apenas com a interface LLMBackend. O backend padrão usa o SDK
+da OpenAI (com OPENAI_BASE_URL opcional, o que permite apontar para qualquer
+servidor compatível com chat-completions, como o benchmarks/fake_llm_server.py);
+outros backends podem ser registrados com register_backend.
+"""
+
+import threading
+from functools import lru_cache
+
+from config import (
+    LLM_BACKEND,
+    OPENAI_BASE_URL,
+    OPENAI_TIMEOUT_SECONDS,
+    OPENAI_CONNECT_TIMEOUT_SECONDS,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+)
+
+
+@lru_cache(maxsize=1)
+def _httpx():
+    """Transporte HTTP do SDK, importado junto com o primeiro cliente (fora do cold start do app)"""
+    try:  # openai>=3 usa o httpx2 como transporte HTTP
+        import httpx2 as httpx
+    except ImportError:
+        import httpx
+    return httpx
+
+
+# Registro de clientes por API key, compartilhado por todo o processo
+# (sobrevive a reruns do Streamlit e é reutilizado entre sessões)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key):
+    """
+    Retorna o cliente OpenAI compartilhado para a API key informada
+
+    O cliente é criado uma única vez por API key e mantém um pool de conexões
+    keep-alive, evitando um novo handshake TCP/TLS a cada chamada.
+
+    Args:
+        api_key: Chave API da OpenAI
+
+    Returns:
+        openai.OpenAI: Cliente reutilizável (thread-safe)
+    """
+    client = _clients.get(api_key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            import openai  # ~0,5 s de import: pago na primeira chamada, não no carregamento da página
+
+            httpx = _httpx()
+            timeout = httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS)
+            http_client = openai.DefaultHttpxClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+            client = openai.OpenAI(
+                api_key=api_key,
+                base_url=OPENAI_BASE_URL or None,
+                timeout=timeout,
+                max_retries=0,  # Retries e backoff ficam a cargo do resilience.py
+                http_client=http_client,
+            )
+            _clients[api_key] = client
+        return client
+
+
+class LLMBackend:
+    """
+    Interface mínima de um backend de chat-completions
+    """
+
+    def complete(self, messages, model, temperature, response_format=None, max_tokens=None, timeout=None):
+        """
+        Gera uma resposta completa
+
+        Args:
+            messages: Lista de mensagens no formato OpenAI
+            model: Nome do modelo
+            temperature: Temperatura de amostragem
+            response_format: Formato estruturado (json_object / json_schema), opcional
+            max_tokens: Limite de tokens da resposta, opcional
+            timeout: Deadline da requisição em segundos, opcional
+
+        Returns:
+            str: Conteúdo da resposta
+        """
+        raise NotImplementedError
+
+    def stream(self, messages, model, temperature, response_format=None, max_tokens=None, timeout=None):
+        """
+        Gera uma resposta em streaming
+
+        Args:
+            Os mesmos de complete()
+
+        Yields:
+            str: Trechos (deltas) da resposta
+        """
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    Backend baseado no SDK oficial da OpenAI (cliente compartilhado por API key)
+    """
+
+    def __init__(self, api_key):
+        self.client = get_client(api_key)
+
+    @staticmethod
+    def _params(response_format, max_tokens, timeout):
+        params = {}
+        if timeout is not None:
+            params["timeout"] = _httpx().Timeout(timeout, connect=OPENAI_CONNECT_TIMEOUT_SECONDS)
+        if response_format is not None:
+            params["response_format"] = response_format
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        return params
+
+    def complete(self, messages, model, temperature, response_format=None, max_tokens=None, timeout=None):
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **self._params(response_format, max_tokens, timeout)
+        )
+        return response.choices[0].message.content
+
+    def stream(self, messages, model, temperature, response_format=None, max_tokens=None, timeout=None):
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            **self._params(response_format, max_tokens, timeout)
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()  # Interromper o consumo encerra a geração no servidor
+
+
+_backend_factories = {"openai": OpenAIBackend}
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    """
+    Registra um backend adicional, selecionável via LLM_BACKEND
+
+    Args:
+        name: Nome do backend (valor de LLM_BACKEND)
+        factory: Callable que recebe a api_key e retorna um LLMBackend
+    """
+    _backend_factories[name] = factory
+    with _backends_lock:
+        _backends.clear()
+
+
+def get_backend(api_key, name=None):
+    """
+    Retorna o backend compartilhado para a API key
+
+    Args:
+        api_key: Chave API
+        name: Nome do backend (padrão: LLM_BACKEND do config)
+
+    Returns:
+        LLMBackend: Instância reutilizável
+    """
+    name = name or LLM_BACKEND
+    key = (name, api_key)
+    backend = _backends.get(key)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(key)
+            if backend is None:
+                backend = _backend_factories[name](api_key)
+                _backends[key] = backend
+    return backend
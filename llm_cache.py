@@ -0,0 +1,164 @@
+"""
+Cache de respostas da IA para chamadas quase determinísticas
+
+A chave é o hash de (modelo, mensagens, parâmetros). Há duas camadas: um LRU em
+memória (microssegundos, por processo) sobre um SQLite em disco (compartilhado
+entre processos e reinícios). Cada tipo de chamada opta pelo cache e define o
+TTL em config.LLM_CACHE_TTL_SECONDS; tipos ausentes nunca são cacheados.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import LLM_CACHE_TTL_SECONDS, LLM_CACHE_MEMORY_ITEMS, LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES
+from sqlite_store import connect, open_database, evict_lru, process_singleton
+
+logger = logging.getLogger(__name__)
+
+
+def llm_cache_key(model, messages, **params):
+    """
+    Calcula a chave de cache de uma chamada
+
+    Args:
+        model: Nome do modelo
+        messages: Mensagens enviadas (só 'role' e 'content' entram na chave)
+        **params: Demais parâmetros da chamada (temperature, response_format, max_tokens)
+
+    Returns:
+        str: SHA-256 da chamada normalizada
+    """
+    payload = {
+        "model": model,
+        "messages": [{"role": m["role"], "content": m["content"]} for m in messages],
+        "params": {k: v for k, v in params.items() if v is not None},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    LRU em memória sobre SQLite em disco, com TTL e contadores por tipo de chamada
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, memory_items=LLM_CACHE_MEMORY_ITEMS, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()  # chave → (conteúdo, expira_em)
+        self._counters = {}
+        self._lock = threading.Lock()
+        open_database(
+            path,
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)",
+        )
+
+    @staticmethod
+    def enabled(call_type):
+        """Indica se o tipo de chamada optou pelo cache"""
+        return bool(LLM_CACHE_TTL_SECONDS.get(call_type))
+
+    def _count(self, call_type, outcome):
+        counters = self._counters.setdefault(call_type, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def _remember(self, key, value, expires):
+        self._memory[key] = (value, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, call_type, key):
+        """
+        Busca uma resposta (memória, depois disco)
+
+        Args:
+            call_type: Tipo da chamada (para os contadores)
+            key: Chave gerada por llm_cache_key
+
+        Returns:
+            str or None: Conteúdo cacheado e ainda válido
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self._count(call_type, "memory_hits")
+                return entry[0]
+            self._memory.pop(key, None)
+
+        try:
+            with connect(self.path) as conn:
+                row = conn.execute("SELECT value, expires FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row and row[1] > now:
+                    conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao ler cache de respostas: {e}")
+            row = None
+
+        with self._lock:
+            if row and row[1] > now:
+                self._remember(key, row[0], row[1])
+                self._count(call_type, "disk_hits")
+                return row[0]
+            self._count(call_type, "misses")
+        return None
+
+    def set(self, call_type, key, value):
+        """
+        Grava uma resposta nas duas camadas com o TTL do tipo de chamada
+
+        Args:
+            call_type: Tipo da chamada (define o TTL)
+            key: Chave gerada por llm_cache_key
+            value: Conteúdo da resposta
+        """
+        ttl = LLM_CACHE_TTL_SECONDS.get(call_type)
+        if not ttl:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now + ttl)
+        try:
+            with connect(self.path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, now + ttl, len(value.encode("utf-8")), now),
+                )
+                conn.execute("DELETE FROM llm_cache WHERE expires <= ?", (now,))  # Expiradas saem antes do LRU
+                evict_lru(conn, "llm_cache", self.max_bytes)
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao gravar cache de respostas: {e}")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Por tipo de chamada: memory_hits, disk_hits, misses, hit_rate
+        """
+        with self._lock:
+            stats = {}
+            for call_type, counters in self._counters.items():
+                total = sum(counters.values())
+                hits = counters["memory_hits"] + counters["disk_hits"]
+                stats[call_type] = {**counters, "hit_rate": hits / total if total else 0.0}
+            return stats
+
+
+@process_singleton
+def get_llm_cache():
+    """
+    Retorna o cache de respostas compartilhado pelo processo
+
+    Returns:
+        LLMCache: Instância única (criada sob demanda)
+    """
+    return LLMCache()
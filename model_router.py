@@ -0,0 +1,54 @@
+"""
+Roteamento de modelo por tarefa
+
+Cada tarefa (tipo de chamada do engine) usa o tier definido em
+config.TASK_MODEL_TIERS. Quando a saída estruturada de um modelo mais barato
+não passa na validação, a chamada é repetida no tier seguinte de
+MODEL_TIER_ORDER (fallback para um modelo mais forte).
+"""
+
+from config import MODEL_TIERS, MODEL_TIER_ORDER, TASK_MODEL_TIERS, MODEL_FALLBACK_ENABLED, OPENAI_MODEL
+
+
+def model_for(task):
+    """
+    Modelo configurado para a tarefa
+
+    Args:
+        task: Tipo de chamada ("chat", "execution", "profile", "role", "role_keywords", "summary")
+
+    Returns:
+        str: Nome do modelo (OPENAI_MODEL se a tarefa não tiver tier configurado)
+    """
+    tier = TASK_MODEL_TIERS.get(task)
+    return MODEL_TIERS.get(tier, OPENAI_MODEL)
+
+
+def model_chain(task):
+    """
+    Modelos a tentar, em ordem, quando a resposta precisa passar por validação
+
+    Args:
+        task: Tipo de chamada
+
+    Returns:
+        list: Modelo da tarefa seguido dos tiers mais fortes (sem repetição)
+    """
+    tier = TASK_MODEL_TIERS.get(task)
+    if not MODEL_FALLBACK_ENABLED or tier not in MODEL_TIER_ORDER:
+        return [model_for(task)]
+    chain = []
+    for name in MODEL_TIER_ORDER[MODEL_TIER_ORDER.index(tier):]:
+        if MODEL_TIERS[name] not in chain:
+            chain.append(MODEL_TIERS[name])
+    return chain
+
+
+def routing_signature(*tasks):
+    """
+    Identifica os modelos usados pelas tarefas (para chaves de cache)
+
+    Returns:
+        str: Modelos das tarefas separados por "+"
+    """
+    return "+".join(model_for(task) for task in tasks)
@@ -0,0 +1,170 @@
+"""
+Parser JSON incremental para respostas estruturadas transmitidas em streaming
+
+Cada trecho recebido é consumido uma única vez, caractere a caractere. O valor
+parcial expõe apenas o que já está completo: campos cujo valor terminou,
+strings fechadas e itens de listas já encerrados (objetos e listas aparecem
+assim que abrem e vão sendo preenchidos). JSON malformado ou truncado
+interrompe o consumo, mas preserva tudo o que já foi interpretado.
+"""
+
+import json
+
+_WHITESPACE = " \t\r\n"
+_LITERAL_START = "-0123456789tfn"
+_LITERAL_END = ",}]" + _WHITESPACE
+
+
+class PartialJSONParser:
+    """
+    Monta um objeto/lista JSON conforme os trechos chegam
+
+    Uso:
+        parser = PartialJSONParser()
+        for delta in stream:
+            partial = parser.feed(delta)
+        parser.close()  # ValueError se o JSON estiver incompleto ou inválido
+    """
+
+    def __init__(self):
+        self.value = None  # Valor raiz (parcial enquanto o JSON não termina)
+        self.done = False
+        self.error = None  # Motivo da interrupção (JSON malformado)
+        self._stack = []  # [contêiner, chave pendente, estado]
+        self._token = None  # "key", "string" ou "literal" em andamento
+        self._chars = []
+        self._escaped = False
+
+    def feed(self, chunk):
+        """
+        Consome um trecho da resposta
+
+        Args:
+            chunk: Próximo trecho do texto JSON
+
+        Returns:
+            dict or list or None: Valor parcial atual
+        """
+        for ch in chunk:
+            if self.error:
+                break
+            if self.done:
+                if ch not in _WHITESPACE:
+                    self.error = f"caractere inesperado {ch!r} após o fim do JSON"
+                continue
+            try:
+                self._consume(ch)
+            except ValueError as e:
+                self.error = str(e)
+        return self.value
+
+    def close(self):
+        """
+        Encerra a leitura
+
+        Returns:
+            dict or list: Valor completo
+
+        Raises:
+            ValueError: JSON malformado ou truncado (self.value mantém a parte válida)
+        """
+        if self.error:
+            raise ValueError(f"JSON malformado: {self.error}")
+        if not self.done:
+            raise ValueError("JSON truncado")
+        return self.value
+
+    def _consume(self, ch):
+        if self._token in ("key", "string"):
+            if self._escaped:
+                self._escaped = False
+            elif ch == "\\":
+                self._escaped = True
+            elif ch == '"':
+                self._finish_string()
+                return
+            self._chars.append(ch)
+            return
+        if self._token == "literal":
+            if ch not in _LITERAL_END:
+                self._chars.append(ch)
+                return
+            self._finish_literal()
+        if ch in _WHITESPACE:
+            return
+        if not self._stack:
+            if self.value is not None or ch not in "{[":
+                raise ValueError(f"caractere inesperado {ch!r} fora do objeto")
+            self.value = {} if ch == "{" else []
+            self._stack.append([self.value, None, "key" if ch == "{" else "value"])
+            return
+
+        frame = self._stack[-1]
+        container, _, state = frame
+        closer = "}" if isinstance(container, dict) else "]"
+        if state == "comma":
+            if ch == ",":
+                frame[2] = "key" if isinstance(container, dict) else "value"
+            elif ch == closer:
+                self._close()
+            else:
+                raise ValueError(f"esperado ',' ou {closer!r}, recebido {ch!r}")
+        elif state == "colon":
+            if ch != ":":
+                raise ValueError(f"esperado ':', recebido {ch!r}")
+            frame[2] = "value"
+        elif state == "key":
+            if ch == '"':
+                self._start("key")
+            elif ch == "}" and not container:
+                self._close()
+            else:
+                raise ValueError(f"esperada uma chave, recebido {ch!r}")
+        elif ch == "]" and isinstance(container, list) and not container:
+            self._close()
+        else:
+            self._start_value(ch)
+
+    def _start(self, token):
+        self._token = token
+        self._chars = []
+
+    def _start_value(self, ch):
+        if ch == '"':
+            self._start("string")
+        elif ch in "{[":
+            child = {} if ch == "{" else []
+            self._add(child)
+            self._stack.append([child, None, "key" if ch == "{" else "value"])
+        elif ch in _LITERAL_START:
+            self._start("literal")
+            self._chars.append(ch)
+        else:
+            raise ValueError(f"valor inesperado {ch!r}")
+
+    def _finish_string(self):
+        text = json.loads('"' + "".join(self._chars) + '"')  # Escapes (\n, \uXXXX, pares substitutos)
+        token, self._token = self._token, None
+        if token == "key":
+            self._stack[-1][1] = text
+            self._stack[-1][2] = "colon"
+        else:
+            self._add(text)
+
+    def _finish_literal(self):
+        text = "".join(self._chars)
+        self._token = None
+        self._add(json.loads(text))
+
+    def _add(self, value):
+        frame = self._stack[-1]
+        if isinstance(frame[0], dict):
+            frame[0][frame[1]] = value
+        else:
+            frame[0].append(value)
+        frame[2] = "comma"
+
+    def _close(self):
+        self._stack.pop()
+        if not self._stack:
+            self.done = True
@@ -4,6 +4,7 @@ Phase Manager for Nobile Career Strategy - FSM-based phase control
 
 from enum import Enum
 import logging
+import re
 
 # Get logger without configuring at module level
 logger = logging.getLogger(__name__)
@@ -14,7 +15,8 @@ try:
         FSM_MIN_MESSAGE_PAIRS_FOR_MENU,
         FSM_MIN_AI_MESSAGES_FOR_DIAGNOSTICO_EM_ANDAMENTO,
         FSM_TRIGGER_KEYWORDS,
-        FSM_COMMAND_KEYWORDS
+        FSM_COMMAND_KEYWORDS,
+        FSM_EXECUTION_MIN_ETAPA
     )
 except ImportError:
     # Fallback to defaults if config is not available
@@ -22,6 +24,88 @@ except ImportError:
     FSM_MIN_AI_MESSAGES_FOR_DIAGNOSTICO_EM_ANDAMENTO = 1
     FSM_TRIGGER_KEYWORDS = ["O USUÁRIO SUBIU", "ACIONOU"]
     FSM_COMMAND_KEYWORDS = ["ACIONOU", "/otimizador_cv_linkedin", "ETAPA 5: ARQUIVO MESTRE"]
+    FSM_EXECUTION_MIN_ETAPA = 4
+
+
+def _compile_keywords(keywords: list) -> "re.Pattern":
+    """Compile a keyword list into a single case-insensitive alternation"""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+
+# Precompiled matchers: one regex scan per message instead of one `in` per keyword
+TRIGGER_MATCHER = _compile_keywords(FSM_TRIGGER_KEYWORDS)
+COMMAND_MATCHER = _compile_keywords(FSM_COMMAND_KEYWORDS)
+
+# Optimizer step: a heading in AI replies ("## ETAPA 4 - Engenharia"), any mention in user messages/triggers
+ETAPA_HEADING = re.compile(r"^[\W_]*etapa\s*([1-5])\b", re.IGNORECASE | re.MULTILINE)
+ETAPA_MENTION = re.compile(r"\betapa\s*([1-5])\b", re.IGNORECASE)
+
+
+class MessageKind(Enum):
+    """
+    Classification of a chat message for phase counting and rendering
+    """
+    SYSTEM = "system"
+    TRIGGER = "trigger"  # Automatic message inserted by the app (hidden, not a real interaction)
+    CHAT = "chat"
+
+
+def classify_message(message: dict) -> MessageKind:
+    """
+    Classify a message once, using the precompiled trigger matcher
+    
+    Args:
+        message: Message dictionary with 'role' and 'content'
+        
+    Returns:
+        MessageKind: Kind of the message
+    """
+    if message.get("role") == "system":
+        return MessageKind.SYSTEM
+    if TRIGGER_MATCHER.search(str(message.get("content", ""))):
+        return MessageKind.TRIGGER
+    return MessageKind.CHAT
+
+
+def is_command(content: str) -> bool:
+    """
+    Check whether a message content triggers the execution phase
+    
+    Args:
+        content: Message content
+        
+    Returns:
+        bool: True if any command keyword is present (case-insensitive)
+    """
+    return COMMAND_MATCHER.search(str(content)) is not None
+
+
+def mentioned_etapa(message: dict):
+    """
+    Find the optimizer step (ETAPA 1-5) a message starts or asks for
+    
+    Args:
+        message: Message dictionary with 'role' and 'content'
+        
+    Returns:
+        int or None: Last step found in the message
+    """
+    pattern = ETAPA_HEADING if message.get("role") == "assistant" else ETAPA_MENTION
+    steps = pattern.findall(str(message.get("content", "")))
+    return int(steps[-1]) if steps else None
+
+
+def task_for_etapa(etapa) -> str:
+    """
+    Model task for a reply in the given optimizer step
+    
+    Args:
+        etapa: Optimizer step (1-5) or None
+        
+    Returns:
+        str: "execution" for the rewrite steps (ETAPA 4/5), "chat" otherwise
+    """
+    return "execution" if etapa is not None and etapa >= FSM_EXECUTION_MIN_ETAPA else "chat"
 
 
 class Phase(Enum):
@@ -39,12 +123,62 @@ class PhaseManager:
     """
     Manages phase transitions using a Finite State Machine (FSM) approach.
     Uses message counting instead of fragile keyword matching.
+    Counters are kept incrementally: each message is classified once, when observed.
     """
     
     def __init__(self):
         """Initialize the phase manager with UPLOAD phase"""
         self.current_phase = Phase.UPLOAD
         self.cv_loaded = False
+        self._reset_counters()
+    
+    def _reset_counters(self):
+        """Reset the incremental message counters"""
+        self.observed_count = 0  # Messages already observed (prefix of the history)
+        self.chat_message_count = 0  # User/assistant messages that are not internal triggers
+        self.ai_message_count = 0  # All assistant messages
+        self.last_user_command = False  # Whether the last observed message is a user command
+        self.etapa = None  # Last optimizer step (ETAPA 1-5) started or requested
+        self.etapa_answered = False  # Whether the user replied after that step started
+    
+    def observe(self, message: dict) -> MessageKind:
+        """
+        Register a newly appended message, updating the counters in O(1)
+        
+        Args:
+            message: Message dictionary with 'role' and 'content'
+            
+        Returns:
+            MessageKind: Classification of the message
+        """
+        kind = classify_message(message)
+        role = message.get("role")
+        if kind == MessageKind.CHAT and role in ["user", "assistant"]:
+            self.chat_message_count += 1
+        if role == "assistant":
+            self.ai_message_count += 1
+        self.last_user_command = role == "user" and is_command(message.get("content", ""))
+        etapa = mentioned_etapa(message)
+        if etapa is not None:
+            self.etapa = etapa
+            self.etapa_answered = False
+        elif role == "user" and self.etapa is not None:
+            self.etapa_answered = True
+        self.observed_count += 1
+        return kind
+    
+    def sync(self, messages: list):
+        """
+        Observe only the messages appended since the last call
+        
+        Args:
+            messages: Full message history (append-only)
+        """
+        if len(messages) < self.observed_count:
+            # History was replaced (e.g. session reset): recount from scratch
+            self._reset_counters()
+        for msg in messages[self.observed_count:]:
+            self.observe(msg)
         
     def get_phase_value(self) -> str:
         """
@@ -55,6 +189,23 @@ class PhaseManager:
         """
         return self.current_phase.value
     
+    def response_task(self) -> str:
+        """
+        Model task for the next AI reply, based on the tracked optimizer step
+        
+        ETAPA 3 (Curadoria) is a single question: once answered, the next reply
+        is the ETAPA 4 rewrite.
+        
+        Returns:
+            str: "execution" for ETAPA 4/5, "chat" for the diagnosis and ETAPA 1-3
+        """
+        if self.current_phase != Phase.EXECUCAO:
+            return "chat"
+        etapa = self.etapa
+        if etapa == 3 and self.etapa_answered:
+            etapa = 4
+        return task_for_etapa(etapa)
+    
     def count_user_ai_pairs(self, messages: list) -> int:
         """
         Count user-AI message pairs, excluding system messages and internal triggers
@@ -67,12 +218,8 @@ class PhaseManager:
         """
         count = 0
         for msg in messages:
-            # Skip system messages and internal triggers
-            if msg.get("role") == "system":
-                continue
-            content = str(msg.get("content", "")).upper()  # Case-insensitive matching
-            # Use trigger keywords from config (case-insensitive)
-            if any(keyword.upper() in content for keyword in FSM_TRIGGER_KEYWORDS):
+            # Skip system messages and internal triggers (precompiled, case-insensitive)
+            if classify_message(msg) != MessageKind.CHAT:
                 continue
             if msg.get("role") in ["user", "assistant"]:
                 count += 1
@@ -96,42 +243,40 @@ class PhaseManager:
             return True
         return False
     
-    def transition_to_diagnostico_em_andamento(self, messages: list) -> bool:
+    def transition_to_diagnostico_em_andamento(self, messages: list = None) -> bool:
         """
         Transition from DIAGNOSTICO to DIAGNOSTICO_EM_ANDAMENTO after AI responds
         
         Args:
-            messages: List of all messages
+            messages: List of all messages (optional; only new messages are observed)
             
         Returns:
             bool: True if transition occurred
         """
-        if self.current_phase == Phase.DIAGNOSTICO and messages:
-            # Count AI messages after the diagnostic phase started
-            ai_count = 0
-            for msg in messages:
-                if msg.get("role") == "assistant":
-                    ai_count += 1
-            
+        if messages:
+            self.sync(messages)
+        if self.current_phase == Phase.DIAGNOSTICO and self.observed_count:
             # Use threshold from config
-            if ai_count >= FSM_MIN_AI_MESSAGES_FOR_DIAGNOSTICO_EM_ANDAMENTO:
+            if self.ai_message_count >= FSM_MIN_AI_MESSAGES_FOR_DIAGNOSTICO_EM_ANDAMENTO:
                 self.current_phase = Phase.DIAGNOSTICO_EM_ANDAMENTO
                 logger.info("Phase transition: DIAGNOSTICO → DIAGNOSTICO_EM_ANDAMENTO (≥1 AI message)")
                 return True
         return False
     
-    def transition_to_menu(self, messages: list) -> bool:
+    def transition_to_menu(self, messages: list = None) -> bool:
         """
         Transition from DIAGNOSTICO_EM_ANDAMENTO to MENU after sufficient interaction
         
         Args:
-            messages: List of all messages
+            messages: List of all messages (optional; only new messages are observed)
             
         Returns:
             bool: True if transition occurred
         """
-        if self.current_phase == Phase.DIAGNOSTICO_EM_ANDAMENTO and messages:
-            pairs = self.count_user_ai_pairs(messages)
+        if messages:
+            self.sync(messages)
+        if self.current_phase == Phase.DIAGNOSTICO_EM_ANDAMENTO and self.observed_count:
+            pairs = self.chat_message_count // 2
             
             # Use threshold from config
             if pairs >= FSM_MIN_MESSAGE_PAIRS_FOR_MENU:
@@ -152,8 +297,7 @@ class PhaseManager:
         """
         if self.current_phase == Phase.MENU:
             # Use command keywords from config (case-insensitive matching)
-            content_upper = last_message_content.upper()
-            if any(keyword.upper() in content_upper for keyword in FSM_COMMAND_KEYWORDS):
+            if is_command(last_message_content):
                 self.current_phase = Phase.EXECUCAO
                 logger.info("Phase transition: MENU → EXECUCAO (command triggered)")
                 return True
@@ -175,19 +319,22 @@ class PhaseManager:
             self.transition_to_diagnostico(cv_content)
         
         if messages:
+            # Only messages appended since the last update are classified
+            self.sync(messages)
+        
+        if self.observed_count:
             # Try transitions in logical order
             if self.current_phase == Phase.DIAGNOSTICO:
-                self.transition_to_diagnostico_em_andamento(messages)
+                self.transition_to_diagnostico_em_andamento()
             
             elif self.current_phase == Phase.DIAGNOSTICO_EM_ANDAMENTO:
-                self.transition_to_menu(messages)
+                self.transition_to_menu()
             
-            elif self.current_phase == Phase.MENU and len(messages) > 0:
-                # Check if last message (from button click) contains a command trigger
+            elif self.current_phase == Phase.MENU and self.last_user_command:
+                # Last message (from button click) is a user command trigger
                 # Note: This is primarily called explicitly from app.py when buttons are clicked
-                last_msg = messages[-1]
-                if last_msg.get("role") == "user":  # Only check user messages
-                    self.transition_to_execucao(str(last_msg.get("content", "")))
+                self.current_phase = Phase.EXECUCAO
+                logger.info("Phase transition: MENU → EXECUCAO (command triggered)")
         
         return self.get_phase_value()
     
@@ -195,4 +342,20 @@ class PhaseManager:
         """Reset the phase manager to initial state"""
         self.current_phase = Phase.UPLOAD
         self.cv_loaded = False
+        self._reset_counters()
         logger.info("Phase manager reset to UPLOAD")
+    
+    def restore(self, phase_value: str, messages: list, cv_content: str = None):
+        """
+        Restore a persisted session: set the stored phase and recount the history
+        
+        Args:
+            phase_value: Stored phase value (e.g. "MENU")
+            messages: Full restored message history
+            cv_content: Restored CV text (marks the CV as loaded)
+        """
+        self.current_phase = Phase(phase_value) if phase_value else Phase.UPLOAD
+        self.cv_loaded = bool(cv_content)
+        self._reset_counters()
+        self.sync(messages)
+        logger.info(f"Phase manager restored to {self.current_phase.value}")
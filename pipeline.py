@@ -0,0 +1,119 @@
+"""
+Pipeline de processamento do CV após o upload
+
+A análise de perfil (cargo + ATS, em uma única chamada) roda em segundo
+plano, enquanto o diagnóstico inicial é transmitido ao usuário. A resposta
+chega em streaming e o último resultado parcial fica disponível para o
+dashboard antes do resultado final.
+
+Análises do mesmo PDF em andamento (rerun no meio do upload, outra aba) são
+compartilhadas em vez de repetidas.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import UPLOAD_PIPELINE_MAX_WORKERS
+from engine import analyze_cv_profile
+from cv_cache import get_cv_cache
+
+# Executor compartilhado pelo processo (sobrevive a reruns do Streamlit)
+_executor = ThreadPoolExecutor(max_workers=UPLOAD_PIPELINE_MAX_WORKERS, thread_name_prefix="nobile-pipeline")
+
+# Análises em andamento por chave do cache de CV (single-flight)
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+class ProfileJob:
+    """
+    Análise de perfil em andamento: resultado final (Future) e último resultado parcial
+    """
+
+    def __init__(self):
+        self.future = None
+        self.partial = None  # {"target_role", "ats_score", "keywords_present", "keywords_missing"}
+
+    def publish(self, partial):
+        self.partial = partial
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+
+def _analyze_profile(cv_text, api_key, cache_key, job):
+    """Cargo e ATS vêm da mesma chamada estruturada"""
+    result = analyze_cv_profile(cv_text, api_key, on_progress=job.publish)
+    if result is None:
+        return {"target_role": "Profissional", "ats_data": None}
+    target_role = result.pop("target_role")
+    # Resultado montado a partir de uma resposta truncada: vale para esta sessão, mas não vai ao cache
+    if cache_key and not result.pop("partial", False):
+        get_cv_cache().update(cache_key, target_role=target_role, ats_data=result)
+    return {"target_role": target_role, "ats_data": result}
+
+
+def start_profile_analysis(cv_text, api_key, cache_key=None):
+    """
+    Inicia em segundo plano a extração de cargo e o cálculo do ATS Score
+
+    Args:
+        cv_text: Texto completo do CV
+        api_key: Chave API da OpenAI
+        cache_key: Chave do cache de CV onde gravar o resultado (opcional)
+
+    Returns:
+        ProfileJob: Resolve para {"target_role": str, "ats_data": dict or None};
+                    a análise já em andamento para o mesmo cache_key, se houver
+    """
+    with _in_flight_lock:
+        job = _in_flight.get(cache_key) if cache_key else None
+        if job is not None and not job.done():
+            return job
+        job = ProfileJob()
+        job.future = _executor.submit(_analyze_profile, cv_text, api_key, cache_key, job)
+        if cache_key:
+            _in_flight[cache_key] = job
+    if cache_key:
+        job.future.add_done_callback(lambda _: _forget(cache_key, job))
+    return job
+
+
+def _forget(cache_key, job):
+    with _in_flight_lock:
+        if _in_flight.get(cache_key) is job:
+            del _in_flight[cache_key]
+
+
+def collect_profile_analysis(future):
+    """
+    Obtém o resultado da análise de perfil, se já estiver pronto
+
+    Args:
+        future: ProfileJob retornado por start_profile_analysis
+
+    Returns:
+        dict or None: Resultado da análise ou None se ainda estiver em andamento
+    """
+    if future is None or not future.done():
+        return None
+    try:
+        return future.result()
+    except Exception:
+        return {"target_role": "Profissional", "ats_data": None}
+
+
+def peek_profile_analysis(job):
+    """
+    Obtém o resultado parcial de uma análise em andamento
+
+    Args:
+        job: ProfileJob retornado por start_profile_analysis
+
+    Returns:
+        dict or None: Cargo e ATS parciais (keywords recebidas até agora) ou None
+    """
+    return job.partial if job is not None else None
@@ -90,6 +90,116 @@ FORMATO JSON OBRIGATÓRIO:
 }}
 """
     
+    # --- PROMPT COMBINADO: CARGO + KEYWORDS ATS (UMA ÚNICA CHAMADA) ---
+    @staticmethod
+    def profile_analysis_prompt(cv_text: str, target_role: str = None) -> str:
+        """
+        Template para identificar o cargo e as palavras-chave ATS na mesma chamada
+        
+        O Score ATS é calculado localmente (ats_matcher) a partir das keywords retornadas.
+        
+        Args:
+            cv_text: Texto do CV (já truncado se necessário)
+            target_role: Cargo alvo já conhecido (opcional). Se ausente, o cargo é identificado no CV
+            
+        Returns:
+            str: Prompt formatado para análise combinada de perfil
+        """
+        if target_role:
+            cargo_instrucao = f'Use como cargo alvo: "{target_role}" (retorne-o em "target_role").'
+        else:
+            cargo_instrucao = (
+                'Identifique o cargo/função principal da pessoa (ex: "Gerente de Vendas", '
+                '"Desenvolvedor Python", "Diretor Comercial"). Seja específico e conciso (máximo 4 palavras).'
+            )
+        return f"""
+ATUE COMO: Auditor de RH e Especialista em ATS.
+CONTEXTO:
+- CV Texto: {cv_text}
+
+TAREFA (Retorne JSON):
+1. **Target_Role**: {cargo_instrucao}
+2. **Keywords**: Liste 12-15 palavras-chave (termos curtos, 1-3 palavras) que um ATS buscaria para esse cargo,
+   independentemente de estarem ou não no CV.
+3. **Recomendacoes**: Liste 3 recomendações curtas para melhorar a aderência do CV ao cargo.
+
+FORMATO JSON OBRIGATÓRIO:
+{{
+    "target_role": "Cargo",
+    "keywords": ["k1", "k2", "k3"],
+    "recomendacoes": ["r1", "r2", "r3"]
+}}
+"""
+    
+    # --- PROMPT PARA LISTA DE KEYWORDS DE UM CARGO ---
+    @staticmethod
+    def role_keywords_prompt(target_role: str) -> str:
+        """
+        Template para obter as palavras-chave ATS de um cargo (sem o CV)
+        
+        Args:
+            target_role: Cargo alvo
+            
+        Returns:
+            str: Prompt formatado para lista de keywords do cargo
+        """
+        return f"""
+ATUE COMO: Especialista em ATS e Recrutamento.
+Cargo Alvo: {target_role}
+
+Liste 12-15 palavras-chave (termos curtos, 1-3 palavras) que um ATS buscaria em CVs para esse cargo:
+competências técnicas, ferramentas, responsabilidades e indicadores típicos.
+
+FORMATO JSON OBRIGATÓRIO:
+{{
+    "keywords": ["k1", "k2", "k3"]
+}}
+"""
+    
+    # --- PROMPT PARA RESUMO INCREMENTAL DA CONVERSA ---
+    @staticmethod
+    def conversation_summary_prompt(previous_summary: str, transcript: str, max_words: int) -> str:
+        """
+        Template para atualizar o resumo das mensagens que saíram da janela de contexto
+        
+        Args:
+            previous_summary: Resumo acumulado até agora (pode ser vazio)
+            transcript: Mensagens antigas a incorporar, já formatadas
+            max_words: Tamanho máximo do resumo atualizado
+            
+        Returns:
+            str: Prompt formatado para resumo incremental
+        """
+        return f"""
+Você mantém a memória de uma consultoria de carreira (Headhunter + candidato).
+Atualize o RESUMO ATUAL incorporando as NOVAS MENSAGENS.
+
+PRESERVE obrigatoriamente: respostas P1-P4 (objetivo, cargos, pretensão, localização), etapa atual do
+protocolo, palavras-chave e métricas (R$, %, números) informadas pelo usuário, decisões e textos aprovados.
+Descarte cortesias e repetições. Máximo de {max_words} palavras, em tópicos.
+
+RESUMO ATUAL:
+{previous_summary or "(vazio)"}
+
+NOVAS MENSAGENS:
+{transcript}
+
+Retorne APENAS o resumo atualizado.
+"""
+    
+    @staticmethod
+    def conversation_summary_message(summary: str) -> str:
+        """
+        Template da mensagem de sistema que substitui as mensagens antigas
+        
+        Args:
+            summary: Resumo acumulado da conversa
+            
+        Returns:
+            str: Conteúdo da mensagem de sistema com o resumo
+        """
+        return f"RESUMO DA CONVERSA ATÉ AQUI (mensagens anteriores condensadas):\n{summary}"
+    
     # --- PROMPTS DE TRIGGERS PARA AÇÕES DO USUÁRIO ---
     @staticmethod
     def cv_upload_trigger(cv_text: str) -> str:
@@ -0,0 +1,204 @@
+"""
+Agendador global de requisições à IA, ciente dos limites de RPM/TPM da API key
+
+Todas as sessões do Streamlit (e as threads do pipeline e do batch_cli.py) que
+usam a mesma API key dividem o mesmo orçamento de requisições e tokens por
+minuto. Cada chamada reserva uma requisição e uma estimativa de tokens em dois
+token buckets; quem não cabe no orçamento espera em uma fila por prioridade,
+na qual chamadas interativas (chat) passam à frente das de segundo plano
+(cargo/ATS).
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+from config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_RPM,
+    RATE_LIMIT_TPM,
+    RATE_LIMIT_COMPLETION_TOKENS,
+)
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITIES = {"interactive": INTERACTIVE, "background": BACKGROUND}
+CANCEL_POLL_SECONDS = 0.5  # Intervalo de verificação do cancelamento enquanto espera na fila
+
+
+class AcquireCancelled(Exception):
+    """A chamada foi cancelada enquanto esperava a vez na fila"""
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """
+    Estima os tokens consumidos por uma chamada (entrada + saída reservada)
+
+    Args:
+        messages: Mensagens enviadas
+        max_tokens: Limite de tokens da resposta (padrão: RATE_LIMIT_COMPLETION_TOKENS)
+
+    Returns:
+        int: Estimativa de ~4 caracteres por token na entrada mais a saída reservada
+    """
+    prompt = sum(len(str(m.get("content") or "")) for m in messages) // 4 + 4 * len(messages)
+    return prompt + (max_tokens or RATE_LIMIT_COMPLETION_TOKENS)
+
+
+class TokenBucket:
+    """
+    Bucket reabastecido continuamente até o limite por minuto
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount, now):
+        """Segundos até haver `amount` disponível (0 se já houver)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # Pedidos maiores que o bucket esperam enchê-lo
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class _KeyState:
+    """Buckets e fila de espera de uma API key"""
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.waiting = []
+
+
+class RateLimitScheduler:
+    """
+    Fila por prioridade com contabilidade de RPM/TPM por API key
+    """
+
+    def __init__(self, rpm=RATE_LIMIT_RPM, tpm=RATE_LIMIT_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._keys = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._acquired = {p: 0 for p in PRIORITIES.values()}
+        self._wait_total = {p: 0.0 for p in PRIORITIES.values()}
+        self._waits = {p: deque(maxlen=500) for p in PRIORITIES.values()}
+
+    def _state(self, api_key):
+        state = self._keys.get(api_key)
+        if state is None:
+            state = self._keys[api_key] = _KeyState(self.rpm, self.tpm)
+        return state
+
+    def acquire(self, api_key, tokens, priority=INTERACTIVE, cancel=None):
+        """
+        Bloqueia até a chamada caber no orçamento da API key
+
+        Só o primeiro da fila (menor prioridade, depois ordem de chegada) consome
+        o orçamento; os demais aguardam a vez.
+
+        Args:
+            api_key: Chave cujo orçamento é usado
+            tokens: Estimativa de tokens da chamada
+            priority: INTERACTIVE ou BACKGROUND
+            cancel: threading.Event que desiste da espera sem consumir o orçamento (opcional)
+
+        Returns:
+            float: Segundos de espera na fila
+
+        Raises:
+            AcquireCancelled: cancel foi sinalizado antes da vez da chamada
+        """
+        start = time.monotonic()
+        with self._cond:
+            state = self._state(api_key)
+            entry = (priority, next(self._seq))
+            heapq.heappush(state.waiting, entry)
+            try:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        raise AcquireCancelled("Chamada cancelada na fila do rate limit")
+                    timeout = None
+                    if state.waiting[0] == entry:
+                        now = time.monotonic()
+                        timeout = max(state.requests.delay(1, now), state.tokens.delay(tokens, now))
+                        if timeout == 0:
+                            state.requests.take(1)
+                            state.tokens.take(tokens)
+                            break
+                    if cancel is not None:
+                        timeout = min(timeout, CANCEL_POLL_SECONDS) if timeout is not None else CANCEL_POLL_SECONDS
+                    self._cond.wait(timeout)
+            finally:
+                state.waiting.remove(entry)
+                heapq.heapify(state.waiting)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self._acquired[priority] += 1
+            self._wait_total[priority] += waited
+            self._waits[priority].append(waited)
+        return waited
+
+    def stats(self):
+        """
+        Profundidade da fila e tempos de espera, por prioridade
+
+        Returns:
+            dict: {"interactive"|"background": {"queued", "acquired", "wait_avg_s",
+                   "wait_p95_s", "wait_max_s"}} (p95/máx sobre as 500 últimas esperas)
+        """
+        with self._cond:
+            queued = {p: 0 for p in PRIORITIES.values()}
+            for state in self._keys.values():
+                for priority, _ in state.waiting:
+                    queued[priority] += 1
+            stats = {}
+            for name, priority in PRIORITIES.items():
+                waits = sorted(self._waits[priority])
+                acquired = self._acquired[priority]
+                stats[name] = {
+                    "queued": queued[priority],
+                    "acquired": acquired,
+                    "wait_avg_s": self._wait_total[priority] / acquired if acquired else 0.0,
+                    "wait_p95_s": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                    "wait_max_s": waits[-1] if waits else 0.0,
+                }
+            return stats
+
+
+_scheduler = RateLimitScheduler()
+
+
+def get_scheduler():
+    """Agendador compartilhado pelo processo"""
+    return _scheduler
+
+
+def acquire(api_key, tokens, priority=INTERACTIVE, cancel=None):
+    """
+    Reserva orçamento no agendador global (sem efeito se RATE_LIMIT_ENABLED for False)
+
+    Returns:
+        float: Segundos de espera na fila
+
+    Raises:
+        AcquireCancelled: cancel foi sinalizado antes da vez da chamada
+    """
+    if cancel is not None and cancel.is_set():
+        raise AcquireCancelled("Chamada cancelada antes da fila do rate limit")
+    if not RATE_LIMIT_ENABLED or not api_key:
+        return 0.0
+    return _scheduler.acquire(api_key, tokens, priority, cancel)
@@ -0,0 +1,276 @@
+"""
+Políticas de resiliência para chamadas de IA: deadline, retry com backoff e requisições hedged
+
+Cada tipo de chamada (chat, profile, role_keywords, summary) tem sua política
+em config.LLM_CALL_POLICIES:
+  - timeout: deadline de cada tentativa (segundos de relógio, incluindo todo o stream)
+  - read_timeout: espera máxima por cada leitura da conexão (padrão: timeout)
+  - max_retries: novas tentativas em erros transitórios (429, 5xx, timeout, conexão)
+  - backoff_base / backoff_max: backoff exponencial com jitter completo
+  - hedge: dispara uma segunda requisição idêntica se a primeira passar do p95 observado
+  - priority: fila do agendador de rate limit (rate_limiter.py) em que cada tentativa espera
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+
+from config import LLM_CALL_POLICIES, LLM_HEDGE_MIN_SAMPLES, LLM_HEDGE_MAX_WORKERS
+import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Falha definitiva de uma chamada de IA (após esgotar as tentativas)"""
+
+
+@lru_cache(maxsize=1)
+def _retryable_errors():
+    """Tipos de erro transitórios (o SDK da OpenAI só é importado quando a primeira falha acontece)"""
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+        TimeoutError,
+        ConnectionError,
+    )
+
+
+def is_retryable(error):
+    """
+    Indica se o erro é transitório (vale tentar de novo)
+
+    Args:
+        error: Exceção levantada pela chamada
+
+    Returns:
+        bool: True para 429, 5xx, timeouts e falhas de conexão
+    """
+    if isinstance(error, _retryable_errors()):
+        return True
+    status = getattr(error, "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+def get_policy(call_type):
+    """Política do tipo de chamada (cai na política "chat" se não houver uma específica)"""
+    return LLM_CALL_POLICIES.get(call_type, LLM_CALL_POLICIES["chat"])
+
+
+def backoff_delay(attempt, policy):
+    """
+    Espera antes da próxima tentativa: exponencial com jitter completo
+
+    Args:
+        attempt: Número da tentativa que falhou (0 = primeira)
+        policy: Política do tipo de chamada
+
+    Returns:
+        float: Segundos de espera
+    """
+    cap = min(policy["backoff_max"], policy["backoff_base"] * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+class LatencyTracker:
+    """
+    Janela das latências recentes por tipo de chamada (para o gatilho de hedging)
+    """
+
+    def __init__(self, window=200):
+        self._samples = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, call_type, seconds):
+        with self._lock:
+            self._samples.setdefault(call_type, deque(maxlen=self._window)).append(seconds)
+
+    def p95(self, call_type):
+        """
+        Returns:
+            float or None: p95 das latências recentes ou None com poucas amostras
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(call_type, ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return samples[int(0.95 * (len(samples) - 1))]
+
+
+latency_tracker = LatencyTracker()
+_hedge_executor = ThreadPoolExecutor(max_workers=LLM_HEDGE_MAX_WORKERS, thread_name_prefix="nobile-hedge")
+
+
+class DeadlineExceeded(TimeoutError):
+    """A tentativa passou do deadline da política (transitório: vale tentar de novo)"""
+
+
+def _read_timeout(policy, remaining):
+    """Timeout de leitura repassado ao cliente HTTP, nunca além do que resta do deadline"""
+    return max(0.001, min(policy.get("read_timeout", policy["timeout"]), remaining))
+
+
+def _run_with_deadline(run, deadline):
+    """
+    Executa uma tentativa bloqueante em uma thread própria, desistindo ao passar do deadline
+
+    A thread abandonada termina sozinha no timeout de leitura repassado à requisição.
+    """
+    future = Future()
+
+    def target():
+        try:
+            future.set_result(run(max(0.001, deadline - time.monotonic())))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name="nobile-call", daemon=True).start()
+    done, _ = wait([future], timeout=max(0.0, deadline - time.monotonic()))
+    if not done:
+        raise DeadlineExceeded("Deadline da chamada excedido")
+    return future.result()
+
+
+def _timed(call_type, attempt, timeout):
+    """Executa uma tentativa registrando sua latência (sem a espera no rate limit)"""
+    start = time.perf_counter()
+    result = attempt(timeout)
+    latency_tracker.record(call_type, time.perf_counter() - start)
+    return result
+
+
+def _hedged(run, deadline, hedge_after, reserve):
+    """
+    Executa a tentativa e, se passar de hedge_after, dispara uma cópia; vence a primeira a concluir
+
+    As duas requisições dividem o mesmo deadline de relógio.
+    """
+    primary = _hedge_executor.submit(run, max(0.001, deadline - time.monotonic()))
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    def hedge():
+        reserve()  # A cópia também consome o orçamento de rate limit
+        return run(max(0.001, deadline - time.monotonic()))
+
+    logger.info(f"Requisição hedged disparada após {hedge_after:.2f}s")
+    pending = {primary, _hedge_executor.submit(hedge)}
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded("Deadline da chamada excedido")
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def _reserve(policy, api_key, tokens, cancel=None):
+    """Callable que aguarda a vez da tentativa no agendador de rate limit"""
+    priority = rate_limiter.PRIORITIES[policy.get("priority", "interactive")]
+    return lambda: rate_limiter.acquire(api_key, tokens, priority, cancel)
+
+
+def call_with_policy(call_type, attempt, api_key=None, tokens=0):
+    """
+    Executa uma chamada de IA aplicando deadline, retries, hedging e rate limit do tipo
+
+    O deadline (policy["timeout"]) conta a partir do fim da espera no rate limit e
+    cobre a tentativa inteira; ao passar dele, a tentativa é abandonada e conta
+    como timeout (nova tentativa ou LLMError).
+
+    Args:
+        call_type: Tipo da chamada (chave de LLM_CALL_POLICIES)
+        attempt: Callable(timeout) que faz UMA tentativa e retorna o resultado
+        api_key: Chave cujo orçamento de RPM/TPM é consumido (None = sem rate limit)
+        tokens: Estimativa de tokens de cada tentativa (rate_limiter.estimate_tokens)
+
+    Returns:
+        Resultado da primeira tentativa bem-sucedida
+
+    Raises:
+        LLMError: Erro não transitório ou tentativas esgotadas
+    """
+    policy = get_policy(call_type)
+    reserve = _reserve(policy, api_key, tokens)
+    run = lambda remaining: _timed(call_type, attempt, _read_timeout(policy, remaining))
+    for n in range(policy["max_retries"] + 1):
+        try:
+            reserve()
+            deadline = time.monotonic() + policy["timeout"]
+            hedge_after = latency_tracker.p95(call_type) if policy.get("hedge") else None
+            if hedge_after is not None and hedge_after < policy["timeout"]:
+                return _hedged(run, deadline, hedge_after, reserve)
+            return _run_with_deadline(run, deadline)
+        except Exception as e:
+            if not is_retryable(e) or n == policy["max_retries"]:
+                raise LLMError(str(e)) from e
+            delay = backoff_delay(n, policy)
+            logger.warning(f"Chamada '{call_type}' falhou ({e}); nova tentativa em {delay:.2f}s")
+            time.sleep(delay)
+
+
+def stream_with_policy(call_type, open_stream, api_key=None, tokens=0, cancel=None):
+    """
+    Consome um stream aplicando deadline e retries até o primeiro trecho
+
+    O deadline (policy["timeout"]) vale para a tentativa inteira, não só para cada
+    leitura: um stream que continua enviando trechos devagar é fechado ao passar
+    dele. Depois que o primeiro trecho foi entregue, uma falha não é repetida (o
+    texto parcial já foi exibido) e vira LLMError.
+
+    Args:
+        call_type: Tipo da chamada (chave de LLM_CALL_POLICIES)
+        open_stream: Callable(timeout) que retorna um iterador de trechos
+        api_key: Chave cujo orçamento de RPM/TPM é consumido (None = sem rate limit)
+        tokens: Estimativa de tokens de cada tentativa (rate_limiter.estimate_tokens)
+        cancel: threading.Event verificado antes de cada tentativa e na fila do rate limit;
+                cancelada antes de abrir a requisição, a chamada não é cobrada (opcional)
+
+    Yields:
+        str: Trechos da resposta
+
+    Raises:
+        LLMError: Erro não transitório, tentativas esgotadas ou falha no meio do stream
+    """
+    policy = get_policy(call_type)
+    reserve = _reserve(policy, api_key, tokens, cancel)
+    for n in range(policy["max_retries"] + 1):
+        started = False
+        try:
+            reserve()
+            if cancel is not None and cancel.is_set():
+                raise rate_limiter.AcquireCancelled("Chamada cancelada antes de abrir a requisição")
+            start = time.perf_counter()
+            deadline = time.monotonic() + policy["timeout"]
+            stream = iter(open_stream(_read_timeout(policy, policy["timeout"])))
+            try:
+                for delta in stream:
+                    if time.monotonic() > deadline:
+                        raise DeadlineExceeded(f"Deadline de {policy['timeout']:g}s do stream excedido")
+                    if not started:
+                        started = True
+                        latency_tracker.record(call_type, time.perf_counter() - start)
+                    yield delta
+            finally:
+                if hasattr(stream, "close"):
+                    stream.close()  # Fecha a conexão (deadline, erro ou leitor que desistiu)
+            return
+        except Exception as e:
+            if started or not is_retryable(e) or n == policy["max_retries"]:
+                raise LLMError(str(e)) from e
+            delay = backoff_delay(n, policy)
+            logger.warning(f"Stream '{call_type}' falhou ({e}); nova tentativa em {delay:.2f}s")
+            time.sleep(delay)
@@ -0,0 +1,107 @@
+"""
+Comparação de um ou vários CVs com vários cargos em uma única passada vetorizada
+
+O catálogo indexa as keywords de todos os cargos em um vocabulário único
+(keywords com os mesmos radicais viram uma coluna só). Cada CV é varrido uma
+vez pelo autômato de ats_matcher com o vocabulário inteiro, gerando uma
+linha da matriz CV × keyword; os scores de todos os cargos saem de um único
+produto matricial com a matriz cargo × keyword.
+"""
+
+import numpy as np
+
+from ats_matcher import KeywordMatcher, tokenize
+
+
+class RoleCatalog:
+    """
+    Índice de keywords por cargo
+
+    Args:
+        role_keywords: Dicionário {cargo: lista de keywords}
+    """
+
+    def __init__(self, role_keywords):
+        self.roles = []
+        self.keywords = []  # Texto de cada coluna (primeira grafia encontrada)
+        self._columns = []  # Colunas de cada cargo, na ordem das keywords do cargo
+        vocabulary = {}
+        for role, keywords in role_keywords.items():
+            columns = []
+            for keyword in keywords or []:
+                tokens = tuple(tokenize(keyword))
+                if not tokens:
+                    continue
+                if tokens not in vocabulary:
+                    vocabulary[tokens] = len(self.keywords)
+                    self.keywords.append(keyword.strip())
+                if vocabulary[tokens] not in columns:
+                    columns.append(vocabulary[tokens])
+            if columns:
+                self.roles.append(role)
+                self._columns.append(columns)
+
+        self.matcher = KeywordMatcher(self.keywords)
+        self.matrix = np.zeros((len(self.roles), len(self.keywords)), dtype=np.float64)
+        for row, columns in enumerate(self._columns):
+            self.matrix[row, columns] = 1.0
+        self.sizes = self.matrix.sum(axis=1)
+
+    def presence(self, cv_texts):
+        """
+        Monta a matriz de presença das keywords do catálogo
+
+        Args:
+            cv_texts: Textos completos dos CVs
+
+        Returns:
+            np.ndarray: Matriz booleana (nº de CVs × nº de keywords)
+        """
+        result = np.zeros((len(cv_texts), len(self.keywords)), dtype=bool)
+        for row, text in enumerate(cv_texts):
+            found = self.matcher.find(text or "")
+            if found:
+                result[row, list(found)] = True
+        return result
+
+    def scores(self, presence):
+        """
+        Calcula o Score ATS de todos os CVs para todos os cargos
+
+        Args:
+            presence: Matriz retornada por presence()
+
+        Returns:
+            np.ndarray: Scores inteiros 0-100 (nº de CVs × nº de cargos)
+        """
+        hits = presence.astype(np.float64) @ self.matrix.T
+        return np.rint(100 * hits / self.sizes).astype(int)
+
+    def rank(self, cv_text, roles=None):
+        """
+        Compara um CV com os cargos do catálogo
+
+        Args:
+            cv_text: Texto completo do CV
+            roles: Cargos a incluir (padrão: todos)
+
+        Returns:
+            list: Um dict por cargo (role, ats_score, keywords_present, keywords_missing),
+                  do maior para o menor score
+        """
+        presence = self.presence([cv_text])
+        scores = self.scores(presence)[0]
+        wanted = set(roles) if roles is not None else None
+        ranking = []
+        for index, role in enumerate(self.roles):
+            if wanted is not None and role not in wanted:
+                continue
+            columns = self._columns[index]
+            ranking.append({
+                "role": role,
+                "ats_score": int(scores[index]),
+                "keywords_present": [self.keywords[c] for c in columns if presence[0, c]],
+                "keywords_missing": [self.keywords[c] for c in columns if not presence[0, c]],
+            })
+        ranking.sort(key=lambda item: item["ats_score"], reverse=True)
+        return ranking
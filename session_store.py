@@ -0,0 +1,193 @@
+"""
+Armazenamento persistente das sessões de chat (SQLite, append-only)
+
+Cada mensagem é gravada como uma linha própria no momento em que é anexada
+(nada é regravado); o estado da sessão (CV, cargo, ATS e fase) fica em uma
+linha ao lado. Uma sessão é restaurada por ID apenas quando solicitada (ex: ao
+recarregar a página com ?sid=...). Cada posição do histórico é gravada uma
+única vez: se outra aba com o mesmo ?sid= (aba duplicada) já ocupou a posição,
+a gravação é recusada e a aba passa a uma sessão própria, sem perder mensagens.
+
+O armazenamento é de um único host: o modo WAL depende de memória
+compartilhada entre os processos da mesma máquina e não funciona em NFS ou
+outros sistemas de arquivos de rede. Processos no mesmo host podem usar o
+mesmo SESSION_STORE_PATH; réplicas em máquinas diferentes não.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from config import SESSION_STORE_PATH, SESSION_STORE_TTL_SECONDS
+from sqlite_store import connect, open_database, process_singleton
+
+logger = logging.getLogger(__name__)
+
+# Campos de estado gravados ao lado das mensagens
+_STATE_FIELDS = ("cv_content", "target_role", "ats_data", "phase")
+
+
+class SessionStore:
+    """
+    Sessões e mensagens em SQLite (WAL), com expiração por inatividade
+    """
+
+    def __init__(self, path=SESSION_STORE_PATH, ttl_seconds=SESSION_STORE_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        open_database(
+            path,
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, cv_content TEXT, target_role TEXT, ats_data TEXT,"
+            " phase TEXT, created REAL NOT NULL, updated REAL NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS session_messages ("
+            " session_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL,"
+            " content TEXT NOT NULL, kind TEXT, hidden INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (session_id, seq))",
+            "CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated)",
+        )
+
+    def create(self, messages=(), **state):
+        """
+        Cria uma sessão (e remove as expiradas)
+
+        Args:
+            messages: Histórico inicial (ex: o de uma aba que passa a ter sessão própria)
+            **state: cv_content, target_role, ats_data (dict) e/ou phase iniciais
+
+        Returns:
+            str: ID da nova sessão
+        """
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        try:
+            with self._lock, connect(self.path) as conn:
+                conn.execute("INSERT INTO sessions (id, created, updated) VALUES (?, ?, ?)", (session_id, now, now))
+                conn.executemany(
+                    "INSERT INTO session_messages (session_id, seq, role, content, kind, hidden)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [_message_row(session_id, seq, message) for seq, message in enumerate(messages)],
+                )
+                self._purge(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao criar sessão persistente: {e}")
+        self.update_state(session_id, **state)
+        return session_id
+
+    def append_message(self, session_id, seq, message):
+        """
+        Grava uma mensagem (uma linha por posição do histórico)
+
+        Args:
+            session_id: ID da sessão
+            seq: Posição da mensagem no histórico
+            message: Mensagem criada por chat_history.make_message
+
+        Returns:
+            bool: False se a posição já foi gravada por outra aba com a mesma sessão
+                  (a mensagem não é gravada); True caso contrário
+        """
+        try:
+            with self._lock, connect(self.path) as conn:
+                conn.execute(
+                    "INSERT INTO session_messages (session_id, seq, role, content, kind, hidden)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    _message_row(session_id, seq, message),
+                )
+                conn.execute("UPDATE sessions SET updated = ? WHERE id = ?", (time.time(), session_id))
+        except sqlite3.IntegrityError:
+            logger.info(f"Posição {seq} da sessão já gravada por outra aba")
+            return False
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao gravar mensagem da sessão: {e}")
+        return True
+
+    def update_state(self, session_id, **fields):
+        """
+        Atualiza o estado da sessão
+
+        Args:
+            session_id: ID da sessão
+            **fields: cv_content, target_role, ats_data (dict) e/ou phase
+        """
+        fields = {k: v for k, v in fields.items() if k in _STATE_FIELDS}
+        if not fields:
+            return
+        if "ats_data" in fields:
+            fields["ats_data"] = json.dumps(fields["ats_data"], ensure_ascii=False) if fields["ats_data"] else None
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        try:
+            with self._lock, connect(self.path) as conn:
+                conn.execute(
+                    f"UPDATE sessions SET {columns}, updated = ? WHERE id = ?",
+                    (*fields.values(), time.time(), session_id),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao gravar estado da sessão: {e}")
+
+    def load(self, session_id):
+        """
+        Restaura uma sessão pelo ID
+
+        Args:
+            session_id: ID da sessão
+
+        Returns:
+            dict or None: messages, cv_content, target_role, ats_data, phase
+                          (None se a sessão não existir ou tiver expirado)
+        """
+        try:
+            with self._lock, connect(self.path) as conn:
+                row = conn.execute(
+                    "SELECT cv_content, target_role, ats_data, phase, updated FROM sessions WHERE id = ?",
+                    (session_id,),
+                ).fetchone()
+                if row is None or time.time() - row[4] > self.ttl_seconds:
+                    return None
+                messages = [
+                    {"role": role, "content": content, "kind": kind, "hidden": bool(hidden)}
+                    for role, content, kind, hidden in conn.execute(
+                        "SELECT role, content, kind, hidden FROM session_messages"
+                        " WHERE session_id = ? ORDER BY seq",
+                        (session_id,),
+                    )
+                ]
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao restaurar sessão: {e}")
+            return None
+        return {
+            "messages": messages,
+            "cv_content": row[0],
+            "target_role": row[1] or "",
+            "ats_data": json.loads(row[2]) if row[2] else None,
+            "phase": row[3],
+        }
+
+    def _purge(self, conn, now):
+        """Remove sessões sem atividade há mais de ttl_seconds"""
+        cutoff = now - self.ttl_seconds
+        conn.execute(
+            "DELETE FROM session_messages WHERE session_id IN (SELECT id FROM sessions WHERE updated < ?)",
+            (cutoff,),
+        )
+        conn.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,))
+
+
+def _message_row(session_id, seq, message):
+    """Valores de uma linha de session_messages"""
+    return (session_id, seq, message["role"], message["content"], message.get("kind"), int(bool(message.get("hidden"))))
+
+
+@process_singleton
+def get_session_store():
+    """
+    Retorna o armazenamento de sessões compartilhado pelo processo
+
+    Returns:
+        SessionStore: Instância única (criada sob demanda)
+    """
+    return SessionStore()
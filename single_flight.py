@@ -0,0 +1,213 @@
+"""
+Single-flight das chamadas de IA de uma sessão
+
+Cada resposta transmitida é consumida por uma thread própria e gravada em um
+buffer (Flight). O número de streams simultâneos no processo é limitado: acima
+do limite, a chamada falha na hora com LLMError em vez de esperar em uma fila
+sem retorno ao usuário. Reruns do Streamlit, cliques duplos ou a troca do ramo de upload
+pelo do chat no meio de um streaming pedem a mesma chave (hash do estado da
+conversa) e passam a acompanhar a chamada já em andamento, ou reaproveitam
+a resposta já concluída, em vez de disparar outra.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from config import SINGLE_FLIGHT_MAX_ACTIVE, SINGLE_FLIGHT_MAX_ENTRIES, SINGLE_FLIGHT_STALL_TIMEOUT_SECONDS
+from resilience import LLMError
+
+logger = logging.getLogger(__name__)
+
+# Streams consumidos ao mesmo tempo no processo (todas as sessões)
+_active = threading.BoundedSemaphore(SINGLE_FLIGHT_MAX_ACTIVE)
+
+RUNNING, DONE, CANCELLED, CAPPED, FAILED = "running", "done", "cancelled", "capped", "failed"
+
+
+def conversation_key(messages, *extra):
+    """
+    Identifica o estado da conversa que originou uma chamada
+
+    Args:
+        messages: Histórico (lista de mensagens com 'role' e 'content')
+        *extra: Outros componentes da chamada (ex: tarefa)
+
+    Returns:
+        str: SHA-256 dos papéis e conteúdos, na ordem
+    """
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(f"{message['role']}\x00{message['content']}\x01".encode("utf-8"))
+    for part in extra:
+        digest.update(f"{part}\x02".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class Flight:
+    """
+    Resposta em streaming consumida em segundo plano para um buffer compartilhado
+
+    replay() entrega os trechos já recebidos e continua acompanhando a geração
+    até o fim; vários leitores (reruns) podem acompanhar o mesmo Flight.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.status = RUNNING
+        self.error = None
+        self._cancel = threading.Event()
+        self._cond = threading.Condition()
+
+    @property
+    def text(self):
+        return "".join(self.chunks)
+
+    def cancel(self):
+        """Interrompe a geração (o stream é fechado no próximo trecho)"""
+        self._cancel.set()
+
+    def _interrupt(self):
+        """Status de interrupção verificado a cada trecho (None = continua)"""
+        return CANCELLED if self._cancel.is_set() else None
+
+    def run(self, stream):
+        """Consome o stream para o buffer (executa em uma thread do pool)"""
+        status = FAILED
+        try:
+            for delta in stream:
+                with self._cond:
+                    self.chunks.append(delta)
+                    self._cond.notify_all()
+                status = self._interrupt()
+                if status:
+                    break
+            else:
+                status = DONE
+        except LLMError as e:
+            self.error = str(e)
+            status = CANCELLED if self._cancel.is_set() else FAILED
+        except Exception as e:
+            logger.error(f"Falha inesperada no streaming: {e}")
+            self.error = str(e)
+            status = FAILED
+        finally:
+            stream.close()  # Fecha a conexão: o servidor para de gerar
+            with self._cond:
+                self.status = status
+                self._cond.notify_all()
+
+    def fail(self, error):
+        """Encerra o Flight sem stream (ex: falha ao montar o contexto)"""
+        with self._cond:
+            self.error = str(error)
+            self.status = FAILED
+            self._cond.notify_all()
+
+    def start(self, stream):
+        """
+        Consome o stream em uma thread própria
+
+        Raises:
+            LLMError: Limite de streams simultâneos do processo atingido
+        """
+        if not _active.acquire(blocking=False):
+            stream.close()
+            raise LLMError("Muitas respostas sendo geradas agora. Tente novamente em instantes.")
+
+        def consume():
+            try:
+                self.run(stream)
+            finally:
+                _active.release()
+
+        threading.Thread(target=consume, name="nobile-flight", daemon=True).start()
+        return self
+
+    def replay(self):
+        """
+        Entrega a resposta, esperando pelos trechos ainda não gerados
+
+        Yields:
+            str: Trechos da resposta
+
+        Raises:
+            LLMError: A geração falhou, foi interrompida ou ficou parada por
+                      SINGLE_FLIGHT_STALL_TIMEOUT_SECONDS sem novos trechos
+        """
+        sent = 0
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + SINGLE_FLIGHT_STALL_TIMEOUT_SECONDS
+                while sent >= len(self.chunks) and self.status == RUNNING:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LLMError("A resposta parou de chegar. Tente novamente.")
+                    self._cond.wait(remaining)
+                pending, status = self.chunks[sent:], self.status
+            yield from pending
+            sent += len(pending)
+            if status != RUNNING and sent >= len(self.chunks):
+                break
+        if status != DONE:
+            raise LLMError(self.error or "A geração da resposta foi interrompida. Tente novamente.")
+
+
+class SingleFlight:
+    """
+    Chamadas em andamento (ou recém-concluídas) de uma sessão, por chave
+
+    Guardado no st.session_state. Chamadas que falharam ou foram canceladas
+    não são reaproveitadas: o próximo pedido da mesma chave abre outra.
+    """
+
+    def __init__(self, max_entries=SINGLE_FLIGHT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._flights = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stream(self, key, open_stream):
+        """
+        Acompanha a chamada da chave, abrindo-a só se não houver uma utilizável
+
+        Args:
+            key: Estado da conversa (conversation_key)
+            open_stream: Callable sem argumentos que retorna o gerador de trechos
+
+        Returns:
+            generator: Trechos da resposta (replay do Flight compartilhado)
+
+        Raises:
+            LLMError: Limite de streams simultâneos do processo atingido
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            opened = flight is None or flight.status in (FAILED, CANCELLED, CAPPED)
+            if opened:
+                flight = Flight()
+                self._remember(key, flight)
+        if not opened:
+            logger.info("Chamada idêntica em andamento: reaproveitando")
+            return flight.replay()
+        # Fora do lock: montar o contexto pode fazer uma chamada síncrona de resumo
+        try:
+            flight.start(open_stream())
+        except BaseException as e:  # Inclui a interrupção do script por um rerun
+            flight.fail(e)
+            raise
+        return flight.replay()
+
+    def adopt(self, key, flight):
+        """Registra um Flight já iniciado fora daqui (ex: especulação reaproveitada)"""
+        with self._lock:
+            self._remember(key, flight)
+
+    def _remember(self, key, flight):
+        self._flights[key] = flight
+        self._flights.move_to_end(key)
+        while len(self._flights) > self.max_entries:
+            _, oldest = self._flights.popitem(last=False)
+            if oldest.status == RUNNING:
+                oldest.cancel()
@@ -0,0 +1,148 @@
+"""
+Pré-geração especulativa das ações do MENU
+
+Quando o MENU aparece, as respostas dos botões ("/otimizador_cv_linkedin" e
+"Pular para Arquivo Final") começam a ser geradas em segundo plano, com
+prioridade "background" no rate limit. Se o usuário clica no botão cujo
+trigger corresponde a uma especulação feita sobre o mesmo histórico, a
+resposta (completa ou ainda em andamento) é reaproveitada; as demais são
+canceladas. O custo é limitado por especulação e por sessão.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    SPECULATION_ENABLED, SPECULATION_MAX_OUTPUT_TOKENS, SPECULATION_SESSION_TOKEN_BUDGET, SPECULATION_MAX_WORKERS,
+)
+from engine import stream_response
+from chat_history import make_message
+from rate_limiter import estimate_tokens
+from single_flight import Flight, RUNNING, DONE, CANCELLED, CAPPED
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=SPECULATION_MAX_WORKERS, thread_name_prefix="nobile-speculation")
+
+
+class Speculation(Flight):
+    """
+    Resposta gerada em segundo plano para um trigger
+
+    Enquanto não é reaproveitada por um clique, a geração é interrompida ao
+    passar de SPECULATION_MAX_OUTPUT_TOKENS.
+    """
+
+    def __init__(self, trigger, task, base_length, input_tokens):
+        super().__init__()
+        self.trigger = trigger
+        self.task = task  # "chat" (ETAPA 1) ou "execution" (ETAPA 5)
+        self.base_length = base_length  # Tamanho do histórico quando a especulação começou
+        self.input_tokens = input_tokens
+        self.output_tokens = 0
+        self.claimed = False  # Reaproveitada por um clique (deixa de ser especulativa)
+
+    def _interrupt(self):
+        self.output_tokens += len(self.chunks[-1]) // 4 + 1
+        if not self.claimed and self.output_tokens > SPECULATION_MAX_OUTPUT_TOKENS:
+            return CAPPED
+        return super()._interrupt()
+
+    def speculate(self, window, messages, api_key):
+        """
+        Monta o contexto e gera a resposta do trigger (executa no pool de especulação)
+
+        O contexto é montado aqui, sobre uma cópia da janela da sessão: um resumo
+        que precise ser atualizado não bloqueia o script nem altera a janela real.
+        O cancelamento é verificado antes de abrir a requisição e durante a espera
+        no rate limit: uma especulação cancelada ainda na fila não é cobrada.
+        """
+        if self._cancel.is_set():
+            with self._cond:
+                self.status = CANCELLED
+                self._cond.notify_all()
+            return
+        try:
+            context = window.build(messages, api_key)
+        except Exception as e:
+            self.fail(e)
+            return
+        self.run(stream_response(context, api_key, task=self.task, call_type="speculation", cancel=self._cancel))
+
+
+class Speculator:
+    """
+    Especulações de uma sessão (guardado no st.session_state)
+
+    Cada especulação vale para um trigger e um tamanho de histórico; qualquer
+    mensagem nova invalida as anteriores.
+    """
+
+    def __init__(self, budget=SPECULATION_SESSION_TOKEN_BUDGET):
+        self.budget = budget
+        self.spent = 0  # Tokens reservados por especulações não reaproveitadas
+        self.speculations = {}
+
+    def start(self, triggers, messages, window, api_key):
+        """
+        Começa a gerar as respostas dos triggers sobre o histórico atual
+
+        Args:
+            triggers: {mensagem que o botão do MENU anexaria: task da resposta}
+            messages: Histórico atual (a última mensagem é do assistente)
+            window: ContextWindow da sessão (só lida; cada especulação monta o contexto em uma cópia)
+            api_key: Chave API da OpenAI
+        """
+        if not SPECULATION_ENABLED or not api_key:
+            return
+        for trigger, task in triggers.items():
+            current = self.speculations.get(trigger)
+            if current is not None and current.base_length == len(messages):
+                continue
+            if current is not None:
+                self._discard(current)
+            candidate = messages + [make_message("user", trigger)]
+            # O contexto montado não passa do orçamento da janela
+            reserve = min(estimate_tokens(candidate), window.max_tokens) + SPECULATION_MAX_OUTPUT_TOKENS
+            if self.spent + reserve > self.budget:
+                logger.info("Orçamento de especulação da sessão esgotado")
+                self.speculations.pop(trigger, None)
+                continue
+            self.spent += reserve
+            speculation = Speculation(trigger, task, len(messages), reserve - SPECULATION_MAX_OUTPUT_TOKENS)
+            self.speculations[trigger] = speculation
+            _executor.submit(speculation.speculate, window.snapshot(), candidate, api_key)
+
+    def take(self, messages):
+        """
+        Reaproveita a especulação do trigger que acabou de ser anexado
+
+        Args:
+            messages: Histórico cuja última mensagem é o trigger do botão clicado
+
+        Returns:
+            Speculation or None: Especulação utilizável; as demais são canceladas
+        """
+        speculation = self.speculations.pop(messages[-1]["content"], None) if messages else None
+        if speculation is not None and (
+            speculation.base_length != len(messages) - 1 or speculation.status not in (RUNNING, DONE)
+        ):
+            self._discard(speculation)
+            speculation = None
+        if speculation is not None:
+            speculation.claimed = True
+            self.spent -= speculation.input_tokens + SPECULATION_MAX_OUTPUT_TOKENS
+        self.cancel_all()
+        return speculation
+
+    def cancel_all(self):
+        """Cancela as especulações pendentes (nova mensagem ou reinício da sessão)"""
+        for speculation in self.speculations.values():
+            self._discard(speculation)
+        self.speculations = {}
+
+    def _discard(self, speculation):
+        """Cancela e devolve ao orçamento a parte não gerada da reserva"""
+        speculation.cancel()
+        unused = SPECULATION_MAX_OUTPUT_TOKENS - min(speculation.output_tokens, SPECULATION_MAX_OUTPUT_TOKENS)
+        self.spent -= unused
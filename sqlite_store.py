@@ -0,0 +1,96 @@
+"""
+Infraestrutura comum dos armazenamentos SQLite locais (cv_cache, llm_cache, session_store)
+
+Abertura do banco em WAL com o esquema de cada módulo, conexões de curta
+duração (transação confirmada e conexão fechada ao sair do bloco), remoção
+LRU por tamanho total e a instância única por processo criada sob demanda.
+
+Os bancos ficam em disco local: o WAL exige que todos os processos estejam no
+mesmo host (memória compartilhada) e não é suportado em NFS.
+"""
+
+import functools
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+CONNECT_TIMEOUT_SECONDS = 10  # Espera por um lock de escrita de outro processo/thread
+
+
+@contextmanager
+def connect(path):
+    """
+    Conexão com commit ao final do bloco (rollback em caso de erro), sempre fechada
+
+    Args:
+        path: Arquivo do banco
+
+    Yields:
+        sqlite3.Connection: Conexão aberta
+    """
+    conn = sqlite3.connect(path, timeout=CONNECT_TIMEOUT_SECONDS)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def open_database(path, *schema):
+    """
+    Cria o diretório e o banco (modo WAL) e aplica o esquema
+
+    Args:
+        path: Arquivo do banco
+        *schema: Comandos CREATE ... IF NOT EXISTS
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in schema:
+            conn.execute(statement)
+
+
+def evict_lru(conn, table, max_bytes):
+    """
+    Remove as entradas menos usadas recentemente até o total caber em max_bytes
+
+    Args:
+        conn: Conexão aberta (dentro da transação da gravação)
+        table: Tabela com as colunas key, size e last_access
+        max_bytes: Tamanho máximo somado da coluna size
+    """
+    total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return
+    for key, size in conn.execute(f"SELECT key, size FROM {table} ORDER BY last_access").fetchall():
+        conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def process_singleton(factory):
+    """
+    Decorador: a função passa a retornar sempre a mesma instância, criada na primeira chamada
+
+    Args:
+        factory: Função sem argumentos que cria a instância
+
+    Returns:
+        callable: Função com a mesma assinatura e docstring
+    """
+    instance = None
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get():
+        nonlocal instance
+        with lock:
+            if instance is None:
+                instance = factory()
+            return instance
+
+    return get
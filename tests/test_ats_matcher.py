@@ -0,0 +1,61 @@
+from ats_matcher import IncrementalScorer, is_cv_output
+from chat_history import make_message
+
+PRESENT = ["Vendas B2B", "CRM"]
+MISSING = ["Power BI", "SQL", "Forecast"]
+
+
+def test_assistant_asking_about_missing_keywords_does_not_count():
+    scorer = IncrementalScorer(PRESENT, MISSING)
+    messages = [make_message("assistant", "Seu CV não menciona Power BI, SQL nem Forecast. Você tem experiência com eles?")]
+    assert scorer.update(messages) is False
+    assert scorer.result()["ats_score"] == 40
+
+
+def test_user_answers_count():
+    scorer = IncrementalScorer(PRESENT, MISSING)
+    messages = [
+        make_message("assistant", "Você usa Power BI ou SQL?"),
+        make_message("user", "Sim, monto dashboards no Power BI toda semana."),
+    ]
+    assert scorer.update(messages) is True
+    result = scorer.result()
+    assert result["ats_score"] == 60
+    assert result["keywords_missing"] == ["SQL", "Forecast"]
+
+
+def test_rewritten_cv_counts():
+    scorer = IncrementalScorer(PRESENT, MISSING)
+    rewritten = "**ETAPA 4: ENGENHARIA**\nResumo: gestor de Vendas B2B com CRM, SQL e Forecast de receita."
+    assert is_cv_output(rewritten)
+    scorer.update([make_message("assistant", rewritten)])
+    assert scorer.result()["ats_score"] == 80
+
+
+def test_only_new_messages_are_scanned():
+    scorer = IncrementalScorer(PRESENT, MISSING)
+    messages = [make_message("user", "Trabalho com SQL.")]
+    scorer.update(messages)
+    messages.append(make_message("assistant", "Ótimo. E Forecast?"))
+    assert scorer.update(messages) is False
+    assert scorer.scanned == 2
+
+
+def test_negated_user_sentences_do_not_count():
+    scorer = IncrementalScorer(PRESENT, MISSING)
+    messages = [
+        make_message("user", "Não tenho experiência com SQL."),
+        make_message("user", "Nunca usei Power BI, e fiz Forecast sem planilha."),
+    ]
+    scorer.update(messages)
+    assert scorer.result()["keywords_missing"] == ["Power BI", "SQL"]
+
+
+def test_negation_does_not_cross_sentences_or_window():
+    scorer = IncrementalScorer(PRESENT, MISSING)
+    messages = [
+        make_message("user", "Não. Uso SQL todo dia."),
+        make_message("user", "Não tenho certificação formal, mas monto relatórios no Power BI."),
+    ]
+    scorer.update(messages)
+    assert scorer.result()["keywords_missing"] == ["Forecast"]
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+from batch_api import (
+    build_role_request, build_ats_request, write_jsonl, read_batch_output, import_roles, import_ats,
+    BATCH_ENDPOINT,
+)
+from model_router import model_for
+
+FIXTURES = Path(__file__).parent / "fixtures" / "batch_api"
+CV_ANA = "Ana Souza\nEXPERIÊNCIA\nGerente de Vendas B2B - ACME\n01/2020\nImplantou CRM e dashboards em Power BI."
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_export_format(tmp_path):
+    path = tmp_path / "batch.jsonl"
+    count = write_jsonl([build_role_request("ana.pdf", CV_ANA), build_ats_request("ana.pdf", CV_ANA, "Gerente")], path)
+    role, ats = read_jsonl(path)
+    assert count == 2
+    assert role["custom_id"] == "role:ana.pdf" and ats["custom_id"] == "ats:ana.pdf"
+    for request in (role, ats):
+        assert request["method"] == "POST" and request["url"] == BATCH_ENDPOINT
+        assert request["body"]["messages"][0]["role"] == "user"
+        assert "Ana Souza" in request["body"]["messages"][0]["content"]
+    assert role["body"]["model"] == model_for("role")
+    assert ats["body"]["model"] == model_for("profile")
+    assert ats["body"]["response_format"] == {"type": "json_object"}
+    assert "Gerente" in ats["body"]["messages"][0]["content"]
+
+
+def test_export_model_override():
+    assert build_role_request("ana.pdf", CV_ANA, model="gpt-4o")["body"]["model"] == "gpt-4o"
+
+
+def test_output_joined_by_custom_id():
+    requests = read_jsonl(FIXTURES / "roles_batch.jsonl")
+    results = read_batch_output(FIXTURES / "roles_output.jsonl")
+    assert set(results) == {request["custom_id"] for request in requests}
+    assert import_roles(results) == {"ana.pdf": "Gerente de Vendas", "carla.pdf": "Analista de Dados",
+                                     "bruno.pdf": "Profissional"}
+
+
+def test_error_lines():
+    roles = read_batch_output(FIXTURES / "roles_output.jsonl")
+    assert roles["role:bruno.pdf"] == {"error": "The server had an error processing your request."}
+    ats = read_batch_output(FIXTURES / "ats_output.jsonl")
+    assert ats["ats:bruno.pdf"] == {"error": "Rate limit reached for requests"}
+
+
+def test_import_ats_records():
+    roles = import_roles(read_batch_output(FIXTURES / "roles_output.jsonl"))
+    records = {r["file"]: r for r in import_ats(read_batch_output(FIXTURES / "ats_output.jsonl"), roles)}
+    assert sorted(records) == ["ana.pdf", "bruno.pdf", "carla.pdf", "dani.pdf"]
+
+    ana = records["ana.pdf"]
+    assert ana["status"] == "ok" and ana["target_role"] == "Gerente de Vendas"
+    assert ana["ats_data"]["ats_score"] == 40
+    assert ana["ats_data"]["keywords_missing"] == ["Power BI", "SQL", "Forecast"]
+
+    bruno = records["bruno.pdf"]
+    assert bruno["status"] == "error" and bruno["ats_data"] is None
+    assert bruno["error"] == "Rate limit reached for requests"
+
+    # content null (resposta filtrada) é registrado como erro sem interromper a importação
+    dani = records["dani.pdf"]
+    assert dani["status"] == "error" and dani["ats_data"] is None and dani["error"]
+
+
+def test_malformed_ats_json_is_an_error():
+    results = {
+        "ats:carla.pdf": read_batch_output(FIXTURES / "ats_output.jsonl")["ats:carla.pdf"],
+        "ats:dani.pdf": {"content": '["SQL", "Python"]'},
+    }
+    records = import_ats(results, {"carla.pdf": "Analista de Dados"})
+    assert [r["status"] for r in records] == ["error", "error"]
+    assert all(r["ats_data"] is None and r["error"] for r in records)
+
+
+def test_local_rescoring_with_cv_texts():
+    results = read_batch_output(FIXTURES / "ats_output.jsonl")
+    roles = {"ana.pdf": "Gerente de Vendas"}
+    record = next(r for r in import_ats(results, roles, cv_texts={"ana.pdf": CV_ANA}) if r["file"] == "ana.pdf")
+    # O CV completo cita Power BI: o score local corrige o da resposta (40)
+    assert record["ats_data"]["keywords_present"] == ["Vendas B2B", "CRM", "Power BI"]
+    assert record["ats_data"]["keywords_missing"] == ["SQL", "Forecast"]
+    assert record["ats_data"]["ats_score"] == 60
+    assert record["ats_data"]["recomendacoes"] == ["Inclua Forecast no resumo."]
@@ -0,0 +1,30 @@
+from cv_normalizer import normalize_cv, PAGE_SEPARATOR
+
+
+def test_keeps_date_only_lines():
+    raw = "João Silva\nEXPERIÊNCIA\nGerente de Vendas - ACME\n01/2020\n2019\nLiderou equipe de 12 pessoas\n2018 / 2022"
+    text = normalize_cv(raw).text
+    for date in ("01/2020", "2019", "2018 / 2022"):
+        assert date in text
+
+
+def test_keeps_small_numbers_inside_the_page():
+    raw = "João Silva\nContato\nSão Paulo\nIDIOMAS\nInglês\n2\nEspanhol\nFrancês\nAlemão\nItaliano"
+    assert "\n2\n" in normalize_cv(raw).text
+
+
+def test_removes_page_numbers():
+    pages = [
+        "João Silva\nEXPERIÊNCIA\nGerente de Vendas - ACME\n01/2020\nLiderou equipe\nPágina 1 de 2",
+        "Analista - XPTO\n2016 - 2019\nFORMAÇÃO\nAdministração - USP\n2\n",
+    ]
+    text = normalize_cv(PAGE_SEPARATOR.join(pages)).text
+    assert "Página 1 de 2" not in text
+    assert not any(line == "2" for line in text.splitlines())
+    assert "01/2020" in text and "2016 - 2019" in text
+
+
+def test_removes_fraction_page_numbers_at_page_edges():
+    pages = ["João Silva\nEXPERIÊNCIA\nGerente - ACME\n1/2", "Analista - XPTO\nFORMAÇÃO\nUSP\n2/2"]
+    lines = normalize_cv(PAGE_SEPARATOR.join(pages)).text.splitlines()
+    assert "1/2" not in lines and "2/2" not in lines
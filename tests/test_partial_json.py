@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from partial_json import PartialJSONParser
+
+DOCUMENT = {
+    "target_role": "Gerente de Vendas \"Sênior\"\nB2B",
+    "keywords": ["CRM", "Power BI", "Forecast"],
+    "score": -12.5e1,
+    "ativo": True,
+    "extra": None,
+}
+
+
+def feed_all(chunks):
+    parser = PartialJSONParser()
+    values = [json.loads(json.dumps(parser.feed(chunk))) for chunk in chunks]
+    return parser, values
+
+
+def test_one_char_at_a_time_matches_json_loads():
+    text = json.dumps(DOCUMENT, ensure_ascii=False)
+    parser, _ = feed_all(text)
+    assert parser.close() == DOCUMENT
+
+
+def test_split_mid_string_and_mid_escape():
+    parser, values = feed_all(['{"target_role": "Gerente \\', 'u00e9 \\', '"A\\', 'nB"', ', "k', 'eywords": []}'])
+    assert values[0] == {}  # String ainda aberta: o campo não aparece pela metade
+    assert values[3] == {"target_role": 'Gerente é "A\nB'}
+    assert parser.close() == {"target_role": 'Gerente é "A\nB', "keywords": []}
+
+
+def test_split_mid_number():
+    parser, values = feed_all(['{"score": 1', '2', '.5', 'e1, "n": -', '3}'])
+    assert values[2] == {}  # Literal só entra quando termina
+    assert values[3] == {"score": 125.0}
+    assert parser.close() == {"score": 125.0, "n": -3}
+
+
+def test_list_items_complete_one_by_one():
+    chunks = ['{"keywords": [', '"CRM"', ', "Pow', 'er BI"', ', "Forecast"', ']}']
+    _, values = feed_all(chunks)
+    assert [v.get("keywords") for v in values] == [
+        [], ["CRM"], ["CRM"], ["CRM", "Power BI"], ["CRM", "Power BI", "Forecast"], ["CRM", "Power BI", "Forecast"],
+    ]
+
+
+def test_nested_containers():
+    parser, _ = feed_all(['{"a": [{"b": [1, ', '2]}, {}], "c": {}}'])
+    assert parser.close() == {"a": [{"b": [1, 2]}, {}], "c": {}}
+
+
+def test_truncated_document_keeps_complete_fields():
+    parser, _ = feed_all(['{"target_role": "Analista", "keywords": ["SQL", "Pyth'])
+    assert not parser.done and parser.error is None
+    assert parser.value == {"target_role": "Analista", "keywords": ["SQL"]}
+    with pytest.raises(ValueError, match="truncado"):
+        parser.close()
+
+
+@pytest.mark.parametrize("text, partial", [
+    ('{"a": 1,, "b": 2}', {"a": 1}),
+    ('{"a" 1}', {}),
+    ('{a: 1}', {}),
+    ('{"a": [1 2]}', {"a": [1]}),
+    ('{"a": tru}', {}),
+    ('oi {"a": 1}', None),
+    ('{"a": 1} {"b": 2}', {"a": 1}),
+])
+def test_invalid_input(text, partial):
+    parser, _ = feed_all([text])
+    with pytest.raises(ValueError):
+        parser.close()
+    assert parser.value == partial
+
+
+def test_stops_consuming_after_error():
+    parser = PartialJSONParser()
+    parser.feed('{"a": 1,, ')
+    assert parser.error
+    assert parser.feed('"b": 2}') == {"a": 1}
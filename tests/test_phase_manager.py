@@ -0,0 +1,50 @@
+from chat_history import make_message
+from phase_manager import Phase, PhaseManager, mentioned_etapa
+from prompts import PromptTemplates
+
+
+def executing():
+    manager = PhaseManager()
+    manager.current_phase = Phase.EXECUCAO
+    return manager
+
+
+def test_optimizer_questions_stay_on_chat():
+    manager = executing()
+    messages = [
+        make_message("user", PromptTemplates.optimizer_trigger()),
+        make_message("assistant", "## ETAPA 1 (SEO)\nFaltam SQL e Power BI. Na Etapa 4 vamos reescrever tudo."),
+        make_message("user", "Uso SQL todo dia."),
+        make_message("assistant", "**ETAPA 2 – Métricas**\nQual o impacto em R$?"),
+        make_message("user", "Reduzi custos em 12%."),
+    ]
+    for end in range(1, len(messages) + 1):
+        manager.sync(messages[:end])
+        assert manager.response_task() == "chat"
+
+
+def test_answered_curadoria_goes_to_execution():
+    manager = executing()
+    messages = [make_message("assistant", "ETAPA 3 (Curadoria)\nAlguma conquista que não cobrimos?")]
+    manager.sync(messages)
+    assert manager.response_task() == "chat"
+    manager.sync(messages + [make_message("user", "Não, pode seguir.")])
+    assert manager.response_task() == "execution"
+
+
+def test_skip_to_final_goes_to_execution():
+    manager = executing()
+    manager.sync([make_message("user", PromptTemplates.skip_to_final_trigger())])
+    assert manager.etapa == 5
+    assert manager.response_task() == "execution"
+
+
+def test_only_execution_phase_uses_execution():
+    manager = PhaseManager()
+    manager.sync([make_message("user", PromptTemplates.skip_to_final_trigger())])
+    assert manager.response_task() == "chat"
+
+
+def test_assistant_mentions_outside_headings_are_ignored():
+    assert mentioned_etapa(make_message("assistant", "Depois seguimos para a ETAPA 5.")) is None
+    assert mentioned_etapa(make_message("assistant", "### Etapa 4 - Engenharia")) == 4
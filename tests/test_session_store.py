@@ -0,0 +1,19 @@
+from chat_history import make_message
+from session_store import SessionStore
+
+
+def test_duplicated_tab_is_refused_and_forks(tmp_path):
+    store = SessionStore(path=str(tmp_path / "sessions.sqlite3"))
+    session_id = store.create([make_message("system", "prompt")], phase="MENU")
+
+    assert store.append_message(session_id, 1, make_message("user", "aba 1"))
+    assert not store.append_message(session_id, 1, make_message("user", "aba 2"))
+    assert [m["content"] for m in store.load(session_id)["messages"]] == ["prompt", "aba 1"]
+
+    history = [make_message("system", "prompt"), make_message("user", "aba 2")]
+    forked = store.create(history, target_role="Analista", ats_data={"ats_score": 40}, phase="MENU")
+    restored = store.load(forked)
+    assert [m["content"] for m in restored["messages"]] == ["prompt", "aba 2"]
+    assert restored["target_role"] == "Analista"
+    assert restored["ats_data"] == {"ats_score": 40}
+    assert restored["phase"] == "MENU"
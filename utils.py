@@ -2,21 +2,171 @@
 Funções utilitárias para o Nobile Career Strategy
 """
 
-import pdfplumber
+import importlib
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
+from config import (
+    PDF_MAX_BYTES,
+    PDF_MAX_PAGES,
+    PDF_PARALLEL_MIN_PAGES,
+    PDF_PAGES_PER_CHUNK,
+    PDF_EXTRACTION_WORKERS,
+)
 
-def extract_text(file):
+
+# Separador entre páginas no texto extraído (usado pelo cv_normalizer para achar cabeçalhos/rodapés)
+PAGE_BREAK = "\n\f\n"
+
+
+class PDFTooLargeError(ValueError):
+    """O PDF excede o limite de páginas ou de bytes configurado"""
+
+
+# Pool de processos criado sob demanda e reutilizado entre uploads
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool():
+    """Retorna o pool de processos compartilhado (spawn: seguro com as threads do Streamlit)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+_prewarmed = set()
+_prewarm_lock = threading.Lock()
+
+
+def prewarm_imports(*modules):
+    """
+    Importa módulos pesados em uma thread de segundo plano (uma vez por processo)
+
+    Chamado depois de renderizar a página: o primeiro upload/chamada à IA não
+    paga o import, e o carregamento da página também não.
+
+    Args:
+        *modules: Nomes dos módulos (ex: "openai", "pdfplumber")
+    """
+    with _prewarm_lock:
+        pending = [name for name in modules if name not in _prewarmed]
+        _prewarmed.update(pending)
+
+    def load():
+        for name in pending:
+            importlib.import_module(name)
+
+    if pending:
+        threading.Thread(target=load, name="nobile-prewarm", daemon=True).start()
+
+
+def _read_bytes(file):
+    """Lê o conteúdo do arquivo (UploadedFile, objeto binário ou caminho) como bytes"""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, str) or hasattr(file, "__fspath__"):
+        with open(file, "rb") as f:
+            return f.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    file.seek(0)
+    return file.read()
+
+
+def _extract_page_range(data, start, end):
+    """
+    Extrai o texto de um intervalo de páginas (executado nos processos do pool)
+
+    Args:
+        data: Bytes do PDF
+        start: Índice da primeira página (inclusivo)
+        end: Índice da última página (exclusivo)
+
+    Returns:
+        list: Texto de cada página ("" para páginas sem texto)
+    """
+    import pdfplumber
+
+    texts = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages[start:end]:
+            texts.append(page.extract_text() or "")
+            page.close()  # Libera o cache de objetos da página
+    return texts
+
+
+def iter_pages(file, max_pages=PDF_MAX_PAGES, max_bytes=PDF_MAX_BYTES, parallel=True):
+    """
+    Extrai o texto de um PDF página a página, na ordem do documento
+
+    Cada página é extraída uma única vez. Documentos grandes são divididos em
+    blocos de páginas processados em paralelo no pool de processos.
+
+    Args:
+        file: Objeto de arquivo PDF (UploadedFile do Streamlit), bytes ou caminho
+        max_pages: Limite de páginas (None desativa)
+        max_bytes: Limite de tamanho em bytes (None desativa)
+        parallel: Se False, nunca usa o pool de processos (ex: já rodando dentro de um worker)
+
+    Yields:
+        str: Texto de cada página ("" para páginas sem texto)
+
+    Raises:
+        PDFTooLargeError: Se o PDF exceder max_bytes ou max_pages
+    """
+    data = _read_bytes(file)
+    if max_bytes is not None and len(data) > max_bytes:
+        raise PDFTooLargeError(f"PDF com {len(data)} bytes excede o limite de {max_bytes} bytes")
+
+    import pdfplumber  # Importado no primeiro upload, não no carregamento da página
+
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        page_count = len(pdf.pages)
+        if max_pages is not None and page_count > max_pages:
+            raise PDFTooLargeError(f"PDF com {page_count} páginas excede o limite de {max_pages} páginas")
+
+        if not parallel or page_count < PDF_PARALLEL_MIN_PAGES:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+                page.close()
+            return
+
+    pool = _get_process_pool()
+    futures = [
+        pool.submit(_extract_page_range, data, start, min(start + PDF_PAGES_PER_CHUNK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_CHUNK)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_text(file, max_pages=PDF_MAX_PAGES, max_bytes=PDF_MAX_BYTES, parallel=True):
     """
     Extrai texto de um arquivo PDF
-    
+
     Args:
         file: Objeto de arquivo PDF (UploadedFile do Streamlit)
-        
+        max_pages: Limite de páginas (None desativa)
+        max_bytes: Limite de tamanho em bytes (None desativa)
+        parallel: Se False, extrai as páginas em série no processo atual
+
     Returns:
-        str: Texto extraído do PDF ou None se houver erro
+        str: Texto extraído do PDF (páginas separadas por PAGE_BREAK) ou None se houver erro
+             (inclusive PDF acima dos limites)
     """
     try:
-        with pdfplumber.open(file) as pdf:
-            return "\n".join([p.extract_text() for p in pdf.pages if p.extract_text()])
+        return PAGE_BREAK.join(text for text in iter_pages(file, max_pages, max_bytes, parallel) if text)
     except Exception:
         return None